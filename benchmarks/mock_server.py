@@ -0,0 +1,424 @@
+"""In-process HTTP server emulating the Cookbook API with synthetic recipes and images.
+
+The server keeps all recipes in memory and pre-serializes the responses of read requests, so the measured time is
+dominated by the client. It speaks HTTP/1.1 with keep-alive like a real Nextcloud instance behind a web server.
+
+Usage::
+
+    with MockCookbookServer(recipe_count=1000) as server:
+        client = CookbookClient(server.base_url, "user", "password")
+"""
+
+import json
+import random
+import re
+import secrets
+import threading
+import time
+from http import HTTPStatus
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import TracebackType
+from typing import Any
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from typing_extensions import Self
+
+API_PATH = "/apps/cookbook/api/v1"
+SESSION_COOKIE = "nc_session_id"
+
+KEYWORDS = [
+    "vegetarian",
+    "vegan",
+    "pasta",
+    "dessert",
+    "quick",
+    "soup",
+    "italian",
+    "baking",
+    "breakfast",
+    "spicy",
+]
+CATEGORIES = ["Main Courses", "Desserts", "Soups", "Breakfast", "Snacks"]
+IMAGE_SIZES = {"full": 256 * 1024, "thumb": 16 * 1024, "thumb16": 1024}
+
+
+def generate_recipe(index: int, rng: random.Random) -> dict[str, Any]:
+    """Generate a synthetic recipe as returned by the Cookbook API.
+
+    :param index: The number of the recipe, used as its ID.
+    :param rng: The random number generator.
+    :return: The recipe data.
+    """
+    recipe_id = str(index + 1)
+    return {
+        "@context": "http://schema.org",
+        "@type": "Recipe",
+        "id": recipe_id,
+        "name": f"Recipe {recipe_id}",
+        "description": f"A synthetic recipe number {recipe_id} for benchmarking.",
+        "url": f"https://example.com/recipes/{recipe_id}",
+        "image": f"https://example.com/recipes/{recipe_id}.jpg",
+        "imageUrl": f"/index.php/apps/cookbook/recipes/{recipe_id}/image?size=full",
+        "imagePlaceholderUrl": f"/index.php/apps/cookbook/recipes/{recipe_id}/image?size=thumb16",
+        "prepTime": "PT15M",
+        "cookTime": "PT30M",
+        "totalTime": "PT45M",
+        "recipeCategory": rng.choice(CATEGORIES),
+        "keywords": ",".join(rng.sample(KEYWORDS, rng.randint(0, 4))),
+        "recipeYield": rng.randint(1, 8),
+        "tool": [f"Tool {i}" for i in range(rng.randint(0, 3))],
+        "recipeIngredient": [
+            f"{rng.randint(1, 500)} g ingredient {i}" for i in range(rng.randint(3, 15))
+        ],
+        "recipeInstructions": [
+            f"Step {i}: " + "stir and wait " * rng.randint(2, 10)
+            for i in range(rng.randint(2, 10))
+        ],
+        "nutrition": {
+            "@type": "NutritionInformation",
+            "calories": f"{rng.randint(100, 900)} kcal",
+        },
+        "dateCreated": "2023-01-01T10:00:00+00:00",
+        "dateModified": "2023-01-02T10:00:00+00:00",
+    }
+
+
+def recipe_stub(recipe: dict[str, Any]) -> dict[str, Any]:
+    """Reduce a recipe to the fields returned by the listing endpoints.
+
+    :param recipe: The recipe data.
+    :return: The recipe stub data.
+    """
+    keys = (
+        "id",
+        "name",
+        "keywords",
+        "dateCreated",
+        "dateModified",
+        "imageUrl",
+        "imagePlaceholderUrl",
+    )
+    return {k: recipe[k] for k in keys}
+
+
+class MockCookbookState:
+    """The recipes and images served by a :class:`MockCookbookServer`."""
+
+    def __init__(
+        self,
+        recipe_count: int,
+        seed: int = 0,
+        latency: float = 0.0,
+        auth_cost: float = 0.0,
+    ) -> None:
+        """Create a new MockCookbookState instance.
+
+        :param recipe_count: The number of synthetic recipes to create.
+        :param seed: The seed of the random number generator.
+        :param latency: The time in seconds each request takes before it is handled.
+        :param auth_cost: The time in seconds the verification of the password of each Basic auth request takes.
+        """
+        rng = random.Random(seed)
+        self.recipes = {
+            r["id"]: r for r in (generate_recipe(i, rng) for i in range(recipe_count))
+        }
+        self.next_id = recipe_count + 1
+        self.latency = latency
+        self.auth_cost = auth_cost
+        self.images = {
+            size: bytes(range(256)) * (n // 256) for size, n in IMAGE_SIZES.items()
+        }
+        self.config = {"folder": "/Recipes", "update_interval": 5, "print_image": True}
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.logins = 0
+        self.sessions: set[str] = set()
+        self._bodies: dict[str, bytes] = {}
+
+    def body(self, key: str, build: Any) -> bytes:
+        """Get a cached serialized response body, building it on first use.
+
+        :param key: The cache key of the body.
+        :param build: A function returning the data to serialize.
+        :return: The serialized body.
+        """
+        body = self._bodies.get(key)
+        if body is None:
+            body = json.dumps(build()).encode()
+            self._bodies[key] = body
+        return body
+
+    def changed(self) -> None:
+        """Drop all cached response bodies after a modification."""
+        self._bodies.clear()
+
+    def expire_sessions(self) -> None:
+        """End all sessions, so that the clients have to log in with their password again."""
+        with self.lock:
+            self.sessions.clear()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, without this delayed ACKs add 40 ms to small responses
+    disable_nagle_algorithm = True
+    server: "_Server"
+    # the session created by the current request, sent as cookie with the response
+    _session: str | None = None
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send(
+        self,
+        status: int,
+        body: bytes = b"",
+        content_type: str = "application/json",
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if self._session is not None:
+            self.send_header(
+                "Set-Cookie", f"{SESSION_COOKIE}={self._session}; Path=/; HttpOnly"
+            )
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _read_json(self) -> Any:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"null")
+
+    def _authenticate(self, state: MockCookbookState) -> bool:
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        session = cookie.get(SESSION_COOKIE)
+        with state.lock:
+            has_session = session is not None and session.value in state.sessions
+        if not self.headers.get("Authorization", "").startswith("Basic "):
+            return has_session
+        # like Nextcloud, the password is verified on every request sending it, even with a valid session
+        if state.auth_cost:
+            time.sleep(state.auth_cost)
+        with state.lock:
+            state.logins += 1
+            if not has_session:
+                self._session = secrets.token_hex(16)
+                state.sessions.add(self._session)
+        return True
+
+    def _dispatch(self) -> None:
+        state = self.server.state
+        self._session = None
+        with state.lock:
+            state.requests += 1
+        if state.latency:
+            time.sleep(state.latency)
+        if not self._authenticate(state):
+            self._send(HTTPStatus.UNAUTHORIZED, b'{"message": "Unauthorized"}')
+            return
+        url = urlsplit(self.path)
+        path = unquote(url.path)
+        query = parse_qs(url.query)
+        for method, pattern, handler in _ROUTES:
+            if method != self.command:
+                continue
+            match = re.fullmatch(pattern, path)
+            if match:
+                handler(self, state, query, *match.groups())
+                return
+        self._send(HTTPStatus.NOT_FOUND, b'{"error": "Not found"}')
+
+    do_GET = _dispatch
+    do_POST = _dispatch
+    do_PUT = _dispatch
+    do_DELETE = _dispatch
+
+    def get_recipes(self, state: MockCookbookState, query: dict) -> None:
+        body = state.body(
+            "recipes", lambda: [recipe_stub(r) for r in state.recipes.values()]
+        )
+        self._send(HTTPStatus.OK, body)
+
+    def get_recipe(self, state: MockCookbookState, query: dict, recipe_id: str) -> None:
+        recipe = state.recipes.get(recipe_id)
+        if recipe is None:
+            self._send(HTTPStatus.NOT_FOUND, b'{"msg": "Recipe not found"}')
+            return
+        self._send(HTTPStatus.OK, state.body(f"recipe/{recipe_id}", lambda: recipe))
+
+    def get_image(self, state: MockCookbookState, query: dict, recipe_id: str) -> None:
+        if recipe_id not in state.recipes:
+            self._send(HTTPStatus.NOT_FOUND, b"")
+            return
+        image = state.images.get(query.get("size", ["full"])[0], state.images["full"])
+        match = re.fullmatch(r"bytes=(\d+)-", self.headers.get("Range", ""))
+        if match is None:
+            self._send(HTTPStatus.OK, image, "image/jpeg")
+            return
+        start = int(match.group(1))
+        if start >= len(image):
+            self._send(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, b"", "image/jpeg")
+            return
+        content_range = f"bytes {start}-{len(image) - 1}/{len(image)}"
+        self._send(
+            HTTPStatus.PARTIAL_CONTENT,
+            image[start:],
+            "image/jpeg",
+            {"Content-Range": content_range},
+        )
+
+    def create_recipe(self, state: MockCookbookState, query: dict) -> None:
+        recipe = self._read_json()
+        with state.lock:
+            recipe["id"] = str(state.next_id)
+            state.next_id += 1
+            state.recipes[recipe["id"]] = recipe
+            state.changed()
+        self._send(HTTPStatus.OK, recipe["id"].encode(), "text/plain")
+
+    def update_recipe(
+        self, state: MockCookbookState, query: dict, recipe_id: str
+    ) -> None:
+        if recipe_id not in state.recipes:
+            self._send(HTTPStatus.NOT_FOUND, b'{"msg": "Recipe not found"}')
+            return
+        recipe = self._read_json()
+        with state.lock:
+            state.recipes[recipe_id] = {**recipe, "id": recipe_id}
+            state.changed()
+        self._send(HTTPStatus.OK, recipe_id.encode(), "text/plain")
+
+    def delete_recipe(
+        self, state: MockCookbookState, query: dict, recipe_id: str
+    ) -> None:
+        with state.lock:
+            found = state.recipes.pop(recipe_id, None) is not None
+            state.changed()
+        if not found:
+            self._send(HTTPStatus.NOT_FOUND, b'{"msg": "Recipe not found"}')
+            return
+        self._send(HTTPStatus.OK, b'"Recipe deleted successfully"')
+
+    def import_recipe(self, state: MockCookbookState, query: dict) -> None:
+        url = self._read_json()["url"]
+        with state.lock:
+            if any(r.get("url") == url for r in state.recipes.values()):
+                self._send(HTTPStatus.CONFLICT, b'{"msg": "Recipe already exists"}')
+                return
+            recipe = generate_recipe(state.next_id - 1, random.Random(url))
+            recipe["url"] = url
+            state.next_id += 1
+            state.recipes[recipe["id"]] = recipe
+            state.changed()
+        self._send(HTTPStatus.OK, json.dumps(recipe).encode())
+
+    def search(self, state: MockCookbookState, query: dict, term: str) -> None:
+        term = term.lower()
+        stubs = [
+            recipe_stub(r)
+            for r in state.recipes.values()
+            if term in r["name"].lower() or term in r["keywords"]
+        ]
+        self._send(HTTPStatus.OK, json.dumps(stubs).encode())
+
+    def get_keywords(self, state: MockCookbookState, query: dict) -> None:
+        def build() -> list[dict]:
+            counts: dict[str, int] = {}
+            for recipe in state.recipes.values():
+                for keyword in filter(None, recipe["keywords"].split(",")):
+                    counts[keyword] = counts.get(keyword, 0) + 1
+            return [{"name": k, "recipe_count": c} for k, c in sorted(counts.items())]
+
+        self._send(HTTPStatus.OK, state.body("keywords", build))
+
+    def get_categories(self, state: MockCookbookState, query: dict) -> None:
+        def build() -> list[dict]:
+            counts: dict[str, int] = {}
+            for recipe in state.recipes.values():
+                category = recipe.get("recipeCategory", "")
+                counts[category] = counts.get(category, 0) + 1
+            return [{"name": k, "recipe_count": c} for k, c in sorted(counts.items())]
+
+        self._send(HTTPStatus.OK, state.body("categories", build))
+
+    def get_config(self, state: MockCookbookState, query: dict) -> None:
+        self._send(HTTPStatus.OK, json.dumps(state.config).encode())
+
+
+_ROUTES = [
+    ("GET", rf"{API_PATH}/recipes", _Handler.get_recipes),
+    ("POST", rf"{API_PATH}/recipes", _Handler.create_recipe),
+    ("GET", rf"{API_PATH}/recipes/([^/]+)", _Handler.get_recipe),
+    ("PUT", rf"{API_PATH}/recipes/([^/]+)", _Handler.update_recipe),
+    ("DELETE", rf"{API_PATH}/recipes/([^/]+)", _Handler.delete_recipe),
+    ("GET", rf"{API_PATH}/recipes/([^/]+)/image", _Handler.get_image),
+    ("POST", rf"{API_PATH}/import", _Handler.import_recipe),
+    ("GET", rf"{API_PATH}/search/(.*)", _Handler.search),
+    ("GET", rf"{API_PATH}/keywords", _Handler.get_keywords),
+    ("GET", rf"{API_PATH}/categories", _Handler.get_categories),
+    ("GET", rf"{API_PATH}/config", _Handler.get_config),
+]
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    state: MockCookbookState
+
+
+class MockCookbookServer:
+    """A local Cookbook API server running in a background thread."""
+
+    def __init__(
+        self,
+        recipe_count: int = 100,
+        seed: int = 0,
+        latency: float = 0.0,
+        auth_cost: float = 0.0,
+    ) -> None:
+        """Create a new MockCookbookServer instance. The server is started when the context is entered.
+
+        Any username and password are accepted. Requests with Basic auth get a session cookie, which authenticates
+        later requests without the password.
+
+        :param recipe_count: The number of synthetic recipes to serve.
+        :param seed: The seed for generating the recipes.
+        :param latency: The time in seconds each request takes, to simulate a remote Nextcloud instance.
+        :param auth_cost: The time in seconds the verification of the password of each Basic auth request takes,
+            to simulate the password hashing of Nextcloud.
+        """
+        self.state = MockCookbookState(recipe_count, seed, latency, auth_cost)
+        self._server = _Server(("127.0.0.1", 0), _Handler)
+        self._server.state = self.state
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        """The base URL to pass to the client."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> None:
+        """Start serving requests in a background thread."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the server and close its socket."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.stop()
@@ -0,0 +1,144 @@
+"""Benchmark the latency of SearchIndex queries, e.g. for search-as-you-type.
+
+The recipes are generated from a vocabulary of pseudo-words whose frequencies follow Zipf's law like the words of
+real recipes, so prefixes expand to many tokens and common words match a large share of the recipes. The queries
+have one complete term followed by the prefix of a second term, grouped by the length of that prefix, and are
+measured with warm caches.
+
+Run with ``python -m benchmarks.search``.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from itertools import accumulate
+
+from nextcloud_cookbook_api.models import Recipe
+from nextcloud_cookbook_api.search import SearchIndex
+
+SYLLABLES = [
+    c + v for c in "bcdfghklmnprstvz" for v in ("a", "e", "i", "o", "u", "ai", "ou")
+]
+CATEGORIES = ["Main Courses", "Desserts", "Soups", "Breakfast", "Snacks", "Salads"]
+
+
+def generate_vocabulary(size: int, rng: random.Random) -> list[str]:
+    """Generate distinct pseudo-words, most common first.
+
+    :param size: The number of words.
+    :param rng: The random number generator.
+    :return: The words.
+    """
+    words: dict[str, None] = {}
+    while len(words) < size:
+        words["".join(rng.choices(SYLLABLES, k=rng.randint(2, 4)))] = None
+    return list(words)
+
+
+def generate_recipes(
+    count: int, vocabulary_size: int, seed: int = 0
+) -> tuple[list[Recipe], list[str]]:
+    """Generate recipes with Zipf-distributed words.
+
+    :param count: The number of recipes.
+    :param vocabulary_size: The number of distinct words.
+    :param seed: The seed of the random number generator.
+    :return: The recipes and the vocabulary, most common word first.
+    """
+    rng = random.Random(seed)
+    vocabulary = generate_vocabulary(vocabulary_size, rng)
+    weights = list(accumulate(1 / rank for rank in range(1, vocabulary_size + 1)))
+
+    def text(low: int, high: int) -> str:
+        return " ".join(
+            rng.choices(vocabulary, cum_weights=weights, k=rng.randint(low, high))
+        )
+
+    recipes = [
+        Recipe.model_validate(
+            {
+                "@type": "Recipe",
+                "id": str(i),
+                "name": text(2, 4),
+                "description": text(8, 20),
+                "keywords": ",".join(rng.sample(vocabulary[:40], rng.randint(0, 4))),
+                "recipeCategory": rng.choice(CATEGORIES),
+                "recipeIngredient": [
+                    f"{rng.randint(1, 500)} g {text(1, 3)}"
+                    for _ in range(rng.randint(5, 12))
+                ],
+                "recipeInstructions": [text(6, 15) for _ in range(rng.randint(3, 8))],
+                "dateCreated": "2023-01-01T10:00:00+00:00",
+                "dateModified": "2023-01-02T10:00:00+00:00",
+                "nutrition": {"@type": "NutritionInformation"},
+            }
+        )
+        for i in range(count)
+    ]
+    return recipes, vocabulary
+
+
+def measure(index: SearchIndex, queries: list[str]) -> dict[str, float]:
+    """Measure the latency of queries with warm caches.
+
+    :param index: The index to search.
+    :param queries: The queries.
+    :return: The median and 95th percentile in milliseconds.
+    """
+    for query in queries:
+        index.search(query)
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "median_ms": statistics.median(timings),
+        "p95_ms": statistics.quantiles(timings, n=20)[-1],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=20_000)
+    parser.add_argument("--vocabulary", type=int, default=5_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    recipes, vocabulary = generate_recipes(args.count, args.vocabulary)
+    start = time.perf_counter()
+    index = SearchIndex.from_recipes(recipes)
+    build = time.perf_counter() - start
+
+    rng = random.Random(1)
+    pairs = [
+        (rng.choice(vocabulary[:500]), rng.choice(vocabulary[:2000]))
+        for _ in range(args.queries)
+    ]
+    results = {
+        f"prefix {n}": measure(
+            index, [f"{first} {second[:n]}" for first, second in pairs]
+        )
+        for n in (1, 2, 3)
+    }
+    results["complete"] = measure(
+        index, [f"{first} {second}" for first, second in pairs]
+    )
+
+    if args.json:
+        print(json.dumps({"count": args.count, "build_seconds": build, **results}))
+        return
+
+    print(f"{args.count} recipes, {args.vocabulary} words, built in {build:.1f} s")
+    for name, result in results.items():
+        print(
+            f"  {name:<10} median {result['median_ms']:6.2f} ms"
+            f"  p95 {result['p95_ms']:6.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
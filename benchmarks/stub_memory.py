@@ -0,0 +1,81 @@
+"""Benchmark the memory used to hold recipe stub listings.
+
+Compares a list of RecipeStub objects as returned by get_recipes() with a
+:class:`~nextcloud_cookbook_api.compact.CompactRecipeStubs` holding the same stubs, measured with tracemalloc.
+
+Run with ``python -m benchmarks.stub_memory``.
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from benchmarks.stub_parsing import FakeResponse, generate_stubs
+from nextcloud_cookbook_api import endpoints
+from nextcloud_cookbook_api.compact import CompactRecipeStubs
+
+
+def retained_bytes(build: Callable[[], Any]) -> int:
+    """Measure the memory still allocated by the result of a function after it returned.
+
+    :param build: The function creating the object to measure.
+    :return: The number of bytes allocated by the object.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        result = build()
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=50_000)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    response = FakeResponse(json.dumps(generate_stubs(args.count)).encode())
+    stubs = endpoints.get_recipes().parse(response)
+
+    results = {
+        "list": retained_bytes(lambda: endpoints.get_recipes().parse(response)),
+        # built from stubs it owns, so the strings kept by the container are counted too
+        "compact": retained_bytes(
+            lambda: CompactRecipeStubs(endpoints.get_recipes().parse(response))
+        ),
+    }
+    compact = CompactRecipeStubs(stubs)
+    start = time.perf_counter()
+    for _ in compact:
+        pass
+    access = (time.perf_counter() - start) / args.count
+
+    if args.json:
+        print(
+            json.dumps(
+                {"count": args.count, "bytes": results, "access_seconds": access}
+            )
+        )
+        return
+
+    print(f"holding {args.count} recipe stubs:")
+    for name, size in results.items():
+        print(
+            f"  {name:<10} {size / 1e6:8.1f} MB  {size / args.count:8.0f} bytes/recipe"
+        )
+    print(f"  reduction  {results['list'] / results['compact']:8.1f}x")
+    print(f"  access     {access * 1e6:8.1f} us/stub from the compact container")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Benchmark parsing of recipe stub listings as returned by get_recipes().
+
+Compares the previous per-item parsing (``json.loads`` followed by ``RecipeStub.model_validate`` for each item, with
+the keyword splitting done for every item) with the current parsing of the raw response body in one shot.
+
+Run with ``python -m benchmarks.stub_parsing``.
+"""
+
+import argparse
+import json
+import random
+import timeit
+
+from pydantic import field_validator
+
+from nextcloud_cookbook_api import endpoints
+from nextcloud_cookbook_api.models import RecipeStub
+
+KEYWORDS = [
+    "vegetarian",
+    "vegan",
+    "pasta",
+    "dessert",
+    "quick",
+    "soup",
+    "italian",
+    "baking",
+    "breakfast",
+    "spicy",
+]
+
+
+class LegacyRecipeStub(RecipeStub):
+    """RecipeStub with the previous, uncached keyword splitting."""
+
+    @field_validator("keywords", mode="before")
+    @classmethod
+    def parse_keywords(cls, v):
+        if isinstance(v, str):
+            return [s.strip() for s in v.split(",") if s.strip()]
+        return v
+
+
+class FakeResponse:
+    def __init__(self, content: bytes) -> None:
+        self.content = content
+
+    def json(self) -> list:
+        return json.loads(self.content)
+
+
+def generate_stubs(count: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "id": str(i),
+            "name": f"Recipe {i}",
+            "keywords": ",".join(rng.sample(KEYWORDS, rng.randint(0, 4))),
+            "dateCreated": "2023-01-01T10:00:00+00:00",
+            "dateModified": "2023-01-02T10:00:00+00:00",
+            "imageUrl": f"/index.php/apps/cookbook/recipes/{i}/image?size=thumb",
+            "imagePlaceholderUrl": f"/index.php/apps/cookbook/recipes/{i}/image?size=thumb16",
+        }
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    response = FakeResponse(json.dumps(generate_stubs(args.count)).encode())
+
+    def per_item() -> list[RecipeStub]:
+        return [LegacyRecipeStub.model_validate(r) for r in response.json()]
+
+    def one_shot() -> list[RecipeStub]:
+        return endpoints.get_recipes().parse(response)
+
+    assert [s.model_dump() for s in per_item()] == [s.model_dump() for s in one_shot()]
+
+    results = {}
+    for name, func in (("per_item", per_item), ("one_shot", one_shot)):
+        results[name] = min(timeit.repeat(func, number=1, repeat=args.repeat))
+
+    if args.json:
+        print(json.dumps({"count": args.count, "seconds": results}))
+        return
+
+    print(f"parsing {args.count} recipe stubs (best of {args.repeat}):")
+    for name, seconds in results.items():
+        print(
+            f"  {name:<10} {seconds * 1000:8.1f} ms  {seconds / args.count * 1e6:6.2f} us/stub"
+        )
+    print(f"  speedup    {results['per_item'] / results['one_shot']:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""Benchmark the latency and throughput of the client against a local mock Cookbook server.
+
+Each benchmark runs for every recipe count against a fresh :class:`~benchmarks.mock_server.MockCookbookServer`, so no
+network or Nextcloud instance is needed. The results can be written as JSON and compared with an earlier run, e.g.
+to catch regressions between versions:
+
+    python -m benchmarks.suite --output before.json
+    python -m benchmarks.suite --compare before.json
+
+Run with ``python -m benchmarks.suite``.
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from typing import Any
+
+from benchmarks.mock_server import MockCookbookServer, recipe_stub
+from nextcloud_cookbook_api import __version__, endpoints
+from nextcloud_cookbook_api.client import CookbookClient
+
+
+class _Body:
+    """Minimal response object for benchmarking the parsing without network."""
+
+    def __init__(self, content: bytes) -> None:
+        self.content = content
+        self.text = content.decode()
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+def _percentile(values: list[float], percent: int) -> float:
+    if len(values) < 2:
+        return values[0]
+    return statistics.quantiles(values, n=100)[percent - 1]
+
+
+def measure(
+    name: str,
+    recipes: int,
+    func: Callable[[], Any],
+    operations: int,
+    repeat: int,
+    items_per_operation: int = 1,
+) -> dict[str, Any]:
+    """Run a benchmark several times and summarize the latencies of its operations.
+
+    :param name: The name of the benchmark.
+    :param recipes: The number of recipes on the server.
+    :param func: The function performing one operation.
+    :param operations: The number of operations per run.
+    :param repeat: The number of runs, the fastest one is reported.
+    :param items_per_operation: The number of items, e.g. recipes or bytes, handled per operation.
+    :return: The result of the benchmark.
+    """
+    runs = []
+    for _ in range(repeat):
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(operations):
+            op_start = time.perf_counter()
+            func()
+            latencies.append(time.perf_counter() - op_start)
+        runs.append((time.perf_counter() - start, latencies))
+
+    seconds, latencies = min(runs, key=lambda r: r[0])
+    return {
+        "benchmark": name,
+        "recipes": recipes,
+        "operations": operations,
+        "seconds": seconds,
+        "operations_per_second": operations / seconds,
+        "items_per_second": operations * items_per_operation / seconds,
+        "latency_ms": {
+            "p50": statistics.median(latencies) * 1000,
+            "p95": _percentile(latencies, 95) * 1000,
+            "max": max(latencies) * 1000,
+        },
+    }
+
+
+def run_suite(
+    counts: list[int],
+    requests: int,
+    max_workers: int,
+    repeat: int,
+    latency: float = 0.0,
+    auth_cost: float = 0.0,
+) -> list[dict[str, Any]]:
+    """Run all benchmarks for the given recipe counts.
+
+    :param counts: The numbers of recipes to benchmark with.
+    :param requests: The number of single-recipe, image and create requests per run.
+    :param max_workers: The number of workers of the bulk operations.
+    :param repeat: The number of runs of each benchmark.
+    :param latency: The simulated time in seconds the server takes per request.
+    :param auth_cost: The simulated time in seconds the server takes to verify the password of a request.
+    :return: The results of all benchmarks.
+    """
+    results = []
+    for count in counts:
+        with MockCookbookServer(
+            recipe_count=count, latency=latency, auth_cost=auth_cost
+        ) as server:
+            results += _run_benchmarks(server, requests, max_workers, repeat)
+    return results
+
+
+def _run_benchmarks(
+    server: MockCookbookServer,
+    requests: int,
+    max_workers: int,
+    repeat: int,
+) -> list[dict[str, Any]]:
+    count = len(server.state.recipes)
+    ids = list(server.state.recipes)
+    sample = itertools.cycle(ids[:requests])
+    stubs_body = _Body(
+        json.dumps([recipe_stub(r) for r in server.state.recipes.values()]).encode()
+    )
+    recipe_bodies = itertools.cycle(
+        [_Body(json.dumps(server.state.recipes[i]).encode()) for i in ids[:requests]]
+    )
+    image_size = len(server.state.images["full"])
+    new_recipes = [
+        endpoints.get_recipe("").parse(_Body(json.dumps(r).encode()))
+        for r in list(server.state.recipes.values())[:requests]
+    ]
+
+    with (
+        CookbookClient(server.base_url, "user", "password") as client,
+        CookbookClient(
+            server.base_url, "user", "password", session_auth=True
+        ) as session_client,
+    ):
+
+        def get_recipe() -> None:
+            client.get_recipe(next(sample))
+
+        def get_recipe_session_auth() -> None:
+            session_client.get_recipe(next(sample))
+
+        def get_image() -> None:
+            client.get_recipe_main_image(next(sample))
+
+        def get_recipes_full() -> None:
+            for result in client.get_recipes_full(ids, max_workers=max_workers):
+                assert result.ok, result.error
+
+        def create_recipe() -> None:
+            for recipe in new_recipes:
+                client.create_recipe(recipe)
+
+        def create_recipes() -> None:
+            for result in client.create_recipes(new_recipes, max_workers=max_workers):
+                assert result.ok, result.error
+
+        def parse_stubs() -> None:
+            endpoints.get_recipes().parse(stubs_body)
+
+        def parse_recipe() -> None:
+            endpoints.get_recipe("").parse(next(recipe_bodies))
+
+        return [
+            measure("get_recipes", count, client.get_recipes, 5, repeat, count),
+            measure("parse_recipe_stubs", count, parse_stubs, 5, repeat, count),
+            measure("get_recipe", count, get_recipe, requests, repeat),
+            measure(
+                "get_recipe_session_auth",
+                count,
+                get_recipe_session_auth,
+                requests,
+                repeat,
+            ),
+            measure("parse_recipe", count, parse_recipe, requests, repeat),
+            measure("get_recipes_full", count, get_recipes_full, 1, repeat, count),
+            measure(
+                "get_recipe_main_image", count, get_image, requests, repeat, image_size
+            ),
+            # last, as they add recipes to the server
+            measure("create_recipe", count, create_recipe, 1, repeat, requests),
+            measure("create_recipes", count, create_recipes, 1, repeat, requests),
+        ]
+
+
+def compare(results: list[dict], baseline: list[dict]) -> None:
+    """Print the change of throughput relative to a baseline.
+
+    :param results: The current results.
+    :param baseline: The results of an earlier run.
+    """
+    before = {(r["benchmark"], r["recipes"]): r for r in baseline}
+    print(
+        f"{'benchmark':<24} {'recipes':>7} {'before/s':>12} {'after/s':>12} {'change':>8}"
+    )
+    for result in results:
+        old = before.get((result["benchmark"], result["recipes"]))
+        if old is None:
+            continue
+        change = result["operations_per_second"] / old["operations_per_second"] - 1
+        print(
+            f"{result['benchmark']:<24} {result['recipes']:>7} "
+            f"{old['operations_per_second']:>12.1f} {result['operations_per_second']:>12.1f} "
+            f"{change:>+8.1%}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--counts",
+        type=lambda s: [int(c) for c in s.split(",")],
+        default=[100, 1_000, 10_000],
+        help="comma separated recipe counts",
+    )
+    parser.add_argument(
+        "--requests", type=int, default=200, help="single requests per run"
+    )
+    parser.add_argument("--max-workers", type=int, default=8)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="simulated server time per request in seconds",
+    )
+    parser.add_argument(
+        "--auth-cost",
+        type=float,
+        default=0.0,
+        help="simulated server time per password verification in seconds",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument(
+        "--compare", help="compare with the JSON results of an earlier run"
+    )
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    report = {
+        "version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "results": run_suite(
+            args.counts,
+            args.requests,
+            args.max_workers,
+            args.repeat,
+            args.latency,
+            args.auth_cost,
+        ),
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.compare:
+        with open(args.compare) as f:
+            compare(report["results"], json.load(f)["results"])
+    else:
+        print(
+            f"{'benchmark':<24} {'recipes':>7} {'ops/s':>10} {'items/s':>12} {'p50 ms':>8} {'p95 ms':>8}"
+        )
+        for r in report["results"]:
+            print(
+                f"{r['benchmark']:<24} {r['recipes']:>7} {r['operations_per_second']:>10.1f} "
+                f"{r['items_per_second']:>12.1f} {r['latency_ms']['p50']:>8.2f} "
+                f"{r['latency_ms']['p95']:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
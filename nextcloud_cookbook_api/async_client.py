@@ -0,0 +1,937 @@
+import asyncio
+import os
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterable, Mapping
+from contextlib import nullcontext
+from http import HTTPStatus
+from pathlib import Path
+from types import TracebackType
+from typing import BinaryIO, TypeVar
+from urllib.parse import urljoin
+
+from pydantic import ValidationError
+from typing_extensions import Self
+
+try:
+    import httpx
+except ImportError as e:  # pragma: no cover
+    msg = (
+        "The async client requires httpx, install it with "
+        "'pip install nextcloud-cookbook-api[async]'."
+    )
+    raise ImportError(msg) from e
+
+from nextcloud_cookbook_api import endpoints
+from nextcloud_cookbook_api.bulk import (
+    BulkResult,
+    IdempotencyStore,
+    Skipped,
+    keyed_recipes,
+    recipe_ids,
+    run_bulk_async,
+)
+from nextcloud_cookbook_api.cache import CacheEntry, ResponseCache
+from nextcloud_cookbook_api.coalesce import SingleFlight
+from nextcloud_cookbook_api.diff import RecipeDiff, diff_recipes
+from nextcloud_cookbook_api.endpoints import HttpMethod, ImageSize
+from nextcloud_cookbook_api.importer import ImportTracker
+from nextcloud_cookbook_api.instrumentation import (
+    Instrument,
+    Instrumentation,
+    RequestEvent,
+)
+from nextcloud_cookbook_api.models import (
+    Category,
+    Config,
+    Keyword,
+    LazyRecipe,
+    Recipe,
+    RecipeStub,
+)
+from nextcloud_cookbook_api.ratelimit import Governor
+from nextcloud_cookbook_api.retry import RetryPolicy
+from nextcloud_cookbook_api.streaming import JsonArrayParser
+from nextcloud_cookbook_api.timeouts import (
+    DEFAULT_TIMEOUT,
+    Deadline,
+    Timeout,
+    check_deadline,
+    fits_deadline,
+    resolve_timeout,
+)
+
+T = TypeVar("T")
+
+
+def _session_headers(headers: Mapping[str, str]) -> dict[str, str]:
+    # Nextcloud skips the CSRF check of cookie-authenticated requests which carry this header
+    return {**headers, "OCS-APIRequest": "true"}
+
+
+def _cached_response(entry: CacheEntry, url: str) -> httpx.Response:
+    """Build a response object from a cache entry.
+
+    :param entry: The cache entry.
+    :param url: The URL of the cached request.
+    :return: The response object.
+    """
+    return httpx.Response(
+        entry.status_code,
+        headers=entry.headers,
+        content=entry.content,
+        request=httpx.Request("GET", url),
+    )
+
+
+class AsyncCookbookClient:
+    """Asyncio API client for the Nextcloud Cookbook app.
+
+    Provides the same methods as :class:`CookbookClient <nextcloud_cookbook_api.client.CookbookClient>`, but all of
+    them are awaitable. HTTP errors are raised as :class:`httpx.HTTPStatusError`.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        username: str,
+        password: str,
+        pool_maxsize: int = 100,
+        keep_alive: bool = True,
+        transport: httpx.AsyncBaseTransport | None = None,
+        cache: ResponseCache | None = None,
+        retry: RetryPolicy | None = None,
+        governor: Governor | None = None,
+        timeout: Timeout | float | None = DEFAULT_TIMEOUT,
+        instruments: Iterable[Instrument] = (),
+        single_flight: SingleFlight | None = None,
+        session_auth: bool = False,
+    ) -> None:
+        """Create a new AsyncCookbookClient instance.
+
+        All requests are sent through a single long-lived connection pool. Call :meth:`close` or use the client as an
+        async context manager to release it.
+
+        :param base_url: The base URL of the Nextcloud instance.
+        :param username: The username for authentication.
+        :param password: The password for authentication.
+        :param pool_maxsize: The maximum number of concurrent connections.
+        :param keep_alive: Whether connections should be kept open and reused between requests.
+        :param transport: An optional custom httpx transport, e.g. for testing.
+        :param cache: An optional cache for GET responses.
+        :param retry: The policy for retrying transient failures. By default, GET, PUT and DELETE requests are
+            retried up to two times on connection errors and 429, 502, 503 and 504 responses.
+        :param governor: An optional rate and concurrency limiter, which may be shared with other clients.
+        :param timeout: The connect and read timeouts of each request in seconds, or None to wait forever. Use
+            :func:`~nextcloud_cookbook_api.timeouts.override_timeout` to change them for some calls.
+        :param instruments: Hooks notified about each API call with its timings, see
+            :mod:`~nextcloud_cookbook_api.instrumentation`.
+        :param single_flight: An optional coalescing of concurrent identical GET requests, which may be shared with
+            other clients. The callers of coalesced requests receive the same result objects.
+        :param session_auth: Whether to send the password only until Nextcloud returned a session cookie, and
+            authenticate later requests with the cookie. Nextcloud verifies the password hash on each request
+            authenticated with it, which the session avoids. When the session expires, the client logs in again. If
+            the server rejects the session it just issued, the client falls back to sending the password with every
+            request.
+        """
+        self.base_url = base_url
+        self.username = username
+        self.password = password
+        self.cache = cache
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.governor = governor if governor is not None else Governor()
+        self.timeout = Timeout.of(timeout)
+        self.instrumentation = Instrumentation(instruments)
+        self.single_flight = single_flight
+        self.session_auth = session_auth
+        # the state of the cookie session, shared by all concurrent requests of the client
+        self._session_active = False
+        self._session_confirmed = False
+        self._session_generation = 0
+        self._session_lock = threading.Lock()
+
+        limits = httpx.Limits(
+            max_connections=pool_maxsize,
+            max_keepalive_connections=pool_maxsize if keep_alive else 0,
+        )
+        self._client = httpx.AsyncClient(limits=limits, transport=transport)
+
+    async def close(self) -> None:
+        """Close the underlying connection pool."""
+        await self._client.aclose()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    async def _make_request(
+        self,
+        method: HttpMethod,
+        path: str,
+        **kwargs,
+    ) -> httpx.Response:
+        """Handle all requests to the Cookbook API with authentication.
+
+        Non-streaming GET requests are answered from the response cache if one is configured. Successful modifying
+        requests invalidate the cache.
+
+        :param method: The HTTP method to use for the request (GET, POST, PUT, DELETE).
+        :param path: The API endpoint path to request.
+        :param kwargs: Additional keyword arguments to pass to the httpx library.
+        :return: The response object from the API request.
+        """
+        url = urljoin(self.base_url, path)
+
+        if self.cache is None or kwargs.get("stream"):
+            return await self._send(method, url, **kwargs)
+
+        if method != "GET":
+            response = await self._send(method, url, **kwargs)
+            if response.is_success:
+                self.cache.invalidate()
+            return response
+
+        key = self.cache.key(url, kwargs.get("params"), self.username)
+        entry, fresh = self.cache.lookup(key)
+        if entry is not None and fresh:
+            return _cached_response(entry, url)
+        if entry is not None:
+            kwargs["headers"] = {
+                **kwargs.get("headers", {}),
+                **self.cache.conditional_headers(entry),
+            }
+
+        response = await self._send(method, url, **kwargs)
+        if entry is not None and response.status_code == HTTPStatus.NOT_MODIFIED:
+            return _cached_response(self.cache.revalidated(key, entry), url)
+        self.cache.store(key, response.status_code, response.headers, response.content)
+        return response
+
+    async def _send(
+        self,
+        method: HttpMethod,
+        url: str,
+        stream: bool = False,
+        **kwargs,
+    ) -> httpx.Response:
+        """Send an authenticated request through the connection pool, retrying transient failures.
+
+        :param method: The HTTP method to use for the request.
+        :param url: The absolute URL to request.
+        :param stream: If True, the body is not read and the response must be closed by the caller.
+        :param kwargs: Additional keyword arguments to pass to the httpx library.
+        :return: The response object from the API request.
+        """
+        auth = httpx.BasicAuth(self.username, self.password)
+        headers = kwargs.pop("headers", None) or {}
+
+        attempt = 1
+        while True:
+            session = self._current_session()
+            with_session = session is not None
+            try:
+                # the body of a streamed response is read after the slot is released
+                async with self.governor.acquire_async(method, url):
+                    timeout = resolve_timeout(self.timeout)
+                    request = self._client.build_request(
+                        method,
+                        url,
+                        timeout=httpx.Timeout(timeout.read, connect=timeout.connect),
+                        headers=_session_headers(headers) if with_session else headers,
+                        **kwargs,
+                    )
+                    response = await self._client.send(
+                        request, auth=None if with_session else auth, stream=stream
+                    )
+            except httpx.TransportError:
+                check_deadline()
+                delay = self.retry.backoff(attempt)
+                if not (self.retry.can_retry(method, attempt) and fits_deadline(delay)):
+                    raise
+            else:
+                if response.status_code == HTTPStatus.UNAUTHORIZED and with_session:
+                    self._drop_session(session)
+                    await response.aclose()
+                    continue
+                self._track_session(session, response)
+                if not (
+                    self.retry.should_retry_status(response.status_code)
+                    and self.retry.can_retry(method, attempt)
+                ):
+                    return response
+                delay = self.retry.backoff(attempt, response.headers.get("Retry-After"))
+                if not fits_deadline(delay):
+                    return response
+                await response.aclose()
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _current_session(self) -> int | None:
+        """Get the generation of the cookie session the next request is authenticated with.
+
+        :return: The generation, or None if the request has to send the password.
+        """
+        with self._session_lock:
+            return self._session_generation if self._session_active else None
+
+    def _drop_session(self, generation: int) -> None:
+        """Stop using a cookie session the server answered with 401 Unauthorized.
+
+        Concurrent requests may have been rejected with the same session, or a new session may have been started
+        since, so only the first rejection of the current session changes the state.
+
+        :param generation: The generation of the rejected session.
+        """
+        with self._session_lock:
+            if not self._session_active or generation != self._session_generation:
+                return
+            self._session_active = False
+            if not self._session_confirmed:
+                # the server rejects the session it just issued, so keep sending the password
+                self.session_auth = False
+            # otherwise the session expired, log in with the password again
+
+    def _track_session(self, generation: int | None, response: httpx.Response) -> None:
+        """Update the state of the cookie session after a response.
+
+        :param generation: The generation of the session the request was authenticated with, or None if it sent the
+            password.
+        :param response: The response.
+        """
+        if generation is None and not (self.session_auth and response.cookies):
+            return
+        with self._session_lock:
+            if generation is not None:
+                if generation == self._session_generation:
+                    self._session_confirmed = True
+            elif self.session_auth and not self._session_active:
+                self._session_generation += 1
+                self._session_active = response.status_code != HTTPStatus.UNAUTHORIZED
+                self._session_confirmed = False
+
+    async def _call(self, call: endpoints.ApiCall[T]) -> T:
+        """Perform an API call, sharing the request and result with identical calls in flight if coalescing is on.
+
+        :param call: The API call to perform.
+        :return: The parsed response.
+        :raises httpx.HTTPStatusError: If the server responded with an error status code.
+        """
+        key = call.coalescing_key()
+        if self.single_flight is None or key is None:
+            return await self._call_once(call)
+        return await self.single_flight.do_async(
+            (self.base_url, self.username, key), lambda: self._call_once(call)
+        )
+
+    async def _call_once(self, call: endpoints.ApiCall[T]) -> T:
+        """Send the request described by an API call, raise on HTTP errors and parse the response.
+
+        :param call: The API call to perform.
+        :return: The parsed response.
+        :raises httpx.HTTPStatusError: If the server responded with an error status code.
+        """
+        if not self.instrumentation:
+            response = await self._make_request(call.method, call.path, **call.kwargs)
+            response.raise_for_status()
+            return call.parse(response)
+
+        with self.instrumentation.track(call) as event:
+            start = time.perf_counter()
+            response = await self._make_request(call.method, call.path, **call.kwargs)
+            event.network_seconds = time.perf_counter() - start
+            event.status_code = response.status_code
+            event.bytes_received = len(response.content)
+            response.raise_for_status()
+            start = time.perf_counter()
+            result = call.parse(response)
+            event.parse_seconds = time.perf_counter() - start
+            return result
+
+    async def get_keywords(self) -> list[Keyword]:
+        """Retrieve all available keywords.
+
+        :return: A list of keyword strings.
+        """
+        return await self._call(endpoints.get_keywords())
+
+    async def search_recipes_by_keywords(self, keywords: list[str]) -> list[RecipeStub]:
+        """Search recipes by keyword(s).
+
+        :param keywords: The keywords to search for.
+        :return: A list of RecipeStub objects matching the search query.
+        """
+        return await self._call(endpoints.search_recipes_by_keywords(keywords))
+
+    async def get_categories(self) -> list[Category]:
+        """Retrieve all available categories.
+
+        :return: A list of Category objects.
+        """
+        return await self._call(endpoints.get_categories())
+
+    async def get_recipes_by_category(self, category: str | None) -> list[RecipeStub]:
+        """Retrieve recipes belonging to a specific category.
+
+        :param category: The name of the category. If None, all recipes without a category are returned.
+        :return: A list of RecipeStub objects belonging to the specified category.
+        """
+        return await self._call(endpoints.get_recipes_by_category(category))
+
+    async def rename_category(self, old_name: str, new_name: str) -> None:
+        """Rename a category.
+
+        :param old_name: The current name of the category.
+        :param new_name: The new name for the category.
+        :raises ValueError: If the category with the old name does not exist.
+        """
+        if old_name == new_name:
+            return
+
+        # check if the category with the old name exists, there is no server-side validation for this
+        categories = await self.get_categories()
+        if not any(c.name == old_name for c in categories):
+            msg = f"Category '{old_name}' does not exist."
+            raise ValueError(msg)
+
+        await self._call(endpoints.rename_category(old_name, new_name))
+
+    async def import_recipe(self, url: str) -> Recipe:
+        """Import a recipe from a URL.
+
+        :param url: The URL of the recipe to import.
+        :return: The imported Recipe object.
+        """
+        return await self._call(endpoints.import_recipe(url))
+
+    async def import_recipes(
+        self,
+        urls: Iterable[str],
+        max_concurrency: int = 4,
+        ordered: bool = False,
+        existing: Mapping[str, str] | None = None,
+        checkpoint: IdempotencyStore | None = None,
+        deadline: float | None = None,
+    ) -> AsyncIterator[BulkResult[str]]:
+        """Import recipes from many URLs concurrently.
+
+        URLs whose recipe exists already are skipped, see :meth:`CookbookClient.import_recipes`.
+
+        :param urls: The URLs of the recipes to import.
+        :param max_concurrency: The maximum number of concurrent imports. The server scrapes each URL while the request
+            is open, so keep it low.
+        :param ordered: If True, results are yielded in the order of the input, otherwise as soon as they complete.
+        :param existing: The IDs of the existing recipes by their source URLs, e.g. from
+            :meth:`RecipeMirror.get_recipe_urls`. By default they are fetched with :meth:`get_recipe_urls`.
+        :param checkpoint: The store recording the IDs of the imported recipes by URL.
+        :param deadline: The time budget of the whole batch in seconds, starting now. URLs which could not be imported
+            in time fail with :class:`~nextcloud_cookbook_api.timeouts.DeadlineExceeded`.
+        :return: An async iterator over BulkResult objects for each URL, holding either the ID of the new recipe, the
+            ID of the existing recipe of a skipped URL if known, or the error.
+        """
+        if existing is None:
+            existing = await self.get_recipe_urls()
+        tracker = ImportTracker(existing, checkpoint)
+
+        async def import_url(url: str) -> str | Skipped[str]:
+            skipped = tracker.claim(url)
+            if skipped is not None:
+                return skipped
+            try:
+                recipe = await self.import_recipe(url)
+            except httpx.HTTPStatusError as e:
+                tracker.release(url)
+                if e.response.status_code == HTTPStatus.CONFLICT:
+                    return Skipped()
+                raise
+            except BaseException:
+                tracker.release(url)
+                raise
+            tracker.done(url, recipe.id)
+            return recipe.id
+
+        async for result in run_bulk_async(
+            import_url,
+            urls,
+            key=str,
+            errors=(httpx.HTTPError, ValidationError),
+            max_concurrency=max_concurrency,
+            ordered=ordered,
+            deadline=Deadline(deadline) if deadline is not None else None,
+        ):
+            yield result
+
+    async def get_recipe_main_image(
+        self,
+        recipe_id: str,
+        size: ImageSize = "full",
+    ) -> bytes:
+        """Get the main image of a recipe.
+
+        The whole image is held in memory, use :meth:`iter_recipe_main_image` or :meth:`download_recipe_main_image`
+        for large images.
+
+        :return: The image bytes.
+        """
+        return b"".join([c async for c in self.iter_recipe_main_image(recipe_id, size)])
+
+    async def iter_recipe_main_image(
+        self,
+        recipe_id: str,
+        size: ImageSize = "full",
+        chunk_size: int = 64 * 1024,
+        offset: int = 0,
+    ) -> AsyncIterator[bytes]:
+        """Stream the main image of a recipe in chunks.
+
+        The request is sent when the iteration starts and the connection is released when it ends.
+
+        :param recipe_id: The ID of the recipe.
+        :param size: The size of the image.
+        :param chunk_size: The maximum size of each chunk in bytes.
+        :param offset: The byte offset to start at, requested with a Range header to resume a download.
+        :return: An async iterator over the chunks of the image.
+        :raises httpx.HTTPStatusError: If the server responded with an error status code.
+        """
+        call = endpoints.get_recipe_main_image(recipe_id, size, offset)
+        track = (
+            self.instrumentation.track(call) if self.instrumentation else nullcontext()
+        )
+        with track as event:
+            async for chunk in self._iter_image_response(
+                call, offset, chunk_size, event
+            ):
+                yield chunk
+
+    async def _iter_image_response(
+        self,
+        call: endpoints.ApiCall[bytes],
+        offset: int,
+        chunk_size: int,
+        event: RequestEvent | None,
+    ) -> AsyncIterator[bytes]:
+        response = await self._make_request(
+            call.method, call.path, stream=True, **call.kwargs
+        )
+        try:
+            if event is not None:
+                event.status_code = response.status_code
+            if (
+                offset
+                and response.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+            ):
+                # the offset is at the end of the image, there is nothing left to download
+                return
+            response.raise_for_status()
+            skip = endpoints.range_bytes_to_skip(response.status_code, offset)
+            async for chunk in response.aiter_bytes(chunk_size):
+                if event is not None:
+                    event.bytes_received += len(chunk)
+                if skip >= len(chunk):
+                    skip -= len(chunk)
+                    continue
+                yield chunk[skip:]
+                skip = 0
+        finally:
+            await response.aclose()
+
+    async def download_recipe_main_image(
+        self,
+        recipe_id: str,
+        target: str | os.PathLike | BinaryIO,
+        size: ImageSize = "full",
+        chunk_size: int = 64 * 1024,
+        resume: bool = False,
+    ) -> int:
+        """Download the main image of a recipe to a file without holding it in memory.
+
+        :param recipe_id: The ID of the recipe.
+        :param target: The path of the file to write, or a binary file-like object.
+        :param size: The size of the image.
+        :param chunk_size: The maximum size of each chunk in bytes.
+        :param resume: If True, continue a partial download instead of starting over. The current size of the file
+            at the path, or the current position of the file-like object, is used as the start offset.
+        :return: The number of bytes written.
+        :raises httpx.HTTPStatusError: If the server responded with an error status code.
+        """
+        if not isinstance(target, (str, os.PathLike)):
+            offset = target.tell() if resume else 0
+            written = 0
+            async for chunk in self.iter_recipe_main_image(
+                recipe_id, size, chunk_size, offset
+            ):
+                # file writes may block, so they are moved off the event loop
+                await asyncio.to_thread(target.write, chunk)
+                written += len(chunk)
+            return written
+
+        path = Path(target)
+        offset = path.stat().st_size if resume and path.exists() else 0
+        f = await asyncio.to_thread(path.open, "ab" if offset else "wb")
+        try:
+            return await self.download_recipe_main_image(
+                recipe_id, f, size, chunk_size, resume=bool(offset)
+            )
+        finally:
+            await asyncio.to_thread(f.close)
+
+    async def search_recipes(self, query: str) -> list[RecipeStub]:
+        """Search for recipes with categories, keywords, or names matching the search query.
+
+        :param query: The search query, separated with spaces and/or commas.
+        :return: A list of RecipeStub objects matching the search query.
+        """
+        return await self._call(endpoints.search_recipes(query))
+
+    async def get_recipes(self) -> list[RecipeStub]:
+        """Retrieve all recipes from the cookbook.
+
+        :return: A list of RecipeStub objects representing all recipes.
+        """
+        return await self._call(endpoints.get_recipes())
+
+    async def iter_recipes(
+        self, chunk_size: int = 64 * 1024
+    ) -> AsyncIterator[RecipeStub]:
+        """Retrieve all recipes one at a time while the response is parsed incrementally.
+
+        Unlike :meth:`get_recipes`, neither the response body nor the whole list are held in memory, so the memory use
+        does not grow with the size of the cookbook. The response is never cached. The request is sent when the
+        iteration starts and the connection is released when it ends.
+
+        :param chunk_size: The maximum size of each chunk read from the response in bytes.
+        :return: An async iterator over RecipeStub objects representing all recipes.
+        :raises httpx.HTTPStatusError: If the server responded with an error status code.
+        :raises ValueError: If the response is not a JSON array of recipe stubs.
+        """
+        async for stub in self._iter_recipe_stubs(endpoints.get_recipes(), chunk_size):
+            yield stub
+
+    async def iter_search_recipes(
+        self, query: str, chunk_size: int = 64 * 1024
+    ) -> AsyncIterator[RecipeStub]:
+        """Search for recipes like :meth:`search_recipes`, parsing the response incrementally like :meth:`iter_recipes`.
+
+        :param query: The search query, separated with spaces and/or commas.
+        :param chunk_size: The maximum size of each chunk read from the response in bytes.
+        :return: An async iterator over RecipeStub objects matching the search query.
+        :raises httpx.HTTPStatusError: If the server responded with an error status code.
+        :raises ValueError: If the response is not a JSON array of recipe stubs.
+        """
+        async for stub in self._iter_recipe_stubs(
+            endpoints.search_recipes(query), chunk_size
+        ):
+            yield stub
+
+    async def _iter_recipe_stubs(
+        self, call: endpoints.ApiCall[list[RecipeStub]], chunk_size: int
+    ) -> AsyncIterator[RecipeStub]:
+        track = (
+            self.instrumentation.track(call) if self.instrumentation else nullcontext()
+        )
+        with track as event:
+            response = await self._make_request(
+                call.method, call.path, stream=True, **call.kwargs
+            )
+            try:
+                if event is not None:
+                    event.status_code = response.status_code
+                response.raise_for_status()
+                parser = JsonArrayParser()
+                async for chunk in response.aiter_bytes(chunk_size):
+                    if event is not None:
+                        event.bytes_received += len(chunk)
+                    for item in parser.feed(chunk):
+                        yield RecipeStub.model_validate(item)
+                for item in parser.close():
+                    yield RecipeStub.model_validate(item)
+            finally:
+                await response.aclose()
+
+    async def create_recipe(self, recipe: Recipe) -> str:
+        """Create a new recipe in the cookbook.
+
+        :param recipe: The Recipe object to create.
+        :return: The ID of the newly created recipe.
+        """
+        return await self._call(endpoints.create_recipe(recipe))
+
+    def create_recipes(
+        self,
+        recipes: Iterable[Recipe],
+        max_concurrency: int = 8,
+        ordered: bool = True,
+        deadline: float | None = None,
+        idempotency_key: Callable[[Recipe], str] | None = None,
+        idempotency_store: IdempotencyStore | None = None,
+    ) -> AsyncIterator[BulkResult[str]]:
+        """Create many recipes concurrently.
+
+        Errors are collected per recipe, so a single failing recipe does not abort the whole batch. Recipes whose key
+        is in the idempotency store are skipped, see :meth:`CookbookClient.create_recipes`.
+
+        :param recipes: The recipes to create.
+        :param max_concurrency: The maximum number of concurrent requests.
+        :param ordered: If True, results are yielded in the order of the input, otherwise as soon as they complete.
+        :param deadline: The time budget of the whole batch in seconds, starting now. Recipes which could not be
+            created in time fail with :class:`~nextcloud_cookbook_api.timeouts.DeadlineExceeded`.
+        :param idempotency_key: A function returning the key of a recipe, used as the ID of its result. If None, the
+            position of the recipe in the input is used.
+        :param idempotency_store: The store remembering the created recipes by key. Requires ``idempotency_key``.
+        :return: An async iterator over BulkResult objects holding either the new recipe ID or the error for each
+            recipe.
+        :raises ValueError: If two recipes have the same key, or a store is given without a key function.
+        """
+        if idempotency_store is not None and idempotency_key is None:
+            msg = "An idempotency store requires an idempotency key function."
+            raise ValueError(msg)
+        store = idempotency_store
+
+        async def create(item: tuple[str, Recipe]) -> str | Skipped[str]:
+            key, recipe = item
+            if store is not None:
+                existing = store.get(key)
+                if existing is not None:
+                    return Skipped(existing)
+            recipe_id = await self.create_recipe(recipe)
+            if store is not None:
+                store.record(key, recipe_id)
+            return recipe_id
+
+        return run_bulk_async(
+            create,
+            keyed_recipes(recipes, idempotency_key),
+            key=lambda item: item[0],
+            errors=(httpx.HTTPError,),
+            max_concurrency=max_concurrency,
+            ordered=ordered,
+            deadline=Deadline(deadline) if deadline is not None else None,
+        )
+
+    async def get_recipe(self, id: str) -> Recipe:
+        """Retrieve a recipe by its ID.
+
+        :param id: The ID of the recipe to retrieve.
+        :return: The Recipe object representing the retrieved recipe.
+        """
+        return await self._call(endpoints.get_recipe(id))
+
+    async def get_recipe_lazy(self, id: str) -> LazyRecipe:
+        """Retrieve a recipe by its ID without validating it upfront.
+
+        Each field is validated on first access, which is cheaper if only a few fields are used.
+
+        :param id: The ID of the recipe to retrieve.
+        :return: The LazyRecipe view of the retrieved recipe.
+        """
+        return await self._call(endpoints.get_recipe_lazy(id))
+
+    def get_recipes_full(
+        self,
+        recipes: Iterable[str | RecipeStub],
+        max_concurrency: int = 8,
+        ordered: bool = True,
+        deadline: float | None = None,
+    ) -> AsyncIterator[BulkResult[Recipe]]:
+        """Retrieve many full recipes concurrently.
+
+        Errors are collected per recipe, so a single failing recipe does not abort the whole batch.
+
+        :param recipes: The IDs of the recipes to retrieve, or RecipeStub objects as returned by :meth:`get_recipes`.
+        :param max_concurrency: The maximum number of concurrent requests.
+        :param ordered: If True, results are yielded in the order of the input, otherwise as soon as they complete.
+        :param deadline: The time budget of the whole batch in seconds, starting now. Recipes which could not be
+            retrieved in time fail with :class:`~nextcloud_cookbook_api.timeouts.DeadlineExceeded`.
+        :return: An async iterator over BulkResult objects holding either the Recipe or the error for each ID.
+        """
+        return run_bulk_async(
+            self.get_recipe,
+            recipe_ids(recipes),
+            key=str,
+            errors=(httpx.HTTPError, ValidationError),
+            max_concurrency=max_concurrency,
+            ordered=ordered,
+            deadline=Deadline(deadline) if deadline is not None else None,
+        )
+
+    async def get_recipe_urls(self, max_concurrency: int = 8) -> dict[str, str]:
+        """Get the source URLs of all recipes.
+
+        The recipe stubs do not contain the URL, so every recipe is retrieved. Recipes which could not be retrieved
+        are left out.
+
+        :param max_concurrency: The maximum number of concurrent requests.
+        :return: The IDs of the recipes by their source URLs.
+        """
+        results = self.get_recipes_full(
+            await self.get_recipes(), max_concurrency=max_concurrency, ordered=False
+        )
+        return {r.value.url: r.id async for r in results if r.ok and r.value.url}
+
+    async def update_recipe(self, id, recipe: Recipe) -> None:
+        """Update an existing recipe.
+
+        :param id: The ID of the recipe to update.
+        :param recipe: The updated Recipe object.
+        """
+        await self._call(endpoints.update_recipe(id, recipe))
+
+    def update_recipes(
+        self,
+        recipes: Iterable[Recipe],
+        max_concurrency: int = 8,
+        ordered: bool = True,
+        deadline: float | None = None,
+    ) -> AsyncIterator[BulkResult[None]]:
+        """Update many existing recipes concurrently, each identified by its ``id``.
+
+        Errors are collected per recipe, so a single failing recipe does not abort the whole batch.
+
+        :param recipes: The updated Recipe objects.
+        :param max_concurrency: The maximum number of concurrent requests.
+        :param ordered: If True, results are yielded in the order of the input, otherwise as soon as they complete.
+        :param deadline: The time budget of the whole batch in seconds, starting now. Recipes which could not be
+            updated in time fail with :class:`~nextcloud_cookbook_api.timeouts.DeadlineExceeded`.
+        :return: An async iterator over BulkResult objects holding the error, if any, for each recipe ID.
+        """
+        return run_bulk_async(
+            lambda recipe: self.update_recipe(recipe.id, recipe),
+            recipes,
+            key=lambda recipe: recipe.id,
+            errors=(httpx.HTTPError,),
+            max_concurrency=max_concurrency,
+            ordered=ordered,
+            deadline=Deadline(deadline) if deadline is not None else None,
+        )
+
+    async def update_recipe_if_changed(
+        self,
+        id: str,
+        recipe: Recipe,
+        base: Recipe | None = None,
+        dry_run: bool = False,
+    ) -> RecipeDiff:
+        """Update an existing recipe only if it differs from its last known state.
+
+        The recipe is compared field by field with ``base``, or with the recipe fetched from the server, which is
+        answered from the response cache if one is configured. The fields set by the server on every write, like
+        ``date_modified``, are not compared. Unchanged recipes are not written, so the server neither rewrites their
+        files nor reindexes them.
+
+        :param id: The ID of the recipe to update.
+        :param recipe: The updated Recipe object.
+        :param base: The last known state of the recipe, e.g. the recipe as fetched before modifying it. If None, it
+            is fetched with :meth:`get_recipe`.
+        :param dry_run: If True, only compare the recipes without sending the update.
+        :return: The changed fields and whether the update was sent.
+        """
+        if base is None:
+            base = await self.get_recipe(id)
+        diff = RecipeDiff(id, diff_recipes(base, recipe))
+        if diff.changed and not dry_run:
+            await self.update_recipe(id, recipe)
+            diff.written = True
+        return diff
+
+    def update_recipes_if_changed(
+        self,
+        recipes: Iterable[Recipe],
+        base: Mapping[str, Recipe] | None = None,
+        dry_run: bool = False,
+        max_concurrency: int = 8,
+        ordered: bool = True,
+        deadline: float | None = None,
+    ) -> AsyncIterator[BulkResult[RecipeDiff]]:
+        """Update many existing recipes concurrently, skipping those which did not change.
+
+        Each recipe, identified by its ``id``, is updated like with :meth:`update_recipe_if_changed`. With
+        ``dry_run``, the results report the changes a batch would make without writing anything.
+
+        :param recipes: The updated Recipe objects.
+        :param base: The last known states of the recipes by ID. Recipes not in it are fetched.
+        :param dry_run: If True, only compare the recipes without sending the updates.
+        :param max_concurrency: The maximum number of concurrent requests.
+        :param ordered: If True, results are yielded in the order of the input, otherwise as soon as they complete.
+        :param deadline: The time budget of the whole batch in seconds, starting now. Recipes which could not be
+            updated in time fail with :class:`~nextcloud_cookbook_api.timeouts.DeadlineExceeded`.
+        :return: An async iterator over BulkResult objects holding either the changes or the error for each recipe ID.
+        """
+        known = base if base is not None else {}
+        return run_bulk_async(
+            lambda recipe: self.update_recipe_if_changed(
+                recipe.id, recipe, known.get(recipe.id), dry_run
+            ),
+            recipes,
+            key=lambda recipe: recipe.id,
+            errors=(httpx.HTTPError, ValidationError),
+            max_concurrency=max_concurrency,
+            ordered=ordered,
+            deadline=Deadline(deadline) if deadline is not None else None,
+        )
+
+    async def delete_recipe(self, id: str) -> None:
+        """Delete a recipe by its ID.
+
+        :param id: The ID of the recipe to delete.
+        """
+        await self._call(endpoints.delete_recipe(id))
+
+    def delete_recipes(
+        self,
+        recipes: Iterable[str | RecipeStub],
+        max_concurrency: int = 8,
+        ordered: bool = True,
+        deadline: float | None = None,
+    ) -> AsyncIterator[BulkResult[None]]:
+        """Delete many recipes concurrently.
+
+        Errors are collected per recipe, so a single failing recipe does not abort the whole batch.
+
+        :param recipes: The IDs of the recipes to delete, or RecipeStub objects as returned by :meth:`get_recipes`.
+        :param max_concurrency: The maximum number of concurrent requests.
+        :param ordered: If True, results are yielded in the order of the input, otherwise as soon as they complete.
+        :param deadline: The time budget of the whole batch in seconds, starting now. Recipes which could not be
+            deleted in time fail with :class:`~nextcloud_cookbook_api.timeouts.DeadlineExceeded`.
+        :return: An async iterator over BulkResult objects holding the error, if any, for each recipe ID.
+        """
+        return run_bulk_async(
+            self.delete_recipe,
+            recipe_ids(recipes),
+            key=str,
+            errors=(httpx.HTTPError,),
+            max_concurrency=max_concurrency,
+            ordered=ordered,
+            deadline=Deadline(deadline) if deadline is not None else None,
+        )
+
+    async def get_ocr_capabilities(self) -> dict:
+        """Get the capabilities of the Nextcloud instance.
+
+        :return: A dictionary containing the capabilities.
+        """
+        return await self._call(endpoints.get_ocr_capabilities())
+
+    async def trigger_reindex(self) -> None:
+        """Trigger a rescan of all recipes into the caching database."""
+        await self._call(endpoints.trigger_reindex())
+
+    async def get_config(self) -> Config:
+        """Get the current configuration of the cookbook app.
+
+        :return: The Config object.
+        """
+        return await self._call(endpoints.get_config())
+
+    async def set_config(self, config: Config) -> None:
+        """Set the current configuration of the cookbook app for the current user.
+
+        :param config: The Config object to set.
+        """
+        await self._call(endpoints.set_config(config))
@@ -0,0 +1,263 @@
+"""Helpers for running many API calls concurrently and collecting their results per item."""
+
+import asyncio
+import json
+import os
+import threading
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Generic, TypeVar
+
+from nextcloud_cookbook_api import timeouts
+from nextcloud_cookbook_api.models import Recipe, RecipeStub
+from nextcloud_cookbook_api.timeouts import Deadline, DeadlineExceeded
+
+T = TypeVar("T")
+K = TypeVar("K")
+
+
+@dataclass
+class BulkResult(Generic[T]):
+    """The outcome of a single item of a bulk operation."""
+
+    id: str
+    value: T | None = None
+    error: Exception | None = None
+    skipped: bool = False
+    """Whether the item needed no request, e.g. because it was already done in an earlier run."""
+
+    @property
+    def ok(self) -> bool:
+        """Whether the operation for this item succeeded."""
+        return self.error is None
+
+
+@dataclass(frozen=True)
+class Skipped(Generic[T]):
+    """Returned by the function of a bulk operation for an item that did not need to be processed."""
+
+    value: T | None = None
+
+
+def recipe_ids(recipes: Iterable[str | RecipeStub]) -> list[str]:
+    """Normalize an iterable of recipe IDs and/or recipe stubs into a list of IDs.
+
+    :param recipes: The recipe IDs or RecipeStub objects.
+    :return: The list of recipe IDs.
+    """
+    return [r.id if isinstance(r, RecipeStub) else str(r) for r in recipes]
+
+
+def keyed_recipes(
+    recipes: Iterable[Recipe], key: Callable[[Recipe], str] | None
+) -> list[tuple[str, Recipe]]:
+    """Pair recipes with the identifiers of their bulk results.
+
+    :param recipes: The recipes.
+    :param key: A function returning the idempotency key of a recipe. If None, the position of the recipe is used.
+    :return: The list of identifiers and recipes.
+    :raises ValueError: If two recipes have the same key.
+    """
+    if key is None:
+        return [(str(i), r) for i, r in enumerate(recipes)]
+    items = [(key(r), r) for r in recipes]
+    seen = set()
+    for k, _ in items:
+        if k in seen:
+            msg = f"Duplicate idempotency key '{k}'."
+            raise ValueError(msg)
+        seen.add(k)
+    return items
+
+
+class IdempotencyStore:
+    """Remember the IDs of created recipes by a caller-supplied key, so a re-run can skip them.
+
+    With a path, every ID is appended to a JSON lines file as soon as the recipe was created, so the store survives
+    crashes. A recipe whose request succeeded but was not recorded before a crash is created again on the next run.
+    """
+
+    def __init__(self, path: str | os.PathLike | None = None) -> None:
+        """Create a new IdempotencyStore instance.
+
+        :param path: The file to persist the store in, loaded if it exists. If None, the store is kept in memory.
+        """
+        self.path = Path(path) if path is not None else None
+        self._ids: dict[str, str] = {}
+        self._lock = threading.Lock()
+        if self.path is not None and self.path.exists():
+            with self.path.open(encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # the last line may be incomplete after a crash
+                        continue
+                    self._ids[entry["key"]] = entry["id"]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._ids
+
+    def get(self, key: str) -> str | None:
+        """Get the ID of the recipe created for a key.
+
+        :param key: The idempotency key.
+        :return: The recipe ID, or None if no recipe was created for the key.
+        """
+        return self._ids.get(key)
+
+    def record(self, key: str, recipe_id: str) -> None:
+        """Remember the ID of the recipe created for a key.
+
+        :param key: The idempotency key.
+        :param recipe_id: The ID of the created recipe.
+        """
+        with self._lock:
+            self._ids[key] = recipe_id
+            if self.path is not None:
+                with self.path.open("a", encoding="utf-8") as f:
+                    f.write(json.dumps({"key": key, "id": recipe_id}) + "\n")
+
+
+def run_bulk(
+    func: Callable[[K], T | Skipped[T]],
+    items: Iterable[K],
+    key: Callable[[K], str],
+    errors: tuple[type[Exception], ...],
+    max_workers: int = 8,
+    ordered: bool = True,
+    deadline: Deadline | None = None,
+) -> Iterator[BulkResult[T]]:
+    """Run a function for every item in a bounded thread pool.
+
+    Exceptions of the given types are collected into the result of the failing item instead of aborting the batch.
+    The items are consumed lazily, a few more than ``max_workers`` ahead of the results, so they can be a stream.
+    Pending work is cancelled when the returned iterator is closed early.
+
+    :param func: The function to call for each item. It returns a :class:`Skipped` for items it did not process.
+    :param items: The items to process.
+    :param key: A function returning the identifier of an item for the result.
+    :param errors: The exception types to collect per item.
+    :param max_workers: The maximum number of concurrently running calls.
+    :param ordered: If True, results are yielded in input order, otherwise as soon as they complete.
+    :param deadline: The deadline of the whole batch, by default the deadline active when the iteration starts. The
+        requests of running calls are bounded by it, and items not started before it fail with
+        :class:`~nextcloud_cookbook_api.timeouts.DeadlineExceeded` without sending a request.
+    :return: An iterator over the results of all items.
+    """
+    if deadline is None:
+        deadline = timeouts.current_deadline()
+
+    def run(item: K) -> BulkResult[T]:
+        # context variables are not inherited by the worker threads, so the deadline is set again in each of them
+        with timeouts.deadline(deadline):
+            try:
+                timeouts.check_deadline()
+                return _result(key(item), func(item))
+            except (*errors, DeadlineExceeded) as e:
+                return BulkResult(key(item), error=e)
+
+    items = iter(items)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        pending: deque[Future[BulkResult[T]]] = deque(
+            executor.submit(run, i) for i in islice(items, 2 * max_workers)
+        )
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                finished = wait(pending, return_when=FIRST_COMPLETED).done
+                done = [f for f in pending if f in finished]
+                pending = deque(f for f in pending if f not in finished)
+            # keep the workers busy while the caller handles the results
+            pending.extend(executor.submit(run, i) for i in islice(items, len(done)))
+            for future in done:
+                yield future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _result(key: str, value: T | Skipped[T]) -> BulkResult[T]:
+    if isinstance(value, Skipped):
+        return BulkResult(key, value=value.value, skipped=True)
+    return BulkResult(key, value=value)
+
+
+async def run_bulk_async(
+    func: Callable[[K], Awaitable[T | Skipped[T]]],
+    items: Iterable[K],
+    key: Callable[[K], str],
+    errors: tuple[type[Exception], ...],
+    max_concurrency: int = 8,
+    ordered: bool = True,
+    deadline: Deadline | None = None,
+) -> AsyncIterator[BulkResult[T]]:
+    """Run a coroutine function for every item with bounded concurrency.
+
+    This is the asyncio counterpart of :func:`run_bulk`. Calls still running when the deadline passes are cancelled.
+
+    :param func: The coroutine function to call for each item. It returns a :class:`Skipped` for items it did not
+        process.
+    :param items: The items to process.
+    :param key: A function returning the identifier of an item for the result.
+    :param errors: The exception types to collect per item.
+    :param max_concurrency: The maximum number of concurrently running calls.
+    :param ordered: If True, results are yielded in input order, otherwise as soon as they complete.
+    :param deadline: The deadline of the whole batch, by default the deadline active when the iteration starts.
+    :return: An async iterator over the results of all items.
+    """
+    if deadline is None:
+        deadline = timeouts.current_deadline()
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def call(item: K) -> T | Skipped[T]:
+        if deadline is None:
+            return await func(item)
+        deadline.check()
+        try:
+            return await asyncio.wait_for(func(item), deadline.remaining())
+        except asyncio.TimeoutError as e:
+            msg = "The deadline of the batch has passed."
+            raise DeadlineExceeded(msg) from e
+
+    async def run(item: K) -> BulkResult[T]:
+        async with semaphore:
+            with timeouts.deadline(deadline):
+                try:
+                    return _result(key(item), await call(item))
+                except (*errors, DeadlineExceeded) as e:
+                    return BulkResult(key(item), error=e)
+
+    items = iter(items)
+    pending: deque[asyncio.Future[BulkResult[T]]] = deque(
+        asyncio.ensure_future(run(i)) for i in islice(items, 2 * max_concurrency)
+    )
+    try:
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+                await asyncio.wait(done)
+            else:
+                finished, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                done = [t for t in pending if t in finished]
+                pending = deque(t for t in pending if t not in finished)
+            pending.extend(
+                asyncio.ensure_future(run(i)) for i in islice(items, len(done))
+            )
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        # wait for the cancelled calls to finish, so no task is left pending when the iteration is closed early
+        await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,344 @@
+"""Client-side caching of GET responses with TTL and conditional revalidation."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Mapping
+from contextlib import suppress
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from pathlib import Path
+from urllib.parse import urlencode
+
+CACHED_HEADERS = frozenset({"etag", "last-modified", "content-type"})
+"""The response headers kept in cache entries, others such as Set-Cookie must not end up in a cache on disk."""
+
+
+@dataclass
+class CacheEntry:
+    """A cached response."""
+
+    status_code: int
+    headers: dict[str, str]
+    content: bytes
+    stored_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def etag(self) -> str | None:
+        """The ETag header of the cached response."""
+        return self.headers.get("etag")
+
+    @property
+    def last_modified(self) -> str | None:
+        """The Last-Modified header of the cached response."""
+        return self.headers.get("last-modified")
+
+    @property
+    def size(self) -> int:
+        """The size of the cached body in bytes."""
+        return len(self.content)
+
+
+@dataclass
+class CacheStats:
+    """Counters describing how effective the cache is.
+
+    Every lookup is counted either as a hit, answered without contacting the server, or as a miss. Revalidations are
+    the misses where the server confirmed the cached response with 304 Not Modified.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    revalidations: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """The share of lookups answered without contacting the server."""
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return 0.0
+        return self.hits / lookups
+
+    @property
+    def reuse_ratio(self) -> float:
+        """The share of lookups answered with a cached body, including revalidated entries."""
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return 0.0
+        return (self.hits + self.revalidations) / lookups
+
+
+class CacheBackend(ABC):
+    """Storage for cache entries."""
+
+    def __init__(self) -> None:
+        self.evictions = 0
+
+    @abstractmethod
+    def get(self, key: str) -> CacheEntry | None:
+        """Get the entry for a key.
+
+        :param key: The cache key.
+        :return: The entry or None if the key is not cached.
+        """
+
+    @abstractmethod
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry, evicting old entries if the size limit is exceeded.
+
+        :param key: The cache key.
+        :param entry: The entry to store.
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all entries."""
+
+
+class MemoryCache(CacheBackend):
+    """In-memory LRU cache backend limited by the total size of the cached bodies."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024) -> None:
+        """Create a new MemoryCache instance.
+
+        :param max_bytes: The maximum total size of all cached bodies in bytes.
+        """
+        super().__init__()
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old.size
+            self._entries[key] = entry
+            self._size += entry.size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+class DiskCache(CacheBackend):
+    """On-disk cache backend storing one file per entry, evicting the least recently used files by size."""
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        max_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        """Create a new DiskCache instance.
+
+        :param directory: The directory to store the cache files in, created if it does not exist.
+        :param max_bytes: The maximum total size of all cache files in bytes.
+        """
+        super().__init__()
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = sum(p.stat().st_size for p in self.directory.glob("*.cache"))
+
+    def _path(self, key: str) -> Path:
+        return self.directory / (hashlib.sha256(key.encode()).hexdigest() + ".cache")
+
+    def get(self, key: str) -> CacheEntry | None:
+        path = self._path(key)
+        try:
+            with path.open("rb") as f:
+                meta = json.loads(f.readline())
+                content = f.read()
+        except (OSError, ValueError):
+            return None
+        # the modification time is used as access time for the LRU eviction, the file may have been evicted since
+        with suppress(OSError):
+            os.utime(path)
+        return CacheEntry(
+            status_code=meta["status_code"],
+            headers=meta["headers"],
+            content=content,
+            stored_at=time.monotonic() - (time.time() - meta["stored_at"]),
+        )
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        if entry.size > self.max_bytes:
+            return
+        meta = {
+            "status_code": entry.status_code,
+            "headers": entry.headers,
+            "stored_at": time.time() - (time.monotonic() - entry.stored_at),
+        }
+        path = self._path(key)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        with tmp_path.open("wb") as f:
+            f.write(json.dumps(meta).encode() + b"\n")
+            f.write(entry.content)
+        with self._lock:
+            try:
+                self._size -= path.stat().st_size
+            except OSError:
+                pass
+            tmp_path.replace(path)
+            self._size += path.stat().st_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # called with the lock held, removes the least recently used files until the size limit is met again
+        files = []
+        for path in self.directory.glob("*.cache"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        self._size = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files, key=lambda f: f[0]):
+            if self._size <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            self._size -= size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            for path in self.directory.glob("*.cache"):
+                path.unlink(missing_ok=True)
+            self._size = 0
+
+
+class ResponseCache:
+    """Cache policy for GET responses of the Cookbook API.
+
+    Responses younger than the TTL are served without contacting the server. Older responses are revalidated with a
+    conditional request (If-None-Match / If-Modified-Since) if the server sent an ETag or Last-Modified header,
+    otherwise they are fetched again. Cache-Control headers of the server are ignored, since Nextcloud marks all API
+    responses as not cacheable.
+    """
+
+    def __init__(self, backend: CacheBackend | None = None, ttl: float = 60.0) -> None:
+        """Create a new ResponseCache instance.
+
+        :param backend: The storage backend, defaults to a :class:`MemoryCache`.
+        :param ttl: The time in seconds a response is served without revalidation.
+        """
+        self.backend = backend if backend is not None else MemoryCache()
+        self.ttl = ttl
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> CacheStats:
+        """A snapshot of the cache counters."""
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                revalidations=self._stats.revalidations,
+                stores=self._stats.stores,
+                evictions=self.backend.evictions,
+            )
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self._stats, name, getattr(self._stats, name) + 1)
+
+    @staticmethod
+    def key(url: str, params: Mapping | None, username: str) -> str:
+        """Build the cache key of a GET request.
+
+        :param url: The requested URL.
+        :param params: The query parameters of the request.
+        :param username: The user the request is sent as, so that users never share cached responses.
+        :return: The cache key.
+        """
+        query = urlencode(sorted((params or {}).items()))
+        return f"{username}:{url}?{query}"
+
+    def lookup(self, key: str) -> tuple[CacheEntry | None, bool]:
+        """Look up a cached response.
+
+        :param key: The cache key.
+        :return: The cached entry, if any, and whether it is fresh and can be used without contacting the server.
+        """
+        entry = self.backend.get(key)
+        if entry is not None and time.monotonic() - entry.stored_at < self.ttl:
+            self._count("hits")
+            return entry, True
+        self._count("misses")
+        return entry, False
+
+    @staticmethod
+    def conditional_headers(entry: CacheEntry) -> dict[str, str]:
+        """Build the headers to revalidate a stale entry.
+
+        :param entry: The stale cache entry.
+        :return: The If-None-Match and/or If-Modified-Since headers.
+        """
+        headers = {}
+        if entry.etag is not None:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified is not None:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def revalidated(self, key: str, entry: CacheEntry) -> CacheEntry:
+        """Mark a stale entry as fresh again after the server answered with 304 Not Modified.
+
+        :param key: The cache key.
+        :param entry: The stale cache entry.
+        :return: The refreshed entry.
+        """
+        self._count("revalidations")
+        entry = CacheEntry(entry.status_code, entry.headers, entry.content)
+        self.backend.set(key, entry)
+        return entry
+
+    def store(
+        self,
+        key: str,
+        status_code: int,
+        headers: Mapping[str, str],
+        content: bytes,
+    ) -> None:
+        """Store a successful response.
+
+        :param key: The cache key.
+        :param status_code: The status code of the response.
+        :param headers: The headers of the response, only the :data:`CACHED_HEADERS` are stored.
+        :param content: The body of the response.
+        """
+        if not HTTPStatus.OK <= status_code < HTTPStatus.MULTIPLE_CHOICES:
+            return
+        self._count("stores")
+        headers = {
+            k.lower(): v for k, v in headers.items() if k.lower() in CACHED_HEADERS
+        }
+        self.backend.set(key, CacheEntry(status_code, headers, content))
+
+    def invalidate(self) -> None:
+        """Drop all cached responses, e.g. after the data on the server was modified."""
+        self.backend.clear()
@@ -0,0 +1,131 @@
+"""Coalescing of concurrent identical requests to the Cookbook API (single-flight).
+
+When many threads or tasks ask for the same recipe at the same moment, e.g. right after a cache miss, only the first
+caller sends the request and all others wait for its result instead of sending identical requests.
+
+:class:`SingleFlight` is thread-safe and can be used from sync and asyncio code at the same time, so it can be shared
+between several :class:`CookbookClient` and :class:`AsyncCookbookClient` instances.
+"""
+
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class SingleFlightStats:
+    """Counters describing how many calls were coalesced.
+
+    Every call is counted either as executed, when it sent the request itself, or as coalesced, when it shared the
+    result of an identical call which was already in flight.
+    """
+
+    executed: int = 0
+    coalesced: int = 0
+
+    @property
+    def coalesced_ratio(self) -> float:
+        """The share of calls answered by another call in flight."""
+        calls = self.executed + self.coalesced
+        if calls == 0:
+            return 0.0
+        return self.coalesced / calls
+
+
+class _Flight:
+    """A call in flight, waited for by the callers which joined it."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Share one execution of a call between all concurrent callers with the same key.
+
+    The callers joining a call in flight receive the same result object, or the same exception, as the caller which
+    executed it. They share its timeouts and deadline, and must not modify the result if other callers may use it.
+    """
+
+    def __init__(self) -> None:
+        """Create a new SingleFlight instance."""
+        self._flights: dict[Hashable, _Flight] = {}
+        self._tasks: dict[Hashable, asyncio.Future] = {}
+        self._stats = SingleFlightStats()
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> SingleFlightStats:
+        """A snapshot of the counters."""
+        with self._lock:
+            return SingleFlightStats(
+                executed=self._stats.executed, coalesced=self._stats.coalesced
+            )
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> T:
+        """Call a function, or wait for the result of a call with the same key which is already in flight.
+
+        :param key: The key of identical calls.
+        :param func: The function to call.
+        :return: The result of the function.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                self._stats.executed += 1
+                leader = True
+            else:
+                self._stats.coalesced += 1
+                leader = False
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = func()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+    async def do_async(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Await a coroutine function, or the result of a call with the same key which is already in flight.
+
+        The call runs in its own task, so it completes for the remaining callers even if the first caller is
+        cancelled.
+
+        :param key: The key of identical calls.
+        :param func: The coroutine function to call.
+        :return: The result of the coroutine.
+        """
+        # futures are bound to their event loop, so calls are only shared within a loop
+        key = (asyncio.get_running_loop(), key)
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is None:
+                task = self._tasks[key] = asyncio.ensure_future(func())
+                task.add_done_callback(lambda t: self._finish(key, t))
+                self._stats.executed += 1
+            else:
+                self._stats.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future) -> None:
+        with self._lock:
+            del self._tasks[key]
+        if not task.cancelled():
+            # mark the exception as retrieved in case all callers were cancelled
+            task.exception()
@@ -0,0 +1,168 @@
+"""Memory-compact storage of large recipe listings.
+
+A :class:`RecipeStub` costs around a kilobyte: the model instance with its dict, two datetime objects, a list of
+keywords and two URLs that only differ in the recipe ID. :class:`CompactRecipeStubs` stores the same information in
+columns instead and creates the RecipeStub objects on demand when they are accessed.
+"""
+
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import overload
+
+from nextcloud_cookbook_api.models import RecipeStub
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+# the suffix of a URL that does not contain the recipe ID
+_NO_ID = 0xFFFFFFFF
+
+
+class _Interned:
+    """A table of distinct values, each stored once and referred to by its index."""
+
+    def __init__(self) -> None:
+        self.values: list = []
+        self._index: dict = {}
+
+    def add(self, value: object) -> int:
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self.values)
+            self.values.append(value)
+        return index
+
+
+class CompactRecipeStubs(Sequence[RecipeStub]):
+    """A list of recipe stubs stored in columns, using a fraction of the memory of a list of RecipeStub objects.
+
+    - Numeric IDs are stored as integers.
+    - Keywords are interned and referred to by their index.
+    - Dates are stored as integers counting microseconds, with their time zones interned.
+    - The image URLs are split around the recipe ID, so their common prefixes and suffixes are stored once.
+
+    Indexing and iterating create equal RecipeStub objects on demand. The container only grows, stubs can be appended
+    but not changed or removed.
+    """
+
+    def __init__(self, stubs: Iterable[RecipeStub] = ()) -> None:
+        """Create a new CompactRecipeStubs instance.
+
+        :param stubs: The initial stubs, e.g. from :meth:`CookbookClient.iter_recipes` to never hold all stubs as
+            objects at once.
+        """
+        self._ids: array | list[str] = array("q")
+        self._names: list[str] = []
+        self._keywords = _Interned()
+        self._keyword_ids = array("I")
+        self._keyword_offsets = array("I", [0])
+        self._keywords_none: set[int] = set()
+        self._zones = _Interned()
+        self._dates = array("q")
+        self._date_zones = array("H")
+        self._strings = _Interned()
+        self._urls = array("I")
+        self.extend(stubs)
+
+    def append(self, stub: RecipeStub) -> None:
+        """Add a stub at the end.
+
+        :param stub: The stub to add.
+        """
+        self._append_id(stub.id)
+        self._names.append(stub.name)
+
+        if stub.keywords is None:
+            self._keywords_none.add(len(self._names) - 1)
+        else:
+            self._keyword_ids.extend(self._keywords.add(k) for k in stub.keywords)
+        self._keyword_offsets.append(len(self._keyword_ids))
+
+        for date in (stub.date_created, stub.date_modified):
+            self._date_zones.append(self._zones.add(date.tzinfo))
+            epoch = _EPOCH if date.tzinfo is None else _EPOCH_UTC
+            self._dates.append((date - epoch) // _MICROSECOND)
+
+        for url in (stub.image_url, stub.image_placeholder_url):
+            prefix, found, suffix = url.partition(stub.id) if stub.id else (url, "", "")
+            self._urls.append(self._strings.add(prefix))
+            self._urls.append(self._strings.add(suffix) if found else _NO_ID)
+
+    def extend(self, stubs: Iterable[RecipeStub]) -> None:
+        """Add several stubs at the end.
+
+        :param stubs: The stubs to add.
+        """
+        for stub in stubs:
+            self.append(stub)
+
+    def _append_id(self, id: str) -> None:
+        if isinstance(self._ids, array):
+            if id.isdecimal() and id.isascii() and str(int(id)) == id:
+                try:
+                    self._ids.append(int(id))
+                except OverflowError:
+                    pass
+                else:
+                    return
+            # the first ID which does not round-trip as an integer switches to strings
+            self._ids = [str(i) for i in self._ids]
+        self._ids.append(id)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @overload
+    def __getitem__(self, index: int) -> RecipeStub: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[RecipeStub]: ...
+
+    def __getitem__(self, index: int | slice) -> RecipeStub | list[RecipeStub]:
+        if isinstance(index, slice):
+            return [self._stub(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            msg = "CompactRecipeStubs index out of range"
+            raise IndexError(msg)
+        return self._stub(index)
+
+    def __iter__(self) -> Iterator[RecipeStub]:
+        for i in range(len(self)):
+            yield self._stub(i)
+
+    def _stub(self, index: int) -> RecipeStub:
+        id = str(self._ids[index])
+        if index in self._keywords_none:
+            keywords = None
+        else:
+            start, end = self._keyword_offsets[index], self._keyword_offsets[index + 1]
+            keywords = [self._keywords.values[k] for k in self._keyword_ids[start:end]]
+        # validating the already typed values is cheaper than model_construct
+        return RecipeStub.model_validate(
+            {
+                "id": id,
+                "name": self._names[index],
+                "keywords": keywords,
+                "dateCreated": self._date(2 * index),
+                "dateModified": self._date(2 * index + 1),
+                "imageUrl": self._url(2 * index, id),
+                "imagePlaceholderUrl": self._url(2 * index + 1, id),
+            }
+        )
+
+    def _date(self, position: int) -> datetime:
+        zone: tzinfo | None = self._zones.values[self._date_zones[position]]
+        offset = timedelta(microseconds=self._dates[position])
+        if zone is None:
+            return _EPOCH + offset
+        return (_EPOCH_UTC + offset).astimezone(zone)
+
+    def _url(self, position: int, id: str) -> str:
+        prefix = self._strings.values[self._urls[2 * position]]
+        suffix = self._urls[2 * position + 1]
+        if suffix == _NO_ID:
+            return prefix
+        return prefix + id + self._strings.values[suffix]
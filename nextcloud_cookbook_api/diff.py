@@ -0,0 +1,64 @@
+"""Field-level comparison of recipes, to skip updates which would not change anything.
+
+Every update rewrites the recipe file on the server and triggers a reindex, even if the recipe is identical. Comparing
+the update with the last known state of the recipe finds the fields it actually changes, so unchanged recipes need no
+request at all, and a dry run can report what a bulk job would change.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from nextcloud_cookbook_api.models import Recipe
+
+SERVER_FIELDS = frozenset({"id", "date_modified", "image_url", "image_placeholder_url"})
+"""The fields set by the server on every write, which are not compared."""
+
+
+@dataclass(frozen=True)
+class FieldChange:
+    """A field whose value differs between two versions of a recipe.
+
+    The values are given as they are sent to the server.
+    """
+
+    field: str
+    old: Any
+    new: Any
+
+
+@dataclass
+class RecipeDiff:
+    """The changes an update makes to a recipe."""
+
+    id: str
+    changes: list[FieldChange] = field(default_factory=list)
+    written: bool = False
+    """Whether the update was sent to the server."""
+
+    @property
+    def changed(self) -> bool:
+        """Whether the update changes any field."""
+        return bool(self.changes)
+
+    @property
+    def fields(self) -> list[str]:
+        """The names of the changed fields."""
+        return [c.field for c in self.changes]
+
+
+def diff_recipes(old: Recipe, new: Recipe) -> list[FieldChange]:
+    """Compare two versions of a recipe field by field.
+
+    The fields in :data:`SERVER_FIELDS` are ignored.
+
+    :param old: The last known state of the recipe.
+    :param new: The updated recipe.
+    :return: The changed fields, in the order of the fields of the model.
+    """
+    old_data = old.model_dump(mode="json")
+    new_data = new.model_dump(mode="json")
+    return [
+        FieldChange(name, old_data.get(name), new_data.get(name))
+        for name in Recipe.model_fields
+        if name not in SERVER_FIELDS and old_data.get(name) != new_data.get(name)
+    ]
@@ -0,0 +1,271 @@
+"""Request building and response parsing shared by the sync and async clients.
+
+Every public client method is backed by a function in this module which describes the HTTP request to send and how the
+response body is turned into models. The clients only differ in how the request is actually transported.
+"""
+
+import json
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, field, replace
+from functools import wraps
+from http import HTTPStatus
+from typing import Any, Generic, Literal, ParamSpec, Protocol, TypeVar
+
+from pydantic import TypeAdapter
+
+from nextcloud_cookbook_api.models import (
+    Category,
+    Config,
+    Keyword,
+    LazyRecipe,
+    Recipe,
+    RecipeStub,
+)
+
+API_PATH = "/apps/cookbook/api/v1"
+
+HttpMethod = Literal["GET", "POST", "PUT", "DELETE"]
+ImageSize = Literal["full", "thumb", "thumb16"]
+
+T = TypeVar("T")
+P = ParamSpec("P")
+
+
+class Response(Protocol):
+    """The parts of a response object used for parsing, implemented by both requests and httpx responses."""
+
+    @property
+    def content(self) -> bytes: ...
+
+    @property
+    def text(self) -> str: ...
+
+    def json(self) -> Any: ...
+
+
+@dataclass(frozen=True)
+class ApiCall(Generic[T]):
+    """Description of a single API request and how to parse its response."""
+
+    method: HttpMethod
+    path: str
+    parse: Callable[[Response], T]
+    kwargs: dict[str, Any] = field(default_factory=dict)
+    name: str = ""
+    """The name of the endpoint, used to label metrics independently of IDs in the path."""
+
+    def coalescing_key(self) -> Hashable | None:
+        """Get the key under which identical calls in flight can share one request and its parsed result.
+
+        :return: The key, or None if the call must not be shared because it is not a GET request.
+        """
+        if self.method != "GET":
+            return None
+        # the parser is part of the key, since e.g. get_recipe and get_recipe_lazy request the same path
+        kwargs = json.dumps(self.kwargs, sort_keys=True, default=str)
+        return self.method, self.path, self.parse, kwargs
+
+
+def _endpoint(func: Callable[P, ApiCall[T]]) -> Callable[P, ApiCall[T]]:
+    """Name the API calls built by a function after the function."""
+
+    @wraps(func)
+    def build(*args: P.args, **kwargs: P.kwargs) -> ApiCall[T]:
+        return replace(func(*args, **kwargs), name=func.__name__)
+
+    return build
+
+
+# the adapters are built once, building the validation schema is expensive
+_KEYWORDS_ADAPTER = TypeAdapter(list[Keyword])
+_CATEGORIES_ADAPTER = TypeAdapter(list[Category])
+_RECIPE_STUBS_ADAPTER = TypeAdapter(list[RecipeStub])
+
+
+def _parse_keywords(response: Response) -> list[Keyword]:
+    return _KEYWORDS_ADAPTER.validate_json(response.content)
+
+
+def _parse_categories(response: Response) -> list[Category]:
+    return _CATEGORIES_ADAPTER.validate_json(response.content)
+
+
+def _parse_recipe_stubs(response: Response) -> list[RecipeStub]:
+    return _RECIPE_STUBS_ADAPTER.validate_json(response.content)
+
+
+def _parse_recipe(response: Response) -> Recipe:
+    return Recipe.model_validate_json(response.content)
+
+
+def _parse_lazy_recipe(response: Response) -> LazyRecipe:
+    return LazyRecipe(response.json())
+
+
+def _parse_config(response: Response) -> Config:
+    return Config.model_validate_json(response.content)
+
+
+def _parse_json(response: Response) -> Any:
+    return response.json()
+
+
+def _parse_text(response: Response) -> str:
+    return response.text
+
+
+def _parse_content(response: Response) -> bytes:
+    return response.content
+
+
+def _parse_nothing(_response: Response) -> None:
+    return None
+
+
+@_endpoint
+def get_keywords() -> ApiCall[list[Keyword]]:
+    return ApiCall("GET", f"{API_PATH}/keywords", _parse_keywords)
+
+
+@_endpoint
+def search_recipes_by_keywords(keywords: list[str]) -> ApiCall[list[RecipeStub]]:
+    keyword_string = ",".join(keywords)
+    return ApiCall("GET", f"{API_PATH}/tags/{keyword_string}", _parse_recipe_stubs)
+
+
+@_endpoint
+def get_categories() -> ApiCall[list[Category]]:
+    return ApiCall("GET", f"{API_PATH}/categories", _parse_categories)
+
+
+@_endpoint
+def get_recipes_by_category(category: str | None) -> ApiCall[list[RecipeStub]]:
+    if category is None:
+        category = "_"
+    return ApiCall("GET", f"{API_PATH}/category/{category}", _parse_recipe_stubs)
+
+
+@_endpoint
+def rename_category(old_name: str, new_name: str) -> ApiCall[None]:
+    return ApiCall(
+        "PUT",
+        f"{API_PATH}/category/{old_name}",
+        _parse_nothing,
+        {"json": {"name": new_name}},
+    )
+
+
+@_endpoint
+def import_recipe(url: str) -> ApiCall[Recipe]:
+    return ApiCall("POST", f"{API_PATH}/import", _parse_recipe, {"json": {"url": url}})
+
+
+@_endpoint
+def get_recipe_main_image(
+    recipe_id: str,
+    size: ImageSize = "full",
+    offset: int = 0,
+) -> ApiCall[bytes]:
+    kwargs: dict[str, Any] = {"params": {"size": size}}
+    if offset:
+        kwargs["headers"] = {"Range": f"bytes={offset}-"}
+    return ApiCall(
+        "GET",
+        f"{API_PATH}/recipes/{recipe_id}/image",
+        _parse_content,
+        kwargs,
+    )
+
+
+def range_bytes_to_skip(status_code: int, offset: int) -> int:
+    """Get the number of leading body bytes to drop from the response to a range request.
+
+    Servers which do not support range requests answer with the complete body instead of 206 Partial Content.
+
+    :param status_code: The status code of the response.
+    :param offset: The requested start offset.
+    :return: The number of bytes to skip.
+    """
+    if status_code == HTTPStatus.PARTIAL_CONTENT:
+        return 0
+    return offset
+
+
+@_endpoint
+def search_recipes(query: str) -> ApiCall[list[RecipeStub]]:
+    return ApiCall("GET", f"{API_PATH}/search/{query}", _parse_recipe_stubs)
+
+
+@_endpoint
+def get_recipes() -> ApiCall[list[RecipeStub]]:
+    return ApiCall("GET", f"{API_PATH}/recipes", _parse_recipe_stubs)
+
+
+@_endpoint
+def create_recipe(recipe: Recipe) -> ApiCall[str]:
+    return ApiCall(
+        "POST",
+        f"{API_PATH}/recipes",
+        _parse_text,
+        {"json": recipe.model_dump(mode="json", by_alias=True)},
+    )
+
+
+@_endpoint
+def get_recipe(id: str) -> ApiCall[Recipe]:
+    return ApiCall("GET", f"{API_PATH}/recipes/{id}", _parse_recipe)
+
+
+@_endpoint
+def get_recipe_lazy(id: str) -> ApiCall[LazyRecipe]:
+    return ApiCall("GET", f"{API_PATH}/recipes/{id}", _parse_lazy_recipe)
+
+
+@_endpoint
+def update_recipe(id: str, recipe: Recipe) -> ApiCall[None]:
+    return ApiCall(
+        "PUT",
+        f"{API_PATH}/recipes/{id}",
+        _parse_nothing,
+        {"json": recipe.model_dump(mode="json", by_alias=True)},
+    )
+
+
+@_endpoint
+def delete_recipe(id: str) -> ApiCall[None]:
+    return ApiCall("DELETE", f"{API_PATH}/recipes/{id}", _parse_nothing)
+
+
+@_endpoint
+def get_ocr_capabilities() -> ApiCall[dict]:
+    return ApiCall(
+        "GET",
+        "/ocs/v2.php/cloud/capabilities",
+        _parse_json,
+        {"headers": {"OCS-APIRequest": "true"}, "params": {"format": "json"}},
+    )
+
+
+@_endpoint
+def trigger_reindex() -> ApiCall[None]:
+    return ApiCall(
+        "POST",
+        f"{API_PATH}/reindex",
+        _parse_nothing,
+        {"headers": {"OCS-APIRequest": "true"}},
+    )
+
+
+@_endpoint
+def get_config() -> ApiCall[Config]:
+    return ApiCall("GET", f"{API_PATH}/config", _parse_config)
+
+
+@_endpoint
+def set_config(config: Config) -> ApiCall[None]:
+    return ApiCall(
+        "POST",
+        f"{API_PATH}/config",
+        _parse_nothing,
+        {"json": config.model_dump(mode="json", by_alias=True)},
+    )
@@ -0,0 +1,275 @@
+"""Export of a whole cookbook into a tar or zip archive, streamed without holding the cookbook in memory.
+
+The archive follows the folder layout of the Cookbook app::
+
+    config.json                 the configuration of the Cookbook app
+    recipes/<id>/recipe.json    a recipe
+    recipes/<id>/full.jpg       the main image of a recipe, if it has one
+    manifest.json               the modification dates of all recipes, written last
+
+Recipes and images are fetched concurrently, while the archive is written in order by the calling thread. Each
+image is buffered in a temporary file which spills to disk above :data:`SPOOL_SIZE`, so the memory use is bounded by
+the number of workers instead of the size of the cookbook.
+
+An incremental export only contains the recipes created or modified since the export whose manifest it is based on,
+and lists the deleted recipes in its manifest.
+"""
+
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import time
+import zipfile
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import closing, contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http import HTTPStatus
+from pathlib import Path
+from typing import IO, BinaryIO, Literal
+
+import requests
+from pydantic import ValidationError
+
+from nextcloud_cookbook_api.bulk import BulkResult, run_bulk
+from nextcloud_cookbook_api.client import CookbookClient
+from nextcloud_cookbook_api.endpoints import ImageSize
+from nextcloud_cookbook_api.models import Recipe
+from nextcloud_cookbook_api.sync import Manifest
+
+ArchiveFormat = Literal["tar", "tar.gz", "zip"]
+
+MANIFEST_NAME = "manifest.json"
+CONFIG_NAME = "config.json"
+SPOOL_SIZE = 1024 * 1024
+"""The size in bytes above which a fetched image is buffered on disk instead of in memory."""
+
+
+@dataclass
+class ExportResult:
+    """The outcome of an export."""
+
+    exported: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+    failed: list[BulkResult[Recipe]] = field(default_factory=list)
+    unchanged: int = 0
+    manifest: Manifest = field(default_factory=Manifest)
+    """The manifest written to the archive, to base the next incremental export on."""
+
+
+@dataclass
+class _Fetched:
+    recipe: Recipe
+    image: IO[bytes] | None
+    image_size: int = 0
+
+
+class _ArchiveWriter(ABC):
+    @abstractmethod
+    def add(self, name: str, data: IO[bytes], size: int, mtime: float) -> None:
+        """Add a file to the archive.
+
+        :param name: The path of the file in the archive.
+        :param data: The file object to copy the content from.
+        :param size: The size of the content in bytes.
+        :param mtime: The modification time of the file.
+        """
+
+    def add_bytes(self, name: str, data: bytes, mtime: float) -> None:
+        self.add(name, io.BytesIO(data), len(data), mtime)
+
+
+class _TarWriter(_ArchiveWriter):
+    def __init__(self, archive: tarfile.TarFile) -> None:
+        self._tar = archive
+
+    def add(self, name: str, data: IO[bytes], size: int, mtime: float) -> None:
+        info = tarfile.TarInfo(name)
+        info.size = size
+        info.mtime = int(mtime)
+        self._tar.addfile(info, data)
+        # the members are only needed to read the archive, dropping them keeps the memory flat
+        self._tar.members.clear()
+
+
+class _ZipWriter(_ArchiveWriter):
+    def __init__(self, archive: zipfile.ZipFile) -> None:
+        self._zip = archive
+
+    def add(self, name: str, data: IO[bytes], size: int, mtime: float) -> None:
+        # zip dates start in 1980
+        info = zipfile.ZipInfo(name, time.localtime(max(mtime, 315532800))[:6])
+        # images are compressed already
+        info.compress_type = (
+            zipfile.ZIP_STORED if name.endswith(".jpg") else zipfile.ZIP_DEFLATED
+        )
+        with self._zip.open(info, "w", force_zip64=size > zipfile.ZIP64_LIMIT) as f:
+            shutil.copyfileobj(data, f)
+
+
+@contextmanager
+def _open_writer(target: BinaryIO, format: ArchiveFormat) -> Iterator[_ArchiveWriter]:
+    if format == "zip":
+        with zipfile.ZipFile(target, "w") as archive:
+            yield _ZipWriter(archive)
+    elif format in ("tar", "tar.gz"):
+        # the stream modes never seek, so the target can be a pipe or socket
+        mode = "w|gz" if format == "tar.gz" else "w|"
+        with tarfile.open(fileobj=target, mode=mode) as archive:
+            yield _TarWriter(archive)
+    else:
+        msg = f"Unknown archive format '{format}'."
+        raise ValueError(msg)
+
+
+def _spool() -> IO[bytes]:
+    return tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+
+
+def read_manifest(path: str | os.PathLike) -> Manifest:
+    """Read the manifest of an archive written by :func:`export_cookbook`.
+
+    :param path: The path of the archive.
+    :return: The manifest of all recipes as of the export.
+    :raises ValueError: If the file is not an archive with a manifest.
+    """
+    path = Path(path)
+    try:
+        if zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as archive:
+                data = json.loads(archive.read(MANIFEST_NAME))
+        else:
+            with tarfile.open(path) as archive:
+                member = archive.extractfile(MANIFEST_NAME)
+                data = json.load(member)
+    except (KeyError, tarfile.TarError) as e:
+        msg = f"'{path}' is not an exported cookbook archive."
+        raise ValueError(msg) from e
+    return Manifest({k: datetime.fromisoformat(v) for k, v in data["recipes"].items()})
+
+
+def export_cookbook(
+    client: CookbookClient,
+    target: str | os.PathLike | BinaryIO,
+    format: ArchiveFormat = "tar",
+    since: Manifest | str | os.PathLike | None = None,
+    image_size: ImageSize | None = "full",
+    max_workers: int = 8,
+) -> ExportResult:
+    """Export all recipes with their images and the configuration into an archive.
+
+    Recipes that fail to fetch are left out and reported in the result. They are not recorded as exported in the
+    manifest, so the next incremental export includes them again.
+
+    :param client: The client used to fetch the cookbook.
+    :param target: The path of the archive to write, or a writable binary file object, which need not be seekable.
+    :param format: The archive format.
+    :param since: The manifest of an earlier export, or the path of its archive, to only export the recipes created
+        or modified since. If None, all recipes are exported.
+    :param image_size: The size of the exported images, or None to export no images.
+    :param max_workers: The maximum number of concurrent requests.
+    :return: The exported, deleted and failed recipes and the manifest written to the archive.
+    """
+    if not isinstance(target, (str, os.PathLike)):
+        return _export(client, target, format, since, image_size, max_workers)
+    with Path(target).open("wb") as f:
+        return _export(client, f, format, since, image_size, max_workers)
+
+
+def _export(
+    client: CookbookClient,
+    target: BinaryIO,
+    format: ArchiveFormat,
+    since: Manifest | str | os.PathLike | None,
+    image_size: ImageSize | None,
+    max_workers: int,
+) -> ExportResult:
+    if since is not None and not isinstance(since, Manifest):
+        since = read_manifest(since)
+    previous = since.entries if since is not None else {}
+    # only the modification dates are kept for the whole cookbook, the recipes are fetched one by one
+    current = {stub.id: stub.date_modified for stub in client.iter_recipes()}
+    config = client.get_config()
+
+    result = ExportResult(deleted=[i for i in previous if i not in current])
+    manifest = {i: d for i, d in current.items() if previous.get(i) == d}
+    result.unchanged = len(manifest)
+
+    def fetch(recipe_id: str) -> _Fetched:
+        recipe = client.get_recipe(recipe_id)
+        if image_size is None or not recipe.image_url:
+            return _Fetched(recipe, None)
+        image = _spool()
+        try:
+            for chunk in client.iter_recipe_main_image(recipe_id, image_size):
+                image.write(chunk)
+        except requests.HTTPError as e:
+            image.close()
+            if (
+                e.response is not None
+                and e.response.status_code == HTTPStatus.NOT_FOUND
+            ):
+                return _Fetched(recipe, None)
+            raise
+        except BaseException:
+            image.close()
+            raise
+        size = image.tell()
+        image.seek(0)
+        return _Fetched(recipe, image, size)
+
+    results = run_bulk(
+        fetch,
+        [i for i in current if i not in manifest],
+        key=str,
+        errors=(requests.RequestException, ValidationError),
+        max_workers=max_workers,
+    )
+    now = time.time()
+    with _open_writer(target, format) as writer, closing(results):
+        config_json = config.model_dump_json(by_alias=True).encode()
+        writer.add_bytes(CONFIG_NAME, config_json, now)
+        for item in results:
+            if not item.ok:
+                result.failed.append(BulkResult(item.id, error=item.error))
+                if item.id in previous:
+                    manifest[item.id] = previous[item.id]
+                continue
+            _write_recipe(writer, item.value, image_size)
+            manifest[item.id] = current[item.id]
+            result.exported.append(item.id)
+
+        result.manifest = Manifest(manifest)
+        document = {
+            "exported_at": datetime.now(timezone.utc).isoformat(),
+            "incremental": since is not None,
+            "recipes": {k: v.isoformat() for k, v in manifest.items()},
+            "exported": result.exported,
+            "deleted": result.deleted,
+        }
+        writer.add_bytes(MANIFEST_NAME, json.dumps(document, indent=2).encode(), now)
+    return result
+
+
+def _write_recipe(
+    writer: _ArchiveWriter, fetched: _Fetched, image_size: ImageSize | None
+) -> None:
+    recipe = fetched.recipe
+    mtime = recipe.date_modified.timestamp()
+    writer.add_bytes(
+        f"recipes/{recipe.id}/recipe.json",
+        recipe.model_dump_json(by_alias=True).encode(),
+        mtime,
+    )
+    if fetched.image is not None:
+        with fetched.image:
+            writer.add(
+                f"recipes/{recipe.id}/{image_size}.jpg",
+                fetched.image,
+                fetched.image_size,
+                mtime,
+            )
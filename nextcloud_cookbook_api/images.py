@@ -0,0 +1,174 @@
+"""Bulk export of recipe images to a local directory."""
+
+import os
+import time
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import requests
+
+from nextcloud_cookbook_api.bulk import BulkResult, run_bulk
+from nextcloud_cookbook_api.client import CookbookClient
+from nextcloud_cookbook_api.endpoints import ImageSize
+from nextcloud_cookbook_api.models import RecipeStub
+
+MTIME_TOLERANCE_NS = 2_000_000_000
+"""The difference between the modification time of an image file and the recipe up to which the image is current.
+
+FAT stores modification times with a resolution of two seconds, and network file systems may round them too.
+"""
+
+
+def _mtime_ns(stub: RecipeStub) -> int:
+    # the server stores dates in whole seconds, so the integer keeps them exact
+    return int(stub.date_modified.timestamp()) * 1_000_000_000
+
+
+@dataclass
+class ImageExportReport:
+    """Summary of an image export run."""
+
+    downloaded: list[Path] = field(default_factory=list)
+    skipped: list[Path] = field(default_factory=list)
+    failed: list[BulkResult[int]] = field(default_factory=list)
+    bytes_downloaded: int = 0
+    seconds: float = 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        """The download throughput in bytes per second."""
+        if self.seconds == 0:
+            return 0.0
+        return self.bytes_downloaded / self.seconds
+
+    @property
+    def files_per_second(self) -> float:
+        """The number of downloaded images per second."""
+        if self.seconds == 0:
+            return 0.0
+        return len(self.downloaded) / self.seconds
+
+
+class ImageExporter:
+    """Download the images of many recipes concurrently into a directory.
+
+    Images are stored as ``<directory>/<recipe id>/<size>.jpg``. The modification time of each file is set to the
+    ``date_modified`` of the recipe, so images of unchanged recipes are skipped on the next export.
+    """
+
+    def __init__(
+        self,
+        client: CookbookClient,
+        directory: str | os.PathLike,
+        sizes: Sequence[ImageSize] = ("full", "thumb", "thumb16"),
+        max_workers: int = 8,
+    ) -> None:
+        """Create a new ImageExporter instance.
+
+        :param client: The client used to talk to the Cookbook API.
+        :param directory: The directory to store the images in.
+        :param sizes: The image sizes to download for each recipe.
+        :param max_workers: The maximum number of concurrent downloads.
+        """
+        self.client = client
+        self.directory = Path(directory)
+        self.sizes = sizes
+        self.max_workers = max_workers
+
+    def image_path(self, recipe_id: str, size: ImageSize) -> Path:
+        """Get the path an image is stored at.
+
+        :param recipe_id: The ID of the recipe.
+        :param size: The size of the image.
+        :return: The path of the image file.
+        """
+        return self.directory / recipe_id / f"{size}.jpg"
+
+    def _is_current(self, path: Path, stub: RecipeStub) -> bool:
+        try:
+            return abs(path.stat().st_mtime_ns - _mtime_ns(stub)) <= MTIME_TOLERANCE_NS
+        except OSError:
+            return False
+
+    def _download(self, task: tuple[RecipeStub, ImageSize]) -> int:
+        stub, size = task
+        path = self.image_path(stub.id, size)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # download to a temporary file first, so an interrupted download is never mistaken for a complete image
+        tmp_path = path.with_name(path.name + ".part")
+        try:
+            written = self.client.download_recipe_main_image(stub.id, tmp_path, size)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        tmp_path.replace(path)
+        mtime_ns = _mtime_ns(stub)
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+        return written
+
+    def export(
+        self,
+        recipes: Iterable[str | RecipeStub] | None = None,
+    ) -> ImageExportReport:
+        """Download the images of the given recipes.
+
+        :param recipes: The recipes to export, as IDs or RecipeStub objects. If None, all recipes are exported. IDs are
+            resolved to stubs with a single :meth:`CookbookClient.get_recipes` request.
+        :return: The report of the downloaded, skipped and failed images.
+        """
+        start = time.perf_counter()
+        report = ImageExportReport()
+
+        stubs = self._resolve(recipes, report)
+        tasks = []
+        for stub in stubs:
+            for size in self.sizes:
+                path = self.image_path(stub.id, size)
+                if self._is_current(path, stub):
+                    report.skipped.append(path)
+                else:
+                    tasks.append((stub, size))
+
+        for result in run_bulk(
+            self._download,
+            tasks,
+            key=lambda t: f"{t[0].id}/{t[1]}",
+            errors=(requests.RequestException, OSError),
+            max_workers=self.max_workers,
+            ordered=False,
+        ):
+            if result.ok:
+                recipe_id, size = result.id.split("/")
+                report.downloaded.append(self.image_path(recipe_id, size))
+                report.bytes_downloaded += result.value
+            else:
+                report.failed.append(result)
+
+        report.seconds = time.perf_counter() - start
+        return report
+
+    def _resolve(
+        self,
+        recipes: Iterable[str | RecipeStub] | None,
+        report: ImageExportReport,
+    ) -> list[RecipeStub]:
+        if recipes is not None:
+            recipes = list(recipes)
+            if all(isinstance(r, RecipeStub) for r in recipes):
+                return recipes
+
+        all_stubs = {s.id: s for s in self.client.get_recipes()}
+        if recipes is None:
+            return list(all_stubs.values())
+
+        stubs = []
+        for recipe in recipes:
+            if isinstance(recipe, RecipeStub):
+                stubs.append(recipe)
+            elif recipe in all_stubs:
+                stubs.append(all_stubs[recipe])
+            else:
+                msg = f"Recipe '{recipe}' does not exist."
+                report.failed.append(BulkResult(recipe, error=LookupError(msg)))
+        return stubs
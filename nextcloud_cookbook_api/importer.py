@@ -0,0 +1,84 @@
+"""Bookkeeping for importing many recipes from URLs.
+
+The Cookbook server scrapes each URL while the import request is open, so bulk imports run the requests concurrently
+and skip the URLs which were imported before, either found in the source URLs of the existing recipes or in a
+checkpoint written by an earlier run.
+"""
+
+import threading
+from collections.abc import Mapping
+from urllib.parse import urlsplit, urlunsplit
+
+from nextcloud_cookbook_api.bulk import IdempotencyStore, Skipped
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a recipe URL for comparing it with other URLs.
+
+    The scheme and host are lower cased, and the fragment and a trailing slash of the path are dropped.
+
+    :param url: The URL.
+    :return: The normalized URL.
+    """
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/")
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), path, parts.query, "")
+    )
+
+
+class ImportTracker:
+    """Decide which URLs of a bulk import still have to be imported and record the imported ones.
+
+    All methods can be called from several threads.
+    """
+
+    def __init__(
+        self,
+        existing: Mapping[str, str],
+        checkpoint: IdempotencyStore | None = None,
+    ) -> None:
+        """Create a new ImportTracker instance.
+
+        :param existing: The IDs of the existing recipes by their source URLs.
+        :param checkpoint: The store recording the IDs of the recipes imported by this and earlier runs, by their
+            normalized URLs.
+        """
+        self.checkpoint = checkpoint if checkpoint is not None else IdempotencyStore()
+        self._existing = {normalize_url(u): i for u, i in existing.items() if u}
+        self._claimed: set[str] = set()
+        self._lock = threading.Lock()
+
+    def claim(self, url: str) -> Skipped[str] | None:
+        """Claim a URL for importing it.
+
+        :param url: The URL to import.
+        :return: None if the URL has to be imported, otherwise a Skipped holding the ID of the existing recipe, if
+            known.
+        """
+        key = normalize_url(url)
+        recipe_id = self._existing.get(key) or self.checkpoint.get(key)
+        if recipe_id is not None:
+            return Skipped(recipe_id)
+        with self._lock:
+            if key in self._claimed:
+                # the same URL occurs again in the input
+                return Skipped()
+            self._claimed.add(key)
+        return None
+
+    def release(self, url: str) -> None:
+        """Release a claimed URL whose import failed, so a later occurrence in the input is imported.
+
+        :param url: The URL.
+        """
+        with self._lock:
+            self._claimed.discard(normalize_url(url))
+
+    def done(self, url: str, recipe_id: str) -> None:
+        """Record the ID of the recipe imported from a URL.
+
+        :param url: The URL.
+        :param recipe_id: The ID of the imported recipe.
+        """
+        self.checkpoint.record(normalize_url(url), recipe_id)
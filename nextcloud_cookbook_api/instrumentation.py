@@ -0,0 +1,255 @@
+"""Hooks for observing the requests sent by the clients, with adapters for logging, metrics and tracing.
+
+Instruments receive a :class:`RequestEvent` before each API call and again after it finished. The event splits the
+time of the call into network time, which includes the connection setup, the server time, the download of the body
+and retries, and parse time, which is spent validating the response into models. Clients without instruments skip all
+of this, so instrumentation costs nothing unless it is used.
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+
+from nextcloud_cookbook_api.endpoints import ApiCall
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RequestEvent:
+    """Measurements of a single API call, filled in while the call progresses."""
+
+    endpoint: str
+    """The name of the endpoint, e.g. ``get_recipe``."""
+    method: str
+    path: str
+    status_code: int | None = None
+    bytes_received: int = 0
+    """The size of the response body in bytes."""
+    network_seconds: float = 0.0
+    """The time spent sending the request and receiving the response, including retries."""
+    parse_seconds: float = 0.0
+    """The time spent parsing and validating the response body."""
+    error: BaseException | None = None
+    """The exception raised by the call, if any."""
+    context: dict[Any, Any] = field(default_factory=dict)
+    """Storage for instruments to keep state between the two hooks, keyed by the instrument."""
+
+    @property
+    def seconds(self) -> float:
+        """The total time of the call."""
+        return self.network_seconds + self.parse_seconds
+
+
+class Instrument:
+    """Base class for instruments. Override the hooks of interest, they do nothing by default.
+
+    Hooks are called synchronously on the thread or event loop making the request and should return quickly.
+    Exceptions raised by hooks are logged and otherwise ignored.
+    """
+
+    def on_request(self, event: RequestEvent) -> None:
+        """Called before the request of an API call is sent.
+
+        :param event: The event of the call, only the endpoint, method and path are set.
+        """
+
+    def on_response(self, event: RequestEvent) -> None:
+        """Called after an API call finished, successfully or not.
+
+        :param event: The event of the call with all measurements.
+        """
+
+
+class Instrumentation:
+    """The instruments of a client."""
+
+    def __init__(self, instruments: Iterable[Instrument] = ()) -> None:
+        """Create a new Instrumentation instance.
+
+        :param instruments: The instruments to notify about each API call.
+        """
+        self.instruments = tuple(instruments)
+
+    def __bool__(self) -> bool:
+        return bool(self.instruments)
+
+    def _notify(self, hook: str, event: RequestEvent) -> None:
+        for instrument in self.instruments:
+            try:
+                getattr(instrument, hook)(event)
+            except Exception:
+                logger.exception("Instrument %r failed in %s.", instrument, hook)
+
+    @contextmanager
+    def track(self, call: ApiCall) -> Iterator[RequestEvent]:
+        """Notify the instruments about an API call made within the block.
+
+        The caller fills in the measurements of the event. If no network time was recorded, e.g. for streamed
+        downloads, the whole time spent in the block is counted as network time.
+
+        :param call: The API call.
+        :return: The event of the call.
+        """
+        event = RequestEvent(call.name, call.method, call.path)
+        self._notify("on_request", event)
+        start = time.perf_counter()
+        try:
+            yield event
+        except Exception as e:
+            event.error = e
+            raise
+        finally:
+            if not event.network_seconds:
+                event.network_seconds = (
+                    time.perf_counter() - start - event.parse_seconds
+                )
+            self._notify("on_response", event)
+
+
+class LoggingInstrument(Instrument):
+    """Log one line with the measurements of each API call."""
+
+    def __init__(
+        self, log: logging.Logger | None = None, level: int = logging.DEBUG
+    ) -> None:
+        """Create a new LoggingInstrument instance.
+
+        :param log: The logger to write to, by default the logger of this module.
+        :param level: The level of the log records. Failed calls are logged with at least WARNING.
+        """
+        self.log = log if log is not None else logger
+        self.level = level
+
+    def on_response(self, event: RequestEvent) -> None:
+        level = self.level if event.error is None else max(self.level, logging.WARNING)
+        if not self.log.isEnabledFor(level):
+            return
+        self.log.log(
+            level,
+            "%s %s %s -> %s, %d bytes, network %.1f ms, parse %.1f ms%s",
+            event.endpoint,
+            event.method,
+            event.path,
+            event.status_code,
+            event.bytes_received,
+            event.network_seconds * 1000,
+            event.parse_seconds * 1000,
+            f", {type(event.error).__name__}: {event.error}" if event.error else "",
+        )
+
+
+class MetricsInstrument(Instrument):
+    """Collect Prometheus-style counters per endpoint.
+
+    The metrics are kept in memory and can be exported in the Prometheus text format with :meth:`render`, e.g. from
+    the handler of a metrics endpoint.
+    """
+
+    def __init__(self, prefix: str = "cookbook_client") -> None:
+        """Create a new MetricsInstrument instance.
+
+        :param prefix: The prefix of all metric names.
+        """
+        self.prefix = prefix
+        self.requests: defaultdict[tuple[str, str, str], int] = defaultdict(int)
+        """The number of calls per endpoint, method and status code, ``error`` for calls without response."""
+        self.network_seconds: defaultdict[str, float] = defaultdict(float)
+        """The total network time per endpoint."""
+        self.parse_seconds: defaultdict[str, float] = defaultdict(float)
+        """The total parse time per endpoint."""
+        self.bytes_received: defaultdict[str, int] = defaultdict(int)
+        """The total size of the response bodies per endpoint."""
+        self._lock = threading.Lock()
+
+    def on_response(self, event: RequestEvent) -> None:
+        status = str(event.status_code) if event.status_code is not None else "error"
+        with self._lock:
+            self.requests[(event.endpoint, event.method, status)] += 1
+            self.network_seconds[event.endpoint] += event.network_seconds
+            self.parse_seconds[event.endpoint] += event.parse_seconds
+            self.bytes_received[event.endpoint] += event.bytes_received
+
+    def render(self) -> str:
+        """Export the metrics in the Prometheus text exposition format.
+
+        :return: The metrics as text.
+        """
+        lines = []
+        with self._lock:
+            lines.append(f"# TYPE {self.prefix}_requests_total counter")
+            for (endpoint, method, status), count in sorted(self.requests.items()):
+                labels = f'endpoint="{endpoint}",method="{method}",status="{status}"'
+                lines.append(f"{self.prefix}_requests_total{{{labels}}} {count}")
+            for name, values in (
+                ("network_seconds_total", self.network_seconds),
+                ("parse_seconds_total", self.parse_seconds),
+                ("received_bytes_total", self.bytes_received),
+            ):
+                lines.append(f"# TYPE {self.prefix}_{name} counter")
+                for endpoint, value in sorted(values.items()):
+                    lines.append(
+                        f'{self.prefix}_{name}{{endpoint="{endpoint}"}} {value}'
+                    )
+        return "\n".join(lines) + "\n"
+
+
+class Span(Protocol):
+    """The parts of an OpenTelemetry span used by :class:`TracingInstrument`."""
+
+    def set_attribute(self, key: str, value: Any) -> None: ...
+
+    def record_exception(self, exception: BaseException) -> None: ...
+
+    def end(self) -> None: ...
+
+
+class Tracer(Protocol):
+    """The parts of an OpenTelemetry tracer used by :class:`TracingInstrument`."""
+
+    def start_span(
+        self, name: str, attributes: dict[str, Any] | None = None
+    ) -> Span: ...
+
+
+class TracingInstrument(Instrument):
+    """Record a span for each API call.
+
+    Works with the tracers of the OpenTelemetry API, e.g. ``opentelemetry.trace.get_tracer(__name__)``, or any other
+    object with the same interface. The span attributes follow the OpenTelemetry semantic conventions for HTTP clients.
+    """
+
+    def __init__(self, tracer: Tracer) -> None:
+        """Create a new TracingInstrument instance.
+
+        :param tracer: The tracer to start the spans with.
+        """
+        self.tracer = tracer
+
+    def on_request(self, event: RequestEvent) -> None:
+        event.context[self] = self.tracer.start_span(
+            event.method,
+            attributes={
+                "http.request.method": event.method,
+                "url.path": event.path,
+                "cookbook.endpoint": event.endpoint,
+            },
+        )
+
+    def on_response(self, event: RequestEvent) -> None:
+        span = event.context.pop(self, None)
+        if span is None:
+            return
+        if event.status_code is not None:
+            span.set_attribute("http.response.status_code", event.status_code)
+        span.set_attribute("http.response.body.size", event.bytes_received)
+        span.set_attribute("cookbook.network_seconds", event.network_seconds)
+        span.set_attribute("cookbook.parse_seconds", event.parse_seconds)
+        if event.error is not None:
+            span.record_exception(event.error)
+        span.end()
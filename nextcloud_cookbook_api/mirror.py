@@ -0,0 +1,277 @@
+"""Local mirror of the recipes of a Cookbook instance in a SQLite database.
+
+The mirror answers the read queries of the client from the database, so read-heavy services only have to contact the
+server to refresh it. Each refresh fetches the recipe stubs once and then only the recipes which were created or
+modified since the last refresh, just like :class:`~nextcloud_cookbook_api.sync.RecipeSync`.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from collections.abc import Mapping
+from datetime import datetime
+from pathlib import Path
+from types import TracebackType
+
+from pydantic import TypeAdapter
+from typing_extensions import Self
+
+from nextcloud_cookbook_api.client import CookbookClient
+from nextcloud_cookbook_api.models import Category, Keyword, Recipe, RecipeStub
+from nextcloud_cookbook_api.sync import Manifest, SyncResult
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS recipes (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    keywords TEXT NOT NULL,
+    date_modified TEXT NOT NULL,
+    stub TEXT NOT NULL
+);
+-- the full recipes are kept apart, so scanning the recipes table for a search stays cheap
+CREATE TABLE IF NOT EXISTS recipe_bodies (
+    id TEXT PRIMARY KEY REFERENCES recipes (id) ON DELETE CASCADE,
+    recipe TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS recipes_name ON recipes (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS recipes_category ON recipes (category, name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS recipes_date_modified ON recipes (date_modified);
+CREATE TABLE IF NOT EXISTS recipe_keywords (
+    keyword TEXT NOT NULL,
+    recipe_id TEXT NOT NULL REFERENCES recipes (id) ON DELETE CASCADE,
+    PRIMARY KEY (keyword, recipe_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS recipe_keywords_recipe_id ON recipe_keywords (recipe_id);
+"""
+
+_RECIPE_STUBS_ADAPTER = TypeAdapter(list[RecipeStub])
+
+
+class RecipeMirror:
+    """Local copy of all recipes, kept up to date incrementally and queried without network round-trips.
+
+    The query methods mirror those of :class:`CookbookClient` and can be used from several threads.
+    """
+
+    def __init__(
+        self,
+        client: CookbookClient,
+        path: str | os.PathLike = ":memory:",
+        max_workers: int = 8,
+    ) -> None:
+        """Create a new RecipeMirror instance.
+
+        :param client: The client used to refresh the mirror.
+        :param path: The path of the SQLite database. The default in-memory database is lost when the mirror is closed.
+        :param max_workers: The maximum number of concurrent recipe requests during a refresh.
+        """
+        self.client = client
+        self.max_workers = max_workers
+        if path != ":memory:":
+            path = Path(path)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA foreign_keys = ON")
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        """Close the database."""
+        self._db.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def refresh(self) -> SyncResult:
+        """Fetch the recipes created or modified on the server since the last refresh and drop deleted ones.
+
+        Recipes that failed to fetch keep their previous version and are retried on the next refresh.
+
+        :return: The recipes which were created, updated or deleted.
+        """
+        with self._lock:
+            rows = self._db.execute("SELECT id, date_modified FROM recipes")
+            manifest = Manifest({i: datetime.fromisoformat(d) for i, d in rows})
+        stubs = self.client.get_recipes()
+        diff = manifest.diff(stubs)
+        result = SyncResult(unchanged=len(diff.unchanged), deleted=diff.deleted)
+
+        new_ids = {s.id for s in diff.new}
+        by_id = {s.id: s for s in diff.new + diff.changed}
+        fetched = []
+        for item in self.client.get_recipes_full(
+            by_id.values(),
+            max_workers=self.max_workers,
+            ordered=False,
+        ):
+            if not item.ok:
+                result.failed.append(item)
+                continue
+            fetched.append((by_id[item.id], item.value))
+            if item.id in new_ids:
+                result.created.append(item.value)
+            else:
+                result.updated.append(item.value)
+
+        with self._lock, self._db:
+            self._db.executemany(
+                "DELETE FROM recipes WHERE id = ?", [(i,) for i in diff.deleted]
+            )
+            for stub, recipe in fetched:
+                self._store(stub, recipe)
+        return result
+
+    def _store(self, stub: RecipeStub, recipe: Recipe) -> None:
+        self._db.execute("DELETE FROM recipes WHERE id = ?", (stub.id,))
+        self._db.execute(
+            "INSERT INTO recipes VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                stub.id,
+                stub.name,
+                recipe.category,
+                ",".join(stub.keywords or ()),
+                stub.date_modified.isoformat(),
+                stub.model_dump_json(by_alias=True),
+            ),
+        )
+        self._db.execute(
+            "INSERT INTO recipe_bodies VALUES (?, ?)",
+            (stub.id, recipe.model_dump_json(by_alias=True)),
+        )
+        self._db.executemany(
+            "INSERT OR IGNORE INTO recipe_keywords VALUES (?, ?)",
+            [(keyword, stub.id) for keyword in stub.keywords or ()],
+        )
+
+    def _stubs(self, sql: str, params: tuple | Mapping = ()) -> list[RecipeStub]:
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        # validate all stubs in one shot instead of one by one
+        return _RECIPE_STUBS_ADAPTER.validate_json(
+            "[" + ",".join(row[0] for row in rows) + "]"
+        )
+
+    def get_recipes(self) -> list[RecipeStub]:
+        """Get all recipes.
+
+        :return: A list of RecipeStub objects ordered by name.
+        """
+        return self._stubs("SELECT stub FROM recipes ORDER BY name COLLATE NOCASE")
+
+    def get_recipe(self, id: str) -> Recipe:
+        """Get a recipe by its ID.
+
+        :param id: The ID of the recipe.
+        :return: The Recipe object.
+        :raises LookupError: If the recipe is not in the mirror.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT recipe FROM recipe_bodies WHERE id = ?", (id,)
+            ).fetchone()
+        if row is None:
+            msg = f"Recipe '{id}' does not exist."
+            raise LookupError(msg)
+        return Recipe.model_validate_json(row[0])
+
+    def get_recipe_urls(self) -> dict[str, str]:
+        """Get the source URLs of all recipes, e.g. to skip them in :meth:`CookbookClient.import_recipes`.
+
+        :return: The IDs of the recipes by their source URLs.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                """
+                SELECT json_extract(recipe, '$.url'), id FROM recipe_bodies
+                WHERE json_extract(recipe, '$.url') != ''
+                """
+            ).fetchall()
+        return dict(rows)
+
+    def get_recipes_by_category(self, category: str | None) -> list[RecipeStub]:
+        """Get the recipes of a category.
+
+        :param category: The name of the category. If None, all recipes without a category are returned.
+        :return: A list of RecipeStub objects ordered by name.
+        """
+        return self._stubs(
+            "SELECT stub FROM recipes WHERE category = ? ORDER BY name COLLATE NOCASE",
+            (category or "",),
+        )
+
+    def search_recipes_by_keywords(self, keywords: list[str]) -> list[RecipeStub]:
+        """Get the recipes having all of the given keywords.
+
+        :param keywords: The keywords to search for.
+        :return: A list of RecipeStub objects ordered by name.
+        """
+        if not keywords:
+            return []
+        keywords = list(dict.fromkeys(keywords))
+        placeholders = ",".join("?" * len(keywords))
+        return self._stubs(
+            f"""
+            SELECT stub FROM recipes WHERE id IN (
+                SELECT recipe_id FROM recipe_keywords WHERE keyword IN ({placeholders})
+                GROUP BY recipe_id HAVING count(*) = ?
+            )
+            ORDER BY name COLLATE NOCASE
+            """,
+            (*keywords, len(keywords)),
+        )
+
+    def search_recipes(self, query: str) -> list[RecipeStub]:
+        """Search recipes whose name, category or keywords contain every term of the query, ignoring case.
+
+        :param query: The search query, separated with spaces and/or commas.
+        :return: A list of RecipeStub objects ordered by name.
+        """
+        params = {}
+        conditions = []
+        for i, term in enumerate(t for t in re.split(r"[\s,]+", query) if t):
+            params[f"term{i}"] = (
+                "%"
+                + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                + "%"
+            )
+            # the server requires each term to match the name, the category or a keyword
+            conditions.append(
+                rf"""(name LIKE :term{i} ESCAPE '\' OR category LIKE :term{i} ESCAPE '\'
+                OR keywords LIKE :term{i} ESCAPE '\')"""
+            )
+        where = "WHERE " + " AND ".join(conditions) if conditions else ""
+        return self._stubs(
+            f"SELECT stub FROM recipes {where} ORDER BY name COLLATE NOCASE", params
+        )
+
+    def get_categories(self) -> list[Category]:
+        """Get all categories with the number of their recipes.
+
+        :return: A list of Category objects ordered by name.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT category, count(*) FROM recipes GROUP BY category ORDER BY category"
+            ).fetchall()
+        return [Category(name=name, recipe_count=count) for name, count in rows]
+
+    def get_keywords(self) -> list[Keyword]:
+        """Get all keywords with the number of their recipes.
+
+        :return: A list of Keyword objects ordered by name.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT keyword, count(*) FROM recipe_keywords GROUP BY keyword ORDER BY keyword"
+            ).fetchall()
+        return [Keyword(name=name, recipe_count=count) for name, count in rows]
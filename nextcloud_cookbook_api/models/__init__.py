@@ -1,6 +1,14 @@
 from .category import Category
 from .config import Config
 from .keyword import Keyword
-from .recipe import Nutrition, Recipe, RecipeStub
+from .recipe import LazyRecipe, Nutrition, Recipe, RecipeStub
 
-__all__ = ["Category", "Config", "Keyword", "Nutrition", "Recipe", "RecipeStub"]
+__all__ = [
+    "Category",
+    "Config",
+    "Keyword",
+    "LazyRecipe",
+    "Nutrition",
+    "Recipe",
+    "RecipeStub",
+]
@@ -1,7 +1,14 @@
 from datetime import datetime
-from typing import Literal
+from functools import lru_cache
+from typing import Any, Literal
 
-from pydantic import BaseModel, Field, field_serializer, field_validator
+from pydantic import (
+    BaseModel,
+    Field,
+    ValidationError,
+    field_serializer,
+    field_validator,
+)
 
 
 class Nutrition(BaseModel):
@@ -97,6 +104,12 @@ class Nutrition(BaseModel):
     )
 
 
+@lru_cache(maxsize=4096)
+def _split_keywords(keywords: str) -> tuple[str, ...]:
+    # the same keyword strings repeat across many recipes, so the split result is cached
+    return tuple(s for s in (k.strip() for k in keywords.split(",")) if s)
+
+
 class RecipeStub(BaseModel):
     """A stub of a recipe with some basic information present."""
 
@@ -140,7 +153,7 @@ class RecipeStub(BaseModel):
     @classmethod
     def parse_keywords(cls, v):
         if isinstance(v, str):
-            return [s.strip() for s in v.split(",") if s.strip()]
+            return list(_split_keywords(v))
         return v
 
     @field_serializer("keywords", mode="plain")
@@ -228,3 +241,61 @@ class Recipe(RecipeStub):
             },
         ],
     )
+
+
+class LazyRecipe:
+    """A read-only view on the raw JSON of a recipe which validates each field only on first access.
+
+    Fields are accessed like on a :class:`Recipe`. Fields which are never accessed are never validated, use
+    :meth:`to_recipe` to validate all fields at once.
+    """
+
+    __slots__ = ("_data", "_recipe", "_validated")
+
+    def __init__(self, data: dict[str, Any]) -> None:
+        """Create a new LazyRecipe instance.
+
+        :param data: The JSON object of the recipe as returned by the API.
+        """
+        self._data = data
+        self._recipe = Recipe.model_construct()
+        self._validated: set[str] = set()
+
+    def __getattr__(self, name: str) -> Any:
+        field = Recipe.model_fields.get(name)
+        if field is None:
+            msg = f"'{type(self).__name__}' object has no attribute '{name}'"
+            raise AttributeError(msg)
+
+        if name not in self._validated:
+            alias = field.validation_alias or name
+            if alias in self._data:
+                # validates only this field, including its field validators
+                Recipe.__pydantic_validator__.validate_assignment(
+                    self._recipe,
+                    name,
+                    self._data[alias],
+                )
+            elif field.is_required():
+                raise ValidationError.from_exception_data(
+                    Recipe.__name__,
+                    [{"type": "missing", "loc": (alias,), "input": self._data}],
+                )
+            else:
+                setattr(
+                    self._recipe, name, field.get_default(call_default_factory=True)
+                )
+            self._validated.add(name)
+
+        return getattr(self._recipe, name)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(id={self._data.get('id')!r}, name={self._data.get('name')!r})"
+
+    def to_recipe(self) -> Recipe:
+        """Validate all fields and convert the view into a regular recipe.
+
+        :return: The fully validated Recipe object.
+        :raises pydantic.ValidationError: If any field of the recipe is invalid.
+        """
+        return Recipe.model_validate(self._data)
@@ -0,0 +1,280 @@
+"""Client-side rate limiting and concurrency limits for requests to the Cookbook API.
+
+All primitives in this module are thread-safe and can be used from sync and asyncio code at the same time, so a single
+:class:`Governor` can be shared between several :class:`CookbookClient` and :class:`AsyncCookbookClient` instances.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterator, Mapping
+from contextlib import asynccontextmanager, contextmanager
+from typing import Literal
+
+EndpointClass = Literal["read", "write", "image", "import"]
+
+ENDPOINT_CLASSES: tuple[EndpointClass, ...] = ("read", "write", "image", "import")
+
+
+def classify(method: str, path: str) -> EndpointClass:
+    """Get the endpoint class of a request.
+
+    :param method: The HTTP method of the request.
+    :param path: The path or URL of the request.
+    :return: ``import`` for recipe imports, ``image`` for image downloads, otherwise ``read`` for GET and ``write``
+        for all other requests.
+    """
+    path = path.split("?", 1)[0]
+    if path.endswith("/import"):
+        return "import"
+    if path.endswith("/image"):
+        return "image"
+    return "read" if method == "GET" else "write"
+
+
+class TokenBucket:
+    """Token bucket allowing ``rate`` requests per second on average with bursts of up to ``burst`` requests."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Create a new TokenBucket instance.
+
+        :param rate: The number of tokens added per second.
+        :param burst: The maximum number of tokens the bucket can hold.
+        :param clock: The monotonic clock in seconds, e.g. a fake clock in tests.
+        :param sleep: The function blocking the calling thread for a number of seconds, matching the clock.
+        """
+        if rate <= 0:
+            msg = "The rate must be positive."
+            raise ValueError(msg)
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token, possibly from the future.
+
+        :return: The time in seconds the caller has to wait before the token is valid.
+        """
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        """Block until a token is available."""
+        delay = self.reserve()
+        if delay > 0:
+            self.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        """Wait without blocking the event loop until a token is available."""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class ConcurrencyLimit:
+    """Semaphore limiting the number of requests in flight, usable from threads and event loops at the same time.
+
+    Waiters are served in FIFO order.
+    """
+
+    def __init__(self, max_in_flight: int) -> None:
+        """Create a new ConcurrencyLimit instance.
+
+        :param max_in_flight: The maximum number of concurrent holders.
+        """
+        if max_in_flight < 1:
+            msg = "The maximum number of requests in flight must be at least 1."
+            raise ValueError(msg)
+        self.max_in_flight = max_in_flight
+        self._in_flight = 0
+        self._waiters: deque[Callable[[], None]] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        """The number of current holders."""
+        return self._in_flight
+
+    def _acquire_or_enqueue(self, wake: Callable[[], None]) -> bool:
+        with self._lock:
+            if self._in_flight < self.max_in_flight and not self._waiters:
+                self._in_flight += 1
+                return True
+            self._waiters.append(wake)
+            return False
+
+    def acquire(self) -> None:
+        """Block until a slot is available."""
+        event = threading.Event()
+        if not self._acquire_or_enqueue(event.set):
+            event.wait()
+
+    async def acquire_async(self) -> None:
+        """Wait without blocking the event loop until a slot is available."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def set_result() -> None:
+            if not future.done():
+                future.set_result(None)
+
+        def wake() -> None:
+            loop.call_soon_threadsafe(set_result)
+
+        if self._acquire_or_enqueue(wake):
+            return
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if wake in self._waiters:
+                    self._waiters.remove(wake)
+                    raise
+            # the slot was already handed over to this waiter, pass it on
+            self.release()
+            raise
+
+    def release(self) -> None:
+        """Release a slot, handing it over to the next waiter if there is one."""
+        with self._lock:
+            if not self._waiters:
+                self._in_flight -= 1
+                return
+            wake = self._waiters.popleft()
+        wake()
+
+
+class Limit:
+    """A rate and/or concurrency limit for a class of requests."""
+
+    def __init__(
+        self,
+        rate: float | None = None,
+        burst: int = 1,
+        max_in_flight: int | None = None,
+    ) -> None:
+        """Create a new Limit instance.
+
+        :param rate: The maximum average number of requests per second, or None for no rate limit.
+        :param burst: The number of requests which may be sent at once before the rate limit applies.
+        :param max_in_flight: The maximum number of concurrent requests, or None for no concurrency limit.
+        """
+        self.bucket = TokenBucket(rate, burst) if rate is not None else None
+        self.concurrency = (
+            ConcurrencyLimit(max_in_flight) if max_in_flight is not None else None
+        )
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        if self.concurrency is not None:
+            self.concurrency.acquire()
+        if self.bucket is not None:
+            try:
+                self.bucket.acquire()
+            except BaseException:
+                self.release()
+                raise
+
+    async def acquire_async(self) -> None:
+        """Wait without blocking the event loop until a request may be sent."""
+        if self.concurrency is not None:
+            await self.concurrency.acquire_async()
+        if self.bucket is not None:
+            try:
+                await self.bucket.acquire_async()
+            except asyncio.CancelledError:
+                self.release()
+                raise
+
+    def release(self) -> None:
+        """Mark a request as finished."""
+        if self.concurrency is not None:
+            self.concurrency.release()
+
+
+class Governor:
+    """Applies limits to requests depending on their endpoint class.
+
+    Each request is subject to the limit of its endpoint class (``read``, ``write``, ``image`` or ``import``, see
+    :func:`classify`) and to the default limit shared by all requests.
+
+    The clients acquire the limits once per request they send, including each retry, and hold them until the response
+    is received. A streamed response counts as in flight only until its headers arrived, reading its body is not
+    limited, so a long-lived stream neither blocks other requests nor is charged more than one token.
+    """
+
+    def __init__(
+        self,
+        limits: Mapping[EndpointClass, Limit] | None = None,
+        default: Limit | None = None,
+    ) -> None:
+        """Create a new Governor instance.
+
+        :param limits: The limits per endpoint class.
+        :param default: The limit applied to all requests.
+        """
+        limits = dict(limits or {})
+        unknown = set(limits) - set(ENDPOINT_CLASSES)
+        if unknown:
+            msg = f"Unknown endpoint classes: {', '.join(sorted(unknown))}."
+            raise ValueError(msg)
+        self.limits = limits
+        self.default = default
+
+    def _limits_for(self, method: str, path: str) -> list[Limit]:
+        # the default limit is always acquired first, so holders of different limits cannot deadlock
+        limits = [self.default, self.limits.get(classify(method, path))]
+        return [limit for limit in limits if limit is not None]
+
+    @contextmanager
+    def acquire(self, method: str, path: str) -> Iterator[None]:
+        """Block until the request may be sent and hold its slots until the context is left.
+
+        :param method: The HTTP method of the request.
+        :param path: The path or URL of the request.
+        """
+        acquired = []
+        try:
+            for limit in self._limits_for(method, path):
+                limit.acquire()
+                acquired.append(limit)
+            yield
+        finally:
+            for limit in reversed(acquired):
+                limit.release()
+
+    @asynccontextmanager
+    async def acquire_async(self, method: str, path: str) -> AsyncIterator[None]:
+        """Wait until the request may be sent and hold its slots until the context is left.
+
+        :param method: The HTTP method of the request.
+        :param path: The path or URL of the request.
+        """
+        acquired = []
+        try:
+            for limit in self._limits_for(method, path):
+                await limit.acquire_async()
+                acquired.append(limit)
+            yield
+        finally:
+            for limit in reversed(acquired):
+                limit.release()
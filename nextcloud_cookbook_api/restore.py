@@ -0,0 +1,200 @@
+"""Restore of a cookbook from an archive written by :func:`~nextcloud_cookbook_api.export.export_cookbook`.
+
+The recipes are read from the archive one at a time and created or updated concurrently, so the memory use does not
+depend on the size of the archive. A recipe which exists already on the server, found by its name or its source URL,
+is updated instead of created again. A checkpoint records every restored recipe as soon as it is done, so a crashed or
+cancelled restore can be run again without repeating the finished work.
+"""
+
+import os
+import tarfile
+import threading
+import time
+import zipfile
+from collections.abc import Iterator, Mapping
+from contextlib import closing
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO
+
+import requests
+from pydantic import ValidationError
+
+from nextcloud_cookbook_api.bulk import BulkResult, IdempotencyStore, Skipped, run_bulk
+from nextcloud_cookbook_api.client import CookbookClient
+from nextcloud_cookbook_api.importer import normalize_url
+from nextcloud_cookbook_api.models import Recipe
+
+
+@dataclass
+class RestoreReport:
+    """Summary of a restore run.
+
+    The recipes are listed by their IDs in the archive.
+    """
+
+    created: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    """The recipes restored by an earlier run, according to the checkpoint."""
+    failed: list[BulkResult[str]] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def recipes_per_second(self) -> float:
+        """The number of created and updated recipes per second."""
+        if self.seconds == 0:
+            return 0.0
+        return (len(self.created) + len(self.updated)) / self.seconds
+
+
+@dataclass
+class _Restored:
+    id: str
+    updated: bool
+
+
+class _Matcher:
+    """Find the existing recipe a restored recipe replaces.
+
+    An existing recipe is only matched by one recipe of the archive, further recipes with the same source URL are
+    created as new recipes.
+    """
+
+    def __init__(self, names: Mapping[str, str], urls: Mapping[str, str]) -> None:
+        self._names = dict(names)
+        self._urls = {normalize_url(u): i for u, i in urls.items() if u}
+        self._claimed: set[str] = set()
+        self._lock = threading.Lock()
+
+    def claim(self, recipe: Recipe) -> str | None:
+        # names are unique within a cookbook, so they take precedence over the URLs
+        candidates = [self._names.get(recipe.name)]
+        if recipe.url:
+            candidates.append(self._urls.get(normalize_url(recipe.url)))
+        with self._lock:
+            for recipe_id in candidates:
+                if recipe_id is not None and recipe_id not in self._claimed:
+                    self._claimed.add(recipe_id)
+                    return recipe_id
+        return None
+
+
+def _recipe_id(name: str) -> str | None:
+    parts = PurePosixPath(name).parts
+    if len(parts) == 3 and parts[0] == "recipes" and parts[2] == "recipe.json":
+        return parts[1]
+    return None
+
+
+def _read_recipes(source: str | os.PathLike | BinaryIO) -> Iterator[tuple[str, bytes]]:
+    if isinstance(source, (str, os.PathLike)):
+        source = Path(source)
+        is_zip = zipfile.is_zipfile(source)
+    else:
+        is_zip = source.seekable() and zipfile.is_zipfile(source)
+        if source.seekable():
+            source.seek(0)
+
+    if is_zip:
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                recipe_id = _recipe_id(info.filename)
+                if recipe_id is not None:
+                    yield recipe_id, archive.read(info)
+        return
+
+    # the stream mode reads the archive front to back, so it can come from a pipe
+    path, fileobj = (source, None) if isinstance(source, Path) else (None, source)
+    with tarfile.open(path, mode="r|*", fileobj=fileobj) as archive:
+        for member in archive:
+            recipe_id = _recipe_id(member.name)
+            if recipe_id is not None and member.isfile():
+                yield recipe_id, archive.extractfile(member).read()
+            # the members are only needed to extract the archive later, dropping them keeps the memory flat
+            archive.members.clear()
+
+
+def restore_cookbook(
+    client: CookbookClient,
+    source: str | os.PathLike | BinaryIO,
+    checkpoint: IdempotencyStore | None = None,
+    existing_urls: Mapping[str, str] | None = None,
+    max_workers: int = 8,
+) -> RestoreReport:
+    """Create or update all recipes of an archive written by :func:`~nextcloud_cookbook_api.export.export_cookbook`.
+
+    A recipe is updated if a recipe with the same name, or else with the same source URL, exists on the server, and
+    created otherwise. Created recipes get new IDs. The images in the archive are not uploaded, the Cookbook API has no
+    endpoint for it; the server downloads the image of each recipe from its ``image`` URL instead. Recipes which were
+    deleted according to an incremental archive are not deleted.
+
+    Pass a persistent checkpoint, e.g. ``IdempotencyStore("restore.jsonl")``, to resume a crashed or cancelled
+    restore. It records the server ID of every restored recipe by its ID in the archive, and recipes found in it are
+    skipped.
+
+    :param client: The client used to restore the recipes.
+    :param source: The path of the archive, or a readable binary file object. A tar archive need not be seekable.
+    :param checkpoint: The store recording the restored recipes.
+    :param existing_urls: The IDs of the existing recipes by their source URLs, e.g. from
+        :meth:`RecipeMirror.get_recipe_urls`. By default they are fetched with
+        :meth:`CookbookClient.get_recipe_urls`, which retrieves every recipe. Pass an empty mapping to only match
+        recipes by name.
+    :param max_workers: The maximum number of concurrent requests.
+    :return: The report of the created, updated, skipped and failed recipes and the throughput.
+    :raises ValueError: If the source is not a tar or zip archive.
+    """
+    start = time.perf_counter()
+    report = RestoreReport()
+    if existing_urls is None:
+        existing_urls = client.get_recipe_urls(max_workers=max_workers)
+    matcher = _Matcher({s.name: s.id for s in client.iter_recipes()}, existing_urls)
+
+    def restore(item: tuple[str, bytes]) -> _Restored | Skipped[_Restored]:
+        archive_id, data = item
+        if checkpoint is not None:
+            done = checkpoint.get(archive_id)
+            if done is not None:
+                return Skipped(_Restored(done, updated=False))
+        recipe = Recipe.model_validate_json(data)
+        recipe_id = matcher.claim(recipe)
+        if recipe_id is None:
+            # the server would overwrite the recipe with the ID in the body instead of creating a new one
+            recipe_id = client.create_recipe(recipe.model_copy(update={"id": ""}))
+            restored = _Restored(recipe_id, updated=False)
+        else:
+            client.update_recipe(recipe_id, recipe.model_copy(update={"id": recipe_id}))
+            restored = _Restored(recipe_id, updated=True)
+        if checkpoint is not None:
+            checkpoint.record(archive_id, recipe_id)
+        return restored
+
+    try:
+        with (
+            closing(_read_recipes(source)) as recipes,
+            closing(
+                run_bulk(
+                    restore,
+                    recipes,
+                    key=lambda item: item[0],
+                    errors=(requests.RequestException, ValidationError),
+                    max_workers=max_workers,
+                    ordered=False,
+                )
+            ) as results,
+        ):
+            for result in results:
+                if not result.ok:
+                    report.failed.append(BulkResult(result.id, error=result.error))
+                elif result.skipped:
+                    report.skipped.append(result.id)
+                elif result.value.updated:
+                    report.updated.append(result.id)
+                else:
+                    report.created.append(result.id)
+    except (tarfile.TarError, zipfile.BadZipFile) as e:
+        msg = f"'{source}' is not a cookbook archive."
+        raise ValueError(msg) from e
+
+    report.seconds = time.perf_counter() - start
+    return report
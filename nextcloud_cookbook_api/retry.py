@@ -0,0 +1,85 @@
+"""Retry policy for transient failures of API requests."""
+
+import random
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+IDEMPOTENT_METHODS = frozenset({"GET", "PUT", "DELETE"})
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Describes when and how often failed requests are retried.
+
+    Requests are retried on connection errors, timeouts and the configured status codes, waiting with exponential
+    backoff and random jitter between the attempts. A Retry-After header sent by the server takes precedence over the
+    computed backoff. POST requests are not idempotent, e.g. retrying :meth:`CookbookClient.create_recipe` can create
+    duplicates, so they are only retried if ``retry_post`` is enabled.
+    """
+
+    max_attempts: int = 3
+    """The maximum number of attempts per request, including the first one. Set to 1 to disable retries."""
+    status_codes: frozenset[int] = frozenset({429, 502, 503, 504})
+    """The response status codes which are considered transient."""
+    backoff_factor: float = 0.5
+    """The delay in seconds before the first retry, doubled for each further retry."""
+    max_backoff: float = 30.0
+    """The maximum delay in seconds between two attempts, also applied to Retry-After."""
+    jitter: float = 0.5
+    """The maximum random extra delay as a fraction of the backoff."""
+    retry_post: bool = False
+    """Whether POST requests are retried as well."""
+    respect_retry_after: bool = True
+    """Whether the Retry-After header of the server is used as delay."""
+
+    def can_retry(self, method: str, attempt: int) -> bool:
+        """Check whether a failed request may be attempted again.
+
+        :param method: The HTTP method of the request.
+        :param attempt: The number of the attempt which failed, starting at 1.
+        :return: True if another attempt is allowed.
+        """
+        if attempt >= self.max_attempts:
+            return False
+        return method in IDEMPOTENT_METHODS or (method == "POST" and self.retry_post)
+
+    def should_retry_status(self, status_code: int) -> bool:
+        """Check whether a response status code is considered transient.
+
+        :param status_code: The status code of the response.
+        :return: True if the request should be retried.
+        """
+        return status_code in self.status_codes
+
+    def backoff(self, attempt: int, retry_after: str | None = None) -> float:
+        """Compute the delay before the next attempt.
+
+        :param attempt: The number of the attempt which failed, starting at 1.
+        :param retry_after: The value of the Retry-After header of the failed response, if any.
+        :return: The delay in seconds.
+        """
+        if self.respect_retry_after and retry_after is not None:
+            delay = _parse_retry_after(retry_after)
+            if delay is not None:
+                return min(delay, self.max_backoff)
+
+        delay = min(self.backoff_factor * 2 ** (attempt - 1), self.max_backoff)
+        return delay + random.uniform(0, delay * self.jitter)
+
+
+def _parse_retry_after(value: str) -> float | None:
+    """Parse a Retry-After header given in seconds or as HTTP date.
+
+    :param value: The header value.
+    :return: The delay in seconds, or None if the value is invalid.
+    """
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((date - datetime.now(timezone.utc)).total_seconds(), 0.0)
@@ -0,0 +1,439 @@
+"""In-process full-text search over recipes with prefix matching and BM25 ranking.
+
+The index maps each token to the recipes containing it, so a query only looks at the recipes matching its rarest term
+instead of scanning all recipes. Matches in the name count more than matches in the instructions, see
+:data:`FIELD_WEIGHTS`. The last term of a query also matches tokens it is a prefix of, so the index can serve
+autocompletion while the user is typing.
+"""
+
+import heapq
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
+from math import log
+
+from nextcloud_cookbook_api.models import Recipe
+from nextcloud_cookbook_api.sync import SyncResult
+
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "keywords": 2.0,
+    "category": 2.0,
+    "description": 1.0,
+    "ingredients": 1.0,
+    "instructions": 0.5,
+}
+"""The weight of a token occurrence per recipe field."""
+
+PREFIX_WEIGHT = 0.8
+"""The weight of a token only matching the last query term as a prefix, relative to an exact match."""
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=65536)
+def _fold(word: str) -> str:
+    # remove accents, so "jalapeno" finds "jalapeño"
+    decomposed = unicodedata.normalize("NFKD", word.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> list[str]:
+    """Split a text into lower case tokens without accents.
+
+    :param text: The text to split.
+    :return: The tokens in the order of the text.
+    """
+    text = text.casefold()
+    words = _TOKEN_PATTERN.findall(text)
+    if text.isascii():
+        return words
+    return [_fold(word) for word in words]
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """A recipe matching a search query."""
+
+    id: str
+    name: str
+    score: float
+
+
+@dataclass
+class _TokenScores:
+    """The cached BM25 scores of a token, patched in place when recipes change."""
+
+    idf: float
+    document_frequency: int
+    by_recipe: dict[str, float]
+    ranked: list[tuple[float, str]] | None = None
+
+
+class SearchIndex:
+    """Inverted index over recipes, updated incrementally as recipes change.
+
+    The BM25 scores of a token are computed when it is first searched and patched when recipes are added or removed,
+    so updates do not slow down the following queries. They are recomputed once the number or the average length of
+    the recipes drifted by more than :attr:`tolerance`.
+
+    All methods can be called from several threads.
+    """
+
+    def __init__(
+        self,
+        k1: float = 1.2,
+        b: float = 0.75,
+        max_expansions: int = 50,
+        tolerance: float = 0.1,
+        prefix_cache_size: int = 1024,
+    ) -> None:
+        """Create a new SearchIndex instance.
+
+        :param k1: The BM25 term frequency saturation.
+        :param b: The BM25 document length normalization.
+        :param max_expansions: The maximum number of tokens a prefix is expanded to, the most common ones are used.
+        :param tolerance: The relative drift of the index statistics after which cached scores are recomputed.
+        :param prefix_cache_size: The maximum number of prefixes whose merged scores are cached.
+        """
+        self.k1 = k1
+        self.b = b
+        self.max_expansions = max_expansions
+        self.tolerance = tolerance
+        self.prefix_cache_size = prefix_cache_size
+        self._postings: dict[str, dict[str, float]] = {}
+        self._doc_tokens: dict[str, dict[str, float]] = {}
+        self._doc_lengths: dict[str, float] = {}
+        self._names: dict[str, str] = {}
+        self._total_length = 0.0
+        self._vocabulary: list[str] = []
+        self._scores: dict[str, _TokenScores] = {}
+        # the best scores of the tokens a prefix expands to, merged per recipe
+        self._prefix_scores: dict[str, _TokenScores] = {}
+        # the number and average length of the recipes the cached scores were computed with
+        self._stats = (0, 0.0)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_recipes(cls, recipes: Iterable[Recipe], **kwargs) -> "SearchIndex":
+        """Build an index from recipes.
+
+        :param recipes: The recipes to index.
+        :param kwargs: The arguments of the SearchIndex constructor.
+        :return: The new index.
+        """
+        index = cls(**kwargs)
+        index.add_all(recipes)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._doc_tokens)
+
+    def __contains__(self, recipe_id: object) -> bool:
+        return recipe_id in self._doc_tokens
+
+    def add(self, recipe: Recipe) -> None:
+        """Add a recipe to the index, replacing an older version of it.
+
+        :param recipe: The recipe to index.
+        """
+        self.add_all([recipe])
+
+    def add_all(self, recipes: Iterable[Recipe]) -> None:
+        """Add several recipes to the index, replacing older versions of them.
+
+        :param recipes: The recipes to index.
+        """
+        documents = [(r.id, r.name, self._weighted_tokens(r)) for r in recipes]
+        with self._lock:
+            touched: set[str] = set()
+            for recipe_id, name, tokens in documents:
+                touched.update(self._remove(recipe_id))
+                self._names[recipe_id] = name
+                self._doc_tokens[recipe_id] = tokens
+                length = sum(tokens.values())
+                self._doc_lengths[recipe_id] = length
+                self._total_length += length
+                for token, tf in tokens.items():
+                    postings = self._postings.get(token)
+                    if postings is None:
+                        postings = self._postings[token] = {}
+                        self._vocabulary.insert(
+                            bisect_left(self._vocabulary, token), token
+                        )
+                    postings[recipe_id] = tf
+                    scores = self._scores.get(token)
+                    if scores is not None:
+                        score = self._bm25(scores.idf, tf, length)
+                        scores.by_recipe[recipe_id] = score
+                        if scores.ranked is not None:
+                            insort(scores.ranked, (-score, recipe_id))
+                touched.update(tokens)
+            self._expire(touched)
+
+    def remove(self, recipe_id: str) -> None:
+        """Remove a recipe from the index. Unknown IDs are ignored.
+
+        :param recipe_id: The ID of the recipe.
+        """
+        with self._lock:
+            self._expire(self._remove(recipe_id))
+
+    def apply(self, result: SyncResult) -> None:
+        """Update the index with the changes found by a synchronisation.
+
+        :param result: The result of :meth:`RecipeSync.run` or :meth:`RecipeMirror.refresh`.
+        """
+        self.add_all(result.created + result.updated)
+        for recipe_id in result.deleted:
+            self.remove(recipe_id)
+
+    def _weighted_tokens(self, recipe: Recipe) -> dict[str, float]:
+        fields = {
+            "name": [recipe.name],
+            "keywords": recipe.keywords or [],
+            "category": [recipe.category],
+            "description": [recipe.description],
+            "ingredients": recipe.ingredients,
+            "instructions": recipe.instructions,
+        }
+        tokens: dict[str, float] = {}
+        for field, texts in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for token, count in Counter(tokenize("\n".join(texts))).items():
+                tokens[token] = tokens.get(token, 0.0) + count * weight
+        return tokens
+
+    def _remove(self, recipe_id: str) -> dict[str, float]:
+        tokens = self._doc_tokens.pop(recipe_id, None)
+        if tokens is None:
+            return {}
+        del self._names[recipe_id]
+        self._total_length -= self._doc_lengths.pop(recipe_id)
+        for token in tokens:
+            postings = self._postings[token]
+            del postings[recipe_id]
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+            scores = self._scores.get(token)
+            if scores is not None:
+                score = scores.by_recipe.pop(recipe_id)
+                if scores.ranked is not None:
+                    del scores.ranked[bisect_left(scores.ranked, (-score, recipe_id))]
+        return tokens
+
+    def _expire(self, tokens: Iterable[str]) -> None:
+        """Drop the cached scores which are too far off after recipes changed."""
+        for token in tokens:
+            # the merged scores of every prefix of a changed token are outdated
+            for end in range(1, len(token) + 1):
+                self._prefix_scores.pop(token[:end], None)
+        count, average = self._stats
+        if (
+            not self._doc_tokens
+            or not _close(len(self._doc_tokens), count, self.tolerance)
+            or not _close(
+                self._total_length / len(self._doc_tokens), average, self.tolerance
+            )
+        ):
+            self._scores.clear()
+            self._prefix_scores.clear()
+            return
+        for token in tokens:
+            scores = self._scores.get(token)
+            if scores is None:
+                continue
+            postings = self._postings.get(token)
+            if postings is None or not _close(
+                len(postings), scores.document_frequency, self.tolerance
+            ):
+                del self._scores[token]
+
+    def _bm25(self, idf: float, tf: float, length: float) -> float:
+        k1, b = self.k1, self.b
+        return idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / self._stats[1]))
+
+    def _token_scores(self, token: str) -> _TokenScores:
+        """Get the BM25 scores of a token for each recipe containing it."""
+        if not self._scores:
+            count = len(self._doc_tokens)
+            self._stats = (count, self._total_length / count)
+        scores = self._scores.get(token)
+        if scores is None:
+            postings = self._postings[token]
+            count = self._stats[0]
+            idf = log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            lengths = self._doc_lengths
+            by_recipe = {
+                recipe_id: self._bm25(idf, tf, lengths[recipe_id])
+                for recipe_id, tf in postings.items()
+            }
+            scores = self._scores[token] = _TokenScores(idf, len(postings), by_recipe)
+        return scores
+
+    def _merged_scores(self, prefix: str) -> _TokenScores | None:
+        """Get the scores of the recipes matching the tokens a prefix expands to, weighted by :data:`PREFIX_WEIGHT`.
+
+        Short prefixes expand to many common tokens, so merging their scores on every keystroke would dominate the
+        query time. The merged scores are cached until a recipe containing one of the tokens changes.
+        """
+        scores = self._prefix_scores.get(prefix)
+        if scores is not None:
+            return scores
+        tokens = self._expand(prefix)
+        if not tokens:
+            return None
+        if tokens == [prefix]:
+            return self._token_scores(prefix)
+        by_recipe: dict[str, float] = {}
+        for token in tokens:
+            factor = 1.0 if token == prefix else PREFIX_WEIGHT
+            for recipe_id, score in self._token_scores(token).by_recipe.items():
+                score *= factor
+                if score > by_recipe.get(recipe_id, 0.0):
+                    by_recipe[recipe_id] = score
+        scores = _TokenScores(0.0, len(by_recipe), by_recipe)
+        if len(self._prefix_scores) >= self.prefix_cache_size:
+            # drop the oldest entry
+            del self._prefix_scores[next(iter(self._prefix_scores))]
+        self._prefix_scores[prefix] = scores
+        return scores
+
+    def _expand(self, prefix: str) -> list[str]:
+        start = bisect_left(self._vocabulary, prefix)
+        end = bisect_left(self._vocabulary, prefix + "\U0010ffff", start)
+        if end - start <= self.max_expansions:
+            return self._vocabulary[start:end]
+        tokens = heapq.nlargest(
+            self.max_expansions,
+            self._vocabulary[start:end],
+            key=lambda t: len(self._postings[t]),
+        )
+        if prefix in self._postings and prefix not in tokens:
+            tokens[-1] = prefix
+        return tokens
+
+    def search(
+        self, query: str, limit: int = 10, prefix: bool = True
+    ) -> list[SearchHit]:
+        """Find the recipes matching all terms of a query, best matches first.
+
+        :param query: The search query.
+        :param limit: The maximum number of results.
+        :param prefix: Whether the last term also matches tokens it is a prefix of, e.g. for autocompletion. Recipes
+            containing the term itself rank higher than those only containing a longer token.
+        :return: The matching recipes ordered by descending score.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or limit <= 0:
+            return []
+
+        with self._lock:
+            # each term is matched by the recipes in its scores, a prefix by those of all its expansions
+            matches = [
+                self._token_scores(t) if t in self._postings else None
+                for t in terms[: -1 if prefix else None]
+            ]
+            if prefix:
+                matches.append(self._merged_scores(terms[-1]))
+            if not all(matches):
+                return []
+
+            if len(matches) == 1:
+                hits = list(islice(self._ranked(matches[0]), limit))
+            else:
+                hits = self._top_all(matches, limit)
+            return [SearchHit(i, self._names[i], s) for s, i in hits]
+
+    def _ranked(self, scores: _TokenScores) -> Iterator[tuple[float, str]]:
+        """Iterate over the recipes matching a term, best score first."""
+        if scores.ranked is None:
+            scores.ranked = sorted((-s, i) for i, s in scores.by_recipe.items())
+        for negative_score, recipe_id in scores.ranked:
+            yield -negative_score, recipe_id
+
+    def _top_threshold(
+        self, matches: list[_TokenScores], limit: int, budget: int
+    ) -> list[tuple[float, str]] | None:
+        """Find the best recipes by reading the best scores of each term in turn.
+
+        This is Fagin's threshold algorithm: no recipe which has not been seen yet can score more than the sum of the
+        last scores read of each term, so the search stops as soon as the results are better than that. Returns None
+        if that did not happen within the budget.
+        """
+        lookups = [m.by_recipe for m in matches]
+        streams = [self._ranked(m) for m in matches]
+        last = [0.0] * len(streams)
+        seen = set()
+        top: list[tuple[float, str]] = []
+        for _ in range(budget):
+            for n, stream in enumerate(streams):
+                item = next(stream, None)
+                if item is None:
+                    # every recipe matching all terms is in this stream and has been seen
+                    return sorted(top, reverse=True)
+                last[n], recipe_id = item
+                if recipe_id in seen:
+                    continue
+                seen.add(recipe_id)
+                total = 0.0
+                for by_recipe in lookups:
+                    score = by_recipe.get(recipe_id)
+                    if score is None:
+                        break
+                    total += score
+                else:
+                    if len(top) < limit:
+                        heapq.heappush(top, (total, recipe_id))
+                    elif total > top[0][0]:
+                        heapq.heapreplace(top, (total, recipe_id))
+            if len(top) == limit and top[0][0] >= sum(last):
+                return sorted(top, reverse=True)
+        return None
+
+    def _top_all(
+        self, matches: list[_TokenScores], limit: int
+    ) -> list[tuple[float, str]]:
+        # intersect the recipes of all terms before scoring, starting with the rarest term
+        scored = sorted((m.by_recipe for m in matches), key=len)
+        # common terms have many recipes in common, stopping early beats scoring all of them then
+        hits = self._top_threshold(matches, limit, len(scored[0]) // 8)
+        if hits is not None:
+            return hits
+        first, *rest = scored
+        candidates = first.keys()
+        for by_recipe in rest:
+            # intersecting the key views only iterates over the smaller side
+            candidates = by_recipe.keys() & candidates
+            if not candidates:
+                return []
+        candidates = list(candidates)
+        # summing the scores with map and zip keeps the loop over the candidates out of the interpreter
+        totals = map(sum, zip(*(map(s.__getitem__, candidates) for s in scored)))
+        return heapq.nlargest(limit, zip(totals, candidates))
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[str]:
+        """Get the most common tokens starting with a prefix, e.g. to complete a search term.
+
+        :param prefix: The beginning of the token.
+        :param limit: The maximum number of tokens.
+        :return: The tokens ordered by the number of recipes containing them.
+        """
+        folded = _fold(prefix.strip())
+        if not folded:
+            return []
+        with self._lock:
+            tokens = self._expand(folded)
+            tokens.sort(key=lambda t: -len(self._postings[t]))
+            return tokens[:limit]
+
+
+def _close(value: float, reference: float, tolerance: float) -> bool:
+    return abs(value - reference) <= tolerance * reference
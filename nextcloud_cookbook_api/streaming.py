@@ -0,0 +1,102 @@
+"""Incremental parsing of JSON arrays, so large list responses are processed without holding them in memory."""
+
+import codecs
+import json
+from enum import Enum
+from typing import Any
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]"
+
+
+class _State(Enum):
+    START = "start"
+    FIRST = "first"
+    VALUE = "value"
+    SEPARATOR = "separator"
+    END = "end"
+
+
+class JsonArrayParser:
+    """Parse a JSON array fed in chunks and return each element as soon as it is complete.
+
+    Only the unparsed rest of the input is kept, so the memory use is bounded by the largest element plus one chunk,
+    regardless of the length of the array.
+    """
+
+    def __init__(self) -> None:
+        """Create a new JsonArrayParser instance."""
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._state = _State.START
+
+    def feed(self, chunk: bytes) -> list[Any]:
+        """Parse the next chunk of the array.
+
+        :param chunk: The next bytes of the UTF-8 encoded JSON document.
+        :return: The elements completed by the chunk.
+        :raises ValueError: If the document is not a JSON array.
+        """
+        self._buffer += self._decoder.decode(chunk)
+        return self._parse(final=False)
+
+    def close(self) -> list[Any]:
+        """Finish parsing after the last chunk.
+
+        :return: The elements completed by the end of the document.
+        :raises ValueError: If the document is not a complete JSON array.
+        """
+        self._buffer += self._decoder.decode(b"", final=True)
+        items = self._parse(final=True)
+        if self._state is not _State.END:
+            msg = "The JSON array is incomplete."
+            raise ValueError(msg)
+        return items
+
+    def _parse(self, final: bool) -> list[Any]:
+        items = []
+        buffer = self._buffer
+        length = len(buffer)
+        pos = 0
+        while True:
+            while pos < length and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos == length:
+                break
+            char = buffer[pos]
+            if self._state is _State.START:
+                if char != "[":
+                    msg = f"Expected a JSON array, got {char!r}."
+                    raise ValueError(msg)
+                pos += 1
+                self._state = _State.FIRST
+            elif self._state is _State.FIRST and char == "]":
+                pos += 1
+                self._state = _State.END
+            elif self._state in (_State.FIRST, _State.VALUE):
+                try:
+                    item, end = _DECODER.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    # the element continues in the next chunk
+                    break
+                if (
+                    not final
+                    and type(item) in (int, float)
+                    and (end == length or buffer[end] not in _DELIMITERS)
+                ):
+                    # the number could continue in the next chunk, e.g. "1" followed by ".5"
+                    break
+                items.append(item)
+                pos = end
+                self._state = _State.SEPARATOR
+            elif self._state is _State.SEPARATOR and char in ",]":
+                pos += 1
+                self._state = _State.VALUE if char == "," else _State.END
+            else:
+                msg = f"Unexpected {char!r} at the end of the JSON array."
+                raise ValueError(msg)
+        self._buffer = buffer[pos:]
+        return items
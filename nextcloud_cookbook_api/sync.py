@@ -0,0 +1,151 @@
+"""Incremental synchronisation of recipes based on their modification date."""
+
+import json
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from nextcloud_cookbook_api.bulk import BulkResult
+from nextcloud_cookbook_api.client import CookbookClient
+from nextcloud_cookbook_api.models import Recipe, RecipeStub
+
+
+@dataclass
+class ManifestDiff:
+    """The difference between a manifest and the current recipe stubs of the server."""
+
+    new: list[RecipeStub] = field(default_factory=list)
+    changed: list[RecipeStub] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+    unchanged: list[RecipeStub] = field(default_factory=list)
+
+
+class Manifest:
+    """Mapping of recipe IDs to the modification date the recipe had when it was last synced."""
+
+    def __init__(self, entries: dict[str, datetime] | None = None) -> None:
+        """Create a new Manifest instance.
+
+        :param entries: The initial mapping of recipe IDs to modification dates.
+        """
+        self.entries = dict(entries or {})
+
+    @classmethod
+    def load(cls, path: str | os.PathLike) -> "Manifest":
+        """Load a manifest from a JSON file.
+
+        :param path: The path of the manifest file.
+        :return: The loaded manifest, or an empty manifest if the file does not exist.
+        """
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        with path.open() as f:
+            data = json.load(f)
+        return cls({k: datetime.fromisoformat(v) for k, v in data.items()})
+
+    def save(self, path: str | os.PathLike) -> None:
+        """Atomically write the manifest to a JSON file.
+
+        :param path: The path of the manifest file.
+        """
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with tmp_path.open("w") as f:
+            json.dump({k: v.isoformat() for k, v in self.entries.items()}, f)
+        tmp_path.replace(path)
+
+    def diff(self, stubs: Iterable[RecipeStub]) -> ManifestDiff:
+        """Compare the manifest with the current recipe stubs.
+
+        :param stubs: The recipe stubs as returned by :meth:`CookbookClient.get_recipes`.
+        :return: The new, changed, deleted and unchanged recipes.
+        """
+        diff = ManifestDiff()
+        seen = set()
+        for stub in stubs:
+            seen.add(stub.id)
+            known = self.entries.get(stub.id)
+            if known is None:
+                diff.new.append(stub)
+            elif known != stub.date_modified:
+                diff.changed.append(stub)
+            else:
+                diff.unchanged.append(stub)
+        diff.deleted = [i for i in self.entries if i not in seen]
+        return diff
+
+
+@dataclass
+class SyncResult:
+    """The outcome of a single synchronisation run."""
+
+    created: list[Recipe] = field(default_factory=list)
+    updated: list[Recipe] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+    failed: list[BulkResult[Recipe]] = field(default_factory=list)
+    unchanged: int = 0
+
+
+class RecipeSync:
+    """Fetch only the recipes that were created or modified since the last run.
+
+    Each run requests the recipe stubs once and then only the full recipes whose ``date_modified`` differs from the
+    manifest. Recipes that failed to fetch are not recorded in the manifest, so they are retried on the next run.
+    """
+
+    def __init__(
+        self,
+        client: CookbookClient,
+        manifest_path: str | os.PathLike | None = None,
+        max_workers: int = 8,
+    ) -> None:
+        """Create a new RecipeSync instance.
+
+        :param client: The client used to talk to the Cookbook API.
+        :param manifest_path: The path the manifest is loaded from and saved to after each run. If None, the manifest
+            is only kept in memory.
+        :param max_workers: The maximum number of concurrent recipe requests.
+        """
+        self.client = client
+        self.manifest_path = manifest_path
+        self.max_workers = max_workers
+        if manifest_path is None:
+            self.manifest = Manifest()
+        else:
+            self.manifest = Manifest.load(manifest_path)
+
+    def run(self) -> SyncResult:
+        """Synchronise the recipes with the server.
+
+        :return: The recipes which were created, updated or deleted since the last run.
+        """
+        diff = self.manifest.diff(self.client.get_recipes())
+        result = SyncResult(unchanged=len(diff.unchanged))
+
+        stubs = {s.id: s for s in diff.new + diff.changed}
+        new_ids = {s.id for s in diff.new}
+        for fetched in self.client.get_recipes_full(
+            stubs.values(),
+            max_workers=self.max_workers,
+            ordered=False,
+        ):
+            if not fetched.ok:
+                result.failed.append(fetched)
+                continue
+            if fetched.id in new_ids:
+                result.created.append(fetched.value)
+            else:
+                result.updated.append(fetched.value)
+            self.manifest.entries[fetched.id] = stubs[fetched.id].date_modified
+
+        for recipe_id in diff.deleted:
+            del self.manifest.entries[recipe_id]
+        result.deleted = diff.deleted
+
+        if self.manifest_path is not None:
+            self.manifest.save(self.manifest_path)
+
+        return result
@@ -0,0 +1,172 @@
+"""Request timeouts and deadlines bounding the wall-clock time of a group of requests.
+
+Timeouts and deadlines are stored in context variables, so they apply to all requests made in a ``with`` block, are
+inherited by asyncio tasks, and are handed to the worker threads of bulk operations explicitly.
+"""
+
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a request cannot be completed before the active deadline."""
+
+
+@dataclass(frozen=True)
+class Timeout:
+    """Connect and read timeouts of a single request attempt."""
+
+    connect: float | None = 10.0
+    """The maximum time in seconds to establish a connection, or None to wait forever."""
+    read: float | None = 30.0
+    """The maximum time in seconds to wait for data from the server between two reads, or None to wait forever."""
+
+    @classmethod
+    def of(cls, timeout: "Timeout | float | None") -> "Timeout":
+        """Normalize a timeout given as number of seconds for both phases, a Timeout object or None for no timeout.
+
+        :param timeout: The timeout.
+        :return: The Timeout object.
+        """
+        if isinstance(timeout, Timeout):
+            return timeout
+        return cls(timeout, timeout)
+
+    def bounded(self, seconds: float) -> "Timeout":
+        """Limit both timeouts to a maximum.
+
+        :param seconds: The maximum timeout in seconds.
+        :return: The limited Timeout object.
+        """
+        return Timeout(
+            seconds if self.connect is None else min(self.connect, seconds),
+            seconds if self.read is None else min(self.read, seconds),
+        )
+
+
+DEFAULT_TIMEOUT = Timeout()
+
+
+class Deadline:
+    """A point in time after which no further requests are sent."""
+
+    def __init__(
+        self, seconds: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """Create a new Deadline instance.
+
+        :param seconds: The budget in seconds, starting now.
+        :param clock: The monotonic clock measuring the budget in seconds, e.g. a fake clock in tests.
+        """
+        self.clock = clock
+        self.expires_at = clock() + seconds
+
+    def remaining(self) -> float:
+        """Get the remaining budget.
+
+        :return: The remaining time in seconds, 0 if the deadline has passed.
+        """
+        return max(self.expires_at - self.clock(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        """Whether the deadline has passed."""
+        return self.remaining() == 0
+
+    def check(self) -> None:
+        """Raise if the deadline has passed.
+
+        :raises DeadlineExceeded: If the deadline has passed.
+        """
+        if self.expired:
+            msg = "The deadline for the request has passed."
+            raise DeadlineExceeded(msg)
+
+
+_timeout_override: ContextVar[Timeout | None] = ContextVar(
+    "timeout_override", default=None
+)
+_deadline: ContextVar[Deadline | None] = ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Deadline | None:
+    """Get the deadline active in the current context.
+
+    :return: The active Deadline, or None if there is none.
+    """
+    return _deadline.get()
+
+
+@contextmanager
+def override_timeout(timeout: Timeout | float | None) -> Iterator[None]:
+    """Override the timeout configured on the client for all requests made within the block.
+
+    :param timeout: The timeout in seconds for both phases, a Timeout object or None for no timeout.
+    """
+    token = _timeout_override.set(Timeout.of(timeout))
+    try:
+        yield
+    finally:
+        _timeout_override.reset(token)
+
+
+@contextmanager
+def deadline(budget: Deadline | float | None) -> Iterator[Deadline | None]:
+    """Bound all requests made within the block, including retries and their backoff, by a deadline.
+
+    Nested deadlines can only shorten the active deadline, never extend it.
+
+    :param budget: The budget in seconds or a Deadline object. None keeps the active deadline.
+    :return: The active Deadline.
+    """
+    active = _deadline.get()
+    if budget is not None:
+        new = budget if isinstance(budget, Deadline) else Deadline(budget)
+        if active is None or new.expires_at < active.expires_at:
+            active = new
+    token = _deadline.set(active)
+    try:
+        yield active
+    finally:
+        _deadline.reset(token)
+
+
+def check_deadline() -> None:
+    """Raise if the deadline active in the current context has passed.
+
+    :raises DeadlineExceeded: If the active deadline has passed.
+    """
+    active = _deadline.get()
+    if active is not None:
+        active.check()
+
+
+def resolve_timeout(default: Timeout) -> Timeout:
+    """Get the timeout of the next request attempt in the current context.
+
+    The overridden or default timeout is limited to the remaining time of the active deadline. Note that the read
+    timeout limits the time between two reads, so a server sending a large body slowly can exceed the deadline.
+
+    :param default: The timeout configured on the client.
+    :return: The timeout to use.
+    :raises DeadlineExceeded: If the active deadline has passed.
+    """
+    timeout = _timeout_override.get() or default
+    active = _deadline.get()
+    if active is None:
+        return timeout
+    active.check()
+    return timeout.bounded(active.remaining())
+
+
+def fits_deadline(delay: float) -> bool:
+    """Check whether the active deadline allows to wait before the next attempt.
+
+    :param delay: The time in seconds to wait.
+    :return: True if there is no deadline or it will not have passed after the delay.
+    """
+    active = _deadline.get()
+    return active is None or delay < active.remaining()
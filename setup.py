@@ -26,7 +26,13 @@ setup(
         "Topic :: Internet :: WWW/HTTP",
         "Topic :: Utilities",
     ],
-    packages=find_packages(exclude=["tests"]),
+    packages=find_packages(exclude=["tests", "benchmarks"]),
     python_requires=">=3.10",
-    install_requires=["requests>=2.0,<3.0", "pydantic>=2.0,<3.0", "setuptools>=41.6.0"],
+    install_requires=[
+        "requests>=2.0,<3.0",
+        "pydantic>=2.0,<3.0",
+        "typing_extensions>=4.0",
+        "setuptools>=41.6.0",
+    ],
+    extras_require={"async": ["httpx>=0.23,<1.0"]},
 )
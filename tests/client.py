@@ -1,18 +1,31 @@
+import io
+import itertools
+import json
+import re
+import tempfile
+import threading
 import unittest
+from collections.abc import Iterator
 from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
 from urllib.parse import urljoin
 
+import requests
 import responses
 
+from nextcloud_cookbook_api.bulk import IdempotencyStore, run_bulk
 from nextcloud_cookbook_api.client import CookbookClient
 from nextcloud_cookbook_api.models import (
     Category,
     Config,
     Keyword,
+    LazyRecipe,
     Nutrition,
     Recipe,
     RecipeStub,
 )
+from nextcloud_cookbook_api.ratelimit import Governor, Limit
 
 
 class TestCookbookClient(unittest.TestCase):
@@ -597,6 +610,121 @@ class TestCookbookClient(unittest.TestCase):
         request = responses.calls[0].request
         assert request is not None
 
+    @responses.activate
+    def test_session_auth(self) -> None:
+        """Test that the password is only sent until a session exists and again when it expired."""
+        sessions = {"valid": True}
+
+        def callback(request):
+            if "Authorization" in request.headers:
+                sessions["valid"] = True
+                return 200, {"Set-Cookie": "nc_session_id=abc; Path=/"}, "[]"
+            if (
+                "nc_session_id=abc" in request.headers.get("Cookie", "")
+                and (sessions["valid"])
+            ):
+                return 200, {}, "[]"
+            return 401, {}, '{"message": "Unauthorized"}'
+
+        responses.add_callback(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/keywords"),
+            callback=callback,
+        )
+        client = CookbookClient(self.base_url, "user", "password", session_auth=True)
+
+        client.get_keywords()
+        client.get_keywords()
+        sessions["valid"] = False
+        client.get_keywords()
+        client.get_keywords()
+
+        assert [
+            ("Authorization" in c.request.headers, c.response.status_code)
+            for c in responses.calls
+        ] == [(True, 200), (False, 200), (False, 401), (True, 200), (False, 200)]
+
+    @responses.activate
+    def test_session_auth_rejected(self) -> None:
+        """Test falling back to the password when the server never accepts its session cookie."""
+
+        def callback(request):
+            if "Authorization" in request.headers:
+                return 200, {"Set-Cookie": "nc_session_id=abc; Path=/"}, "[]"
+            return 401, {}, '{"message": "Unauthorized"}'
+
+        responses.add_callback(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/keywords"),
+            callback=callback,
+        )
+        client = CookbookClient(self.base_url, "user", "password", session_auth=True)
+
+        for _ in range(5):
+            client.get_keywords()
+
+        sent = [
+            ("Authorization" in c.request.headers, c.response.status_code)
+            for c in responses.calls
+        ]
+        # the session is tried once, then every call sends one request with the password
+        assert sent == [(True, 200), (False, 401), *[(True, 200)] * 4]
+        assert responses.calls[1].request.headers["OCS-APIRequest"] == "true"
+        assert not client.session_auth
+
+    @responses.activate
+    def test_session_auth_threads(self) -> None:
+        """Test that threads sharing the cookie session do not fall back to the password for each other."""
+        sessions = {"valid": True}
+        password_sent = threading.Event()
+        release = threading.Event()
+
+        def callback(request):
+            if "Authorization" in request.headers:
+                if threading.current_thread().name == "late":
+                    password_sent.set()
+                    release.wait(timeout=5)
+                sessions["valid"] = True
+                return 200, {"Set-Cookie": "nc_session_id=abc; Path=/"}, "[]"
+            if sessions["valid"]:
+                return 200, {}, "[]"
+            return 401, {}, '{"message": "Unauthorized"}'
+
+        responses.add_callback(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/keywords"),
+            callback=callback,
+        )
+        client = CookbookClient(self.base_url, "user", "password", session_auth=True)
+
+        # a response to the password arrives after another thread confirmed the session
+        late = threading.Thread(target=client.get_keywords, name="late")
+        late.start()
+        password_sent.wait(timeout=5)
+        client.get_keywords()
+        client.get_keywords()
+        release.set()
+        late.join()
+        # the expiry of the session must not be taken for a rejection of a new session
+        sessions["valid"] = False
+        client.get_keywords()
+        assert client.session_auth
+
+        responses.calls.reset()
+        results = list(
+            run_bulk(
+                lambda _: client.get_keywords(),
+                range(40),
+                key=str,
+                errors=(requests.RequestException,),
+                max_workers=8,
+            )
+        )
+
+        assert all(r.ok for r in results)
+        assert client.session_auth
+        assert all("Authorization" not in c.request.headers for c in responses.calls)
+
     @responses.activate
     def test_http_error_handling(self) -> None:
         """Test that HTTP errors are properly raised."""
@@ -849,6 +977,512 @@ class TestCookbookClient(unittest.TestCase):
         assert result.folder == "/Recipes"
         assert result.update_interval == 60
 
+    def test_connection_is_reused(self) -> None:
+        """Test that consecutive requests are sent over one pooled connection."""
+        connections = []
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                connections.append(self.client_address)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"[]")
+
+            def log_message(self, *args) -> None:
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        base_url = f"http://127.0.0.1:{server.server_port}"
+
+        with CookbookClient(base_url, self.username, self.password) as client:
+            for _ in range(3):
+                client.get_keywords()
+        reused = set(connections)
+        connections.clear()
+        with CookbookClient(
+            base_url, self.username, self.password, keep_alive=False
+        ) as client:
+            for _ in range(3):
+                client.get_keywords()
+
+        # each connection is identified by the address and port of the client
+        assert len(reused) == 1
+        assert len(set(connections)) == 3
+
+    @responses.activate
+    def test_keep_alive_disabled(self) -> None:
+        """Test that disabling keep-alive asks the server to close the connection."""
+        client = CookbookClient(
+            self.base_url, self.username, self.password, keep_alive=False
+        )
+        responses.add(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/keywords"),
+            json=[],
+            status=200,
+        )
+
+        client.get_keywords()
+
+        assert responses.calls[0].request.headers["Connection"] == "close"
+
+    def test_context_manager_closes_session(self) -> None:
+        """Test that leaving the context manager closes the session."""
+        with CookbookClient(self.base_url, self.username, self.password) as client:
+            adapter = client._session.get_adapter(self.base_url)
+            assert adapter.poolmanager.pools is not None
+
+        assert len(adapter.poolmanager.pools) == 0
+
+    def _add_recipe_response(self, recipe_id: str, status: int = 200) -> None:
+        responses.add(
+            responses.GET,
+            urljoin(self.base_url, f"/apps/cookbook/api/v1/recipes/{recipe_id}"),
+            json={
+                "@type": "Recipe",
+                "id": recipe_id,
+                "name": f"Recipe {recipe_id}",
+                "dateCreated": "2023-01-01T10:00:00",
+                "dateModified": "2023-01-02T10:00:00",
+                "nutrition": {"@type": "NutritionInformation"},
+            },
+            status=status,
+        )
+
+    @responses.activate
+    def test_get_recipes_full(self) -> None:
+        """Test retrieving many full recipes in input order."""
+        for recipe_id in ["1", "2", "3"]:
+            self._add_recipe_response(recipe_id)
+        stub = RecipeStub.model_construct(id="3", name="Recipe 3")
+
+        results = list(self.client.get_recipes_full(["1", "2", stub], max_workers=2))
+
+        assert [r.id for r in results] == ["1", "2", "3"]
+        assert all(r.ok for r in results)
+        assert isinstance(results[2].value, Recipe)
+        assert results[2].value.name == "Recipe 3"
+
+    @responses.activate
+    def test_get_recipes_full_collects_errors(self) -> None:
+        """Test that a failing recipe does not abort the bulk fetch."""
+        self._add_recipe_response("1")
+        self._add_recipe_response("404", status=404)
+        self._add_recipe_response("2")
+
+        results = list(
+            self.client.get_recipes_full(["1", "404", "2"], ordered=False),
+        )
+
+        by_id = {r.id: r for r in results}
+        assert len(results) == 3
+        assert by_id["1"].ok
+        assert by_id["2"].ok
+        assert not by_id["404"].ok
+        assert isinstance(by_id["404"].error, requests.HTTPError)
+        assert by_id["404"].value is None
+
+    @responses.activate
+    def test_create_recipes_skips_created_recipes_on_rerun(self) -> None:
+        """Test that a re-run after a partial failure only creates the failed recipes."""
+        created = []
+
+        def create(request: requests.PreparedRequest) -> tuple[int, dict, str]:
+            name = json.loads(request.body)["name"]
+            if name == "Broken" and not created.count("Pasta"):
+                return 400, {}, "error"
+            created.append(name)
+            return 200, {}, str(len(created))
+
+        responses.add_callback(
+            responses.POST,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/recipes"),
+            callback=create,
+        )
+        recipes = [
+            Recipe.model_construct(name=name, url=f"http://example.com/{name}")
+            for name in ["Soup", "Broken", "Pasta"]
+        ]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "created.jsonl"
+            first = list(
+                self.client.create_recipes(
+                    recipes[:2],
+                    idempotency_key=lambda r: r.url,
+                    idempotency_store=IdempotencyStore(path),
+                )
+            )
+            created.append("Pasta")
+            second = list(
+                self.client.create_recipes(
+                    recipes,
+                    idempotency_key=lambda r: r.url,
+                    idempotency_store=IdempotencyStore(path),
+                )
+            )
+
+        assert [r.value for r in first] == ["1", None]
+        assert isinstance(first[1].error, requests.HTTPError)
+        assert [(r.id, r.value) for r in second] == [
+            ("http://example.com/Soup", "1"),
+            ("http://example.com/Broken", "3"),
+            ("http://example.com/Pasta", "4"),
+        ]
+        assert [r.skipped for r in second] == [True, False, False]
+        assert created == ["Soup", "Pasta", "Broken", "Pasta"]
+
+    @responses.activate
+    def test_import_recipes_resumes_from_checkpoint(self) -> None:
+        """Test that a bulk import skips existing and already imported URLs."""
+        imported = []
+        failing = {"https://example.com/broken"}
+
+        def import_url(request: requests.PreparedRequest) -> tuple[int, dict, str]:
+            url = json.loads(request.body)["url"]
+            if url in failing:
+                return 400, {}, "error"
+            if url == "https://example.com/elsewhere":
+                return 409, {}, '{"msg": "Recipe already exists"}'
+            imported.append(url)
+            recipe = {
+                "@type": "Recipe",
+                "id": str(len(imported) + 10),
+                "name": url,
+                "url": url,
+                "dateCreated": "2023-01-01T10:00:00",
+                "dateModified": "2023-01-01T10:00:00",
+                "nutrition": {"@type": "NutritionInformation"},
+            }
+            return 200, {}, json.dumps(recipe)
+
+        responses.add_callback(
+            responses.POST,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/import"),
+            callback=import_url,
+        )
+        urls = [
+            "https://example.com/soup",
+            "https://EXAMPLE.com/existing/#comments",
+            "https://example.com/broken",
+            "https://example.com/soup/",
+            "https://example.com/elsewhere",
+        ]
+        existing = {"https://example.com/existing": "1"}
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "import.jsonl"
+            first = list(
+                self.client.import_recipes(
+                    iter(urls),
+                    existing=existing,
+                    checkpoint=IdempotencyStore(path),
+                    max_workers=1,
+                )
+            )
+            failing.clear()
+            second = list(
+                self.client.import_recipes(
+                    urls, existing=existing, checkpoint=IdempotencyStore(path)
+                )
+            )
+
+        assert [(r.value, r.skipped, r.ok) for r in first] == [
+            ("11", False, True),
+            ("1", True, True),
+            (None, False, False),
+            ("11", True, True),
+            (None, True, True),
+        ]
+        assert {r.id: r.value for r in second if not r.skipped} == {
+            "https://example.com/broken": "12"
+        }
+        assert imported == ["https://example.com/soup", "https://example.com/broken"]
+
+    def test_create_recipes_rejects_duplicate_keys(self) -> None:
+        """Test that recipes with the same idempotency key are rejected upfront."""
+        recipe = Recipe.model_construct(name="Soup", url="http://example.com/soup")
+
+        with self.assertRaises(ValueError):
+            self.client.create_recipes(
+                [recipe, recipe], idempotency_key=lambda r: r.url
+            )
+        with self.assertRaises(ValueError):
+            self.client.create_recipes([recipe], idempotency_store=IdempotencyStore())
+
+    @responses.activate
+    def test_update_and_delete_recipes(self) -> None:
+        """Test updating and deleting many recipes."""
+        for recipe_id in ["1", "2"]:
+            url = urljoin(self.base_url, f"/apps/cookbook/api/v1/recipes/{recipe_id}")
+            responses.add(responses.PUT, url, body=recipe_id)
+            responses.add(responses.DELETE, url, body=recipe_id)
+        url = urljoin(self.base_url, "/apps/cookbook/api/v1/recipes/404")
+        responses.add(responses.PUT, url, status=404)
+        responses.add(responses.DELETE, url, status=404)
+        recipes = [
+            Recipe.model_construct(id=i, name=f"Recipe {i}") for i in ["1", "404"]
+        ]
+
+        updated = list(self.client.update_recipes(recipes))
+        deleted = list(self.client.delete_recipes(["1", "2", "404"], ordered=False))
+
+        assert [(r.id, r.ok) for r in updated] == [("1", True), ("404", False)]
+        assert {r.id: r.ok for r in deleted} == {"1": True, "2": True, "404": False}
+
+    @responses.activate
+    def test_update_recipes_consumes_lazily(self) -> None:
+        """Test that the recipes to update are consumed as a stream."""
+        responses.add(
+            responses.PUT,
+            re.compile(rf"{self.base_url}/apps/cookbook/api/v1/recipes/\d+"),
+            body="1",
+        )
+        consumed = []
+
+        def recipes() -> Iterator[Recipe]:
+            for i in range(100):
+                consumed.append(i)
+                yield Recipe.model_construct(id=str(i), name=f"Recipe {i}")
+
+        results = self.client.update_recipes(recipes(), max_workers=2)
+        first = list(itertools.islice(results, 3))
+        results.close()
+
+        assert [r.id for r in first] == ["0", "1", "2"]
+        assert len(consumed) <= 3 + 2 * 2
+
+    @responses.activate
+    def test_update_recipes_if_changed(self) -> None:
+        """Test skipping updates which do not change a recipe."""
+        recipe_data = {
+            "@type": "Recipe",
+            "name": "Pasta",
+            "dateCreated": "2023-01-01T10:00:00",
+            "dateModified": "2023-01-02T10:00:00",
+            "nutrition": {"@type": "NutritionInformation"},
+        }
+        for recipe_id in ["1", "2"]:
+            url = urljoin(self.base_url, f"/apps/cookbook/api/v1/recipes/{recipe_id}")
+            responses.add(responses.GET, url, json={**recipe_data, "id": recipe_id})
+            responses.add(responses.PUT, url, body=recipe_id)
+        unchanged = Recipe.model_validate({**recipe_data, "id": "1"})
+        base = Recipe.model_validate({**recipe_data, "id": "2"})
+        changed = base.model_copy(update={"description": "Quick"})
+
+        planned = list(
+            self.client.update_recipes_if_changed(
+                [unchanged, changed], base={"2": base}, dry_run=True
+            )
+        )
+        diff = self.client.update_recipe_if_changed("2", changed)
+
+        assert [r.value.fields for r in planned] == [[], ["description"]]
+        assert not any(r.value.written for r in planned)
+        assert diff.written
+        assert diff.changes[0].new == "Quick"
+        assert [c.request.method for c in responses.calls] == ["GET", "GET", "PUT"]
+
+    @responses.activate
+    def test_iter_recipe_main_image(self) -> None:
+        """Test streaming a recipe image in chunks."""
+        image_data = bytes(range(256)) * 4
+        responses.add(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/recipes/1/image"),
+            body=image_data,
+            status=200,
+        )
+
+        chunks = list(self.client.iter_recipe_main_image("1", chunk_size=100))
+
+        assert b"".join(chunks) == image_data
+        assert max(len(c) for c in chunks) <= 100
+
+    @responses.activate
+    def test_iter_recipes(self) -> None:
+        """Test parsing the recipe list incrementally."""
+        recipes_data = [
+            {
+                "id": str(i),
+                "name": f"Recipe {i}",
+                "keywords": "tag",
+                "dateCreated": "2023-01-01T10:00:00",
+                "dateModified": "2023-01-02T10:00:00",
+                "imageUrl": "",
+                "imagePlaceholderUrl": "",
+            }
+            for i in range(20)
+        ]
+        responses.add(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/recipes"),
+            json=recipes_data,
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/search/pasta"),
+            json=recipes_data[:1],
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/search/missing"),
+            status=404,
+        )
+
+        result = list(self.client.iter_recipes(chunk_size=100))
+        found = list(self.client.iter_search_recipes("pasta"))
+
+        assert result == self.client.get_recipes()
+        assert [r.name for r in found] == ["Recipe 0"]
+        with self.assertRaises(requests.HTTPError):
+            list(self.client.iter_search_recipes("missing"))
+
+    @responses.activate
+    def test_nested_calls_while_streaming(self) -> None:
+        """Test that an open stream does not hold a slot of the concurrency limit."""
+        stubs = [
+            {
+                "id": str(i),
+                "name": f"Recipe {i}",
+                "dateCreated": "2023-01-01T10:00:00",
+                "dateModified": "2023-01-02T10:00:00",
+            }
+            for i in range(3)
+        ]
+        responses.add(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/recipes"),
+            json=stubs,
+        )
+        responses.add(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/recipes/0/image"),
+            body=b"image" * 100,
+        )
+        for stub in stubs:
+            responses.add(
+                responses.GET,
+                urljoin(self.base_url, f"/apps/cookbook/api/v1/recipes/{stub['id']}"),
+                json={
+                    **stub,
+                    "@type": "Recipe",
+                    "nutrition": {"@type": "NutritionInformation"},
+                },
+            )
+        client = CookbookClient(
+            self.base_url,
+            self.username,
+            self.password,
+            governor=Governor(default=Limit(max_in_flight=1)),
+        )
+        names = []
+
+        def run() -> None:
+            for stub in client.iter_recipes(chunk_size=10):
+                names.append(client.get_recipe(stub.id).name)
+            for _ in client.iter_recipe_main_image("0", chunk_size=100):
+                names.append(client.get_recipe("0").name)
+
+        # run in a thread, so a deadlock fails the test instead of hanging it
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert names == ["Recipe 0", "Recipe 1", "Recipe 2", *["Recipe 0"] * 5]
+
+    @responses.activate
+    def test_download_recipe_main_image_to_path(self) -> None:
+        """Test downloading a recipe image to a file path."""
+        image_data = b"\x89PNG\r\n\x1a\n" * 100
+        responses.add(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/recipes/1/image"),
+            body=image_data,
+            status=200,
+        )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "image.png"
+            written = self.client.download_recipe_main_image("1", path, size="thumb")
+
+            assert written == len(image_data)
+            assert path.read_bytes() == image_data
+
+    @responses.activate
+    def test_download_recipe_main_image_resume(self) -> None:
+        """Test resuming a partial download with a range request."""
+        image_data = b"0123456789"
+        responses.add(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/recipes/1/image"),
+            body=image_data[4:],
+            status=206,
+        )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "image.png"
+            path.write_bytes(image_data[:4])
+            written = self.client.download_recipe_main_image("1", path, resume=True)
+
+            assert written == 6
+            assert path.read_bytes() == image_data
+            assert responses.calls[0].request.headers["Range"] == "bytes=4-"
+
+    @responses.activate
+    def test_download_recipe_main_image_resume_without_range_support(self) -> None:
+        """Test resuming a download when the server ignores the range request."""
+        image_data = b"0123456789"
+        responses.add(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/recipes/1/image"),
+            body=image_data,
+            status=200,
+        )
+
+        target = io.BytesIO()
+        target.write(image_data[:4])
+        written = self.client.download_recipe_main_image("1", target, resume=True)
+
+        assert written == 6
+        assert target.getvalue() == image_data
+
+    @responses.activate
+    def test_download_recipe_main_image_already_complete(self) -> None:
+        """Test resuming a download which is already complete."""
+        responses.add(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/recipes/1/image"),
+            status=416,
+        )
+
+        target = io.BytesIO(b"0123456789")
+        target.seek(0, io.SEEK_END)
+        written = self.client.download_recipe_main_image("1", target, resume=True)
+
+        assert written == 0
+
+    @responses.activate
+    def test_get_recipe_lazy(self) -> None:
+        """Test retrieving a recipe which is validated on field access."""
+        self._add_recipe_response("1")
+
+        result = self.client.get_recipe_lazy("1")
+
+        assert isinstance(result, LazyRecipe)
+        assert result.name == "Recipe 1"
+        assert result.to_recipe().id == "1"
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,40 @@
+"""Recipe data shared by the test modules, as returned by the Cookbook API."""
+
+from typing import Any
+
+STUB_KEYS = ("id", "name", "keywords", "dateCreated", "dateModified", "imageUrl")
+
+
+def recipe_data(
+    recipe_id: str,
+    name: str = "",
+    modified: str = "2023-01-02T10:00:00",
+    **fields: Any,
+) -> dict:
+    """Build the JSON of a recipe.
+
+    :param recipe_id: The ID of the recipe.
+    :param name: The name of the recipe, ``Recipe <ID>`` by default.
+    :param modified: The modification date.
+    :param fields: Further fields of the recipe, by their JSON name.
+    :return: The recipe.
+    """
+    return {
+        "@type": "Recipe",
+        "id": recipe_id,
+        "name": name or f"Recipe {recipe_id}",
+        "keywords": "",
+        "dateCreated": "2023-01-01T10:00:00",
+        "dateModified": modified,
+        "nutrition": {"@type": "NutritionInformation"},
+        **fields,
+    }
+
+
+def stub_data(recipe: dict) -> dict:
+    """Build the JSON of the stub of a recipe, as listed by the server.
+
+    :param recipe: The recipe.
+    :return: The stub.
+    """
+    return {k: recipe[k] for k in STUB_KEYS if k in recipe}
@@ -0,0 +1,71 @@
+import unittest
+
+from pydantic import ValidationError
+
+from nextcloud_cookbook_api.models import LazyRecipe, Nutrition, Recipe
+
+RECIPE_JSON = {
+    "@type": "Recipe",
+    "id": "1",
+    "name": "Baked bananas",
+    "keywords": "sweets, fruit",
+    "dateCreated": "2021-01-01T00:00:00+00:00",
+    "dateModified": "2021-01-02T00:00:00+00:00",
+    "recipeYield": "not a number",
+    "recipeCategory": "Dessert",
+    "recipeIngredient": ["100g ripe Bananas"],
+    "nutrition": {"@type": "NutritionInformation", "calories": "650 kcal"},
+}
+
+
+class TestLazyRecipeModel(unittest.TestCase):
+    def test_fields_are_validated_on_access(self) -> None:
+        r = LazyRecipe(RECIPE_JSON)
+
+        assert r.name == "Baked bananas"
+        assert r.category == "Dessert"
+        assert r.ingredients == ["100g ripe Bananas"]
+        assert r.keywords == ["sweets", "fruit"]
+        assert isinstance(r.nutrition, Nutrition)
+        assert r.nutrition.calories == "650 kcal"
+
+    def test_missing_fields_use_defaults(self) -> None:
+        r = LazyRecipe(RECIPE_JSON)
+
+        assert r.description == ""
+        assert r.tools == []
+        assert r.prep_time is None
+
+    def test_invalid_fields_fail_only_on_access(self) -> None:
+        r = LazyRecipe(RECIPE_JSON)
+
+        assert r.name == "Baked bananas"
+        with self.assertRaises(ValidationError):
+            _ = r.servings
+
+    def test_missing_required_field(self) -> None:
+        r = LazyRecipe({"id": "1"})
+
+        with self.assertRaises(ValidationError):
+            _ = r.name
+
+    def test_unknown_attribute(self) -> None:
+        r = LazyRecipe(RECIPE_JSON)
+
+        with self.assertRaises(AttributeError):
+            _ = r.unknown
+
+    def test_to_recipe(self) -> None:
+        r = LazyRecipe({**RECIPE_JSON, "recipeYield": 2})
+
+        recipe = r.to_recipe()
+
+        assert isinstance(recipe, Recipe)
+        assert recipe.servings == 2
+
+        with self.assertRaises(ValidationError):
+            LazyRecipe(RECIPE_JSON).to_recipe()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,501 @@
+import asyncio
+import io
+import json
+import unittest
+from datetime import datetime
+
+import httpx
+
+from nextcloud_cookbook_api.async_client import AsyncCookbookClient
+from nextcloud_cookbook_api.bulk import IdempotencyStore
+from nextcloud_cookbook_api.models import (
+    Category,
+    Config,
+    Keyword,
+    Nutrition,
+    Recipe,
+    RecipeStub,
+)
+from nextcloud_cookbook_api.ratelimit import Governor, Limit
+from nextcloud_cookbook_api.retry import RetryPolicy
+
+RECIPE_STUB_DATA = {
+    "id": "1",
+    "name": "Pasta",
+    "keywords": "pasta,vegetarian",
+    "dateCreated": "2023-01-01T10:00:00",
+    "dateModified": "2023-01-02T10:00:00",
+    "imageUrl": "http://example.com/image1.jpg",
+    "imagePlaceholderUrl": "http://example.com/placeholder1.jpg",
+}
+
+RECIPE_DATA = {
+    **RECIPE_STUB_DATA,
+    "@type": "Recipe",
+    "recipeCategory": "Main Courses",
+    "recipeIngredient": ["Ingredient 1"],
+    "recipeInstructions": ["Step 1"],
+    "nutrition": {"@type": "NutritionInformation", "calories": "500 kcal"},
+}
+
+
+class TestAsyncCookbookClient(unittest.IsolatedAsyncioTestCase):
+    """Test suite for AsyncCookbookClient API methods."""
+
+    def setUp(self) -> None:
+        """Set up test fixtures."""
+        self.base_url = "http://localhost:8080"
+        self.routes = {}
+        self.calls = []
+        self.client = AsyncCookbookClient(
+            self.base_url,
+            "testuser",
+            "testpass",
+            transport=httpx.MockTransport(self._handle),
+        )
+
+    async def asyncTearDown(self) -> None:
+        await self.client.close()
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append(request)
+        status, body = self.routes.get(
+            (request.method, request.url.raw_path.decode().split("?")[0]),
+            (404, {"error": "Not found"}),
+        )
+        if isinstance(body, bytes):
+            return httpx.Response(status, content=body)
+        if isinstance(body, str):
+            return httpx.Response(status, text=body)
+        return httpx.Response(status, json=body)
+
+    def add(self, method: str, path: str, body=None, status: int = 200) -> None:
+        self.routes[(method, path)] = (status, body)
+
+    async def test_get_keywords(self) -> None:
+        """Test retrieving all keywords."""
+        self.add(
+            "GET",
+            "/apps/cookbook/api/v1/keywords",
+            [{"name": "vegan", "recipe_count": 3}],
+        )
+
+        result = await self.client.get_keywords()
+
+        assert isinstance(result[0], Keyword)
+        assert result[0].name == "vegan"
+        assert self.calls[0].headers["Authorization"].startswith("Basic ")
+
+    async def test_get_categories(self) -> None:
+        """Test retrieving all categories."""
+        self.add(
+            "GET",
+            "/apps/cookbook/api/v1/categories",
+            [{"name": "Desserts", "recipe_count": 10}],
+        )
+
+        result = await self.client.get_categories()
+
+        assert isinstance(result[0], Category)
+        assert result[0].recipe_count == 10
+
+    async def test_get_recipes(self) -> None:
+        """Test retrieving all recipes."""
+        self.add("GET", "/apps/cookbook/api/v1/recipes", [RECIPE_STUB_DATA])
+
+        result = await self.client.get_recipes()
+
+        assert isinstance(result[0], RecipeStub)
+        assert result[0].keywords == ["pasta", "vegetarian"]
+
+    async def test_search_recipes_by_keywords(self) -> None:
+        """Test searching recipes by keywords."""
+        self.add("GET", "/apps/cookbook/api/v1/tags/pasta,vegan", [RECIPE_STUB_DATA])
+
+        result = await self.client.search_recipes_by_keywords(["pasta", "vegan"])
+
+        assert result[0].name == "Pasta"
+
+    async def test_get_recipes_by_category_none(self) -> None:
+        """Test retrieving recipes without category."""
+        self.add("GET", "/apps/cookbook/api/v1/category/_", [])
+
+        result = await self.client.get_recipes_by_category(None)
+
+        assert result == []
+
+    async def test_search_recipes(self) -> None:
+        """Test searching for recipes with special characters."""
+        self.add(
+            "GET",
+            "/apps/cookbook/api/v1/search/caf%C3%A9%20au%20lait",
+            [RECIPE_STUB_DATA],
+        )
+
+        result = await self.client.search_recipes("café au lait")
+
+        assert len(result) == 1
+
+    async def test_get_recipe(self) -> None:
+        """Test retrieving a specific recipe."""
+        self.add("GET", "/apps/cookbook/api/v1/recipes/1", RECIPE_DATA)
+
+        result = await self.client.get_recipe("1")
+
+        assert isinstance(result, Recipe)
+        assert result.category == "Main Courses"
+
+    async def test_get_recipe_http_error(self) -> None:
+        """Test that HTTP errors are properly raised."""
+        with self.assertRaises(httpx.HTTPStatusError):
+            await self.client.get_recipe("999")
+
+    async def test_import_recipe(self) -> None:
+        """Test importing a recipe from URL."""
+        self.add("POST", "/apps/cookbook/api/v1/import", RECIPE_DATA)
+
+        result = await self.client.import_recipe("http://example.com/recipe")
+
+        assert result.id == "1"
+        assert json.loads(self.calls[0].content) == {
+            "url": "http://example.com/recipe",
+        }
+
+    async def test_get_recipe_main_image(self) -> None:
+        """Test retrieving a recipe thumbnail."""
+        image_data = b"\x89PNG\r\n\x1a\n"
+        self.add("GET", "/apps/cookbook/api/v1/recipes/1/image", image_data)
+
+        result = await self.client.get_recipe_main_image("1", size="thumb")
+
+        assert result == image_data
+        assert self.calls[0].url.params["size"] == "thumb"
+
+    async def test_create_update_delete_recipe(self) -> None:
+        """Test creating, updating and deleting a recipe."""
+        recipe = Recipe.model_construct(
+            id="new",
+            name="New Recipe",
+            keywords=["test"],
+            date_created=datetime.now(),
+            date_modified=datetime.now(),
+            nutrition=Nutrition.model_construct(type="NutritionInformation"),
+        )
+        self.add("POST", "/apps/cookbook/api/v1/recipes", "123")
+        self.add("PUT", "/apps/cookbook/api/v1/recipes/123", None)
+        self.add("DELETE", "/apps/cookbook/api/v1/recipes/123", None)
+
+        recipe_id = await self.client.create_recipe(recipe)
+        await self.client.update_recipe(recipe_id, recipe)
+        await self.client.delete_recipe(recipe_id)
+
+        assert recipe_id == "123"
+        assert [c.method for c in self.calls] == ["POST", "PUT", "DELETE"]
+
+    async def test_rename_category_not_found(self) -> None:
+        """Test renaming a non-existent category."""
+        self.add(
+            "GET",
+            "/apps/cookbook/api/v1/categories",
+            [{"name": "Desserts", "recipe_count": 10}],
+        )
+
+        with self.assertRaises(ValueError):
+            await self.client.rename_category("NonExistent", "NewName")
+
+    async def test_get_and_set_config(self) -> None:
+        """Test retrieving and setting the configuration."""
+        self.add("GET", "/apps/cookbook/api/v1/config", {"folder": "/Recipes"})
+        self.add("POST", "/apps/cookbook/api/v1/config", None)
+
+        config = await self.client.get_config()
+        await self.client.set_config(Config(folder="/Other"))
+
+        assert config.folder == "/Recipes"
+        assert json.loads(self.calls[1].content)["folder"] == "/Other"
+
+    async def test_get_ocr_capabilities(self) -> None:
+        """Test retrieving OCR capabilities."""
+        self.add("GET", "/ocs/v2.php/cloud/capabilities", {"ocs": {}})
+
+        result = await self.client.get_ocr_capabilities()
+
+        assert result == {"ocs": {}}
+        assert self.calls[0].headers["OCS-APIRequest"] == "true"
+
+    async def test_get_recipes_full(self) -> None:
+        """Test retrieving many full recipes with a failing one in between."""
+        self.add("GET", "/apps/cookbook/api/v1/recipes/1", RECIPE_DATA)
+        self.add("GET", "/apps/cookbook/api/v1/recipes/2", {**RECIPE_DATA, "id": "2"})
+
+        results = [
+            r
+            async for r in self.client.get_recipes_full(
+                ["1", "404", "2"],
+                max_concurrency=2,
+            )
+        ]
+
+        assert [r.id for r in results] == ["1", "404", "2"]
+        assert results[1].value is None
+        assert isinstance(results[1].error, httpx.HTTPStatusError)
+        assert results[2].value.id == "2"
+
+    async def test_import_recipes(self) -> None:
+        """Test importing many URLs, skipping the source URLs of existing recipes."""
+        self.add("GET", "/apps/cookbook/api/v1/recipes", [RECIPE_STUB_DATA])
+        self.add(
+            "GET",
+            "/apps/cookbook/api/v1/recipes/1",
+            {**RECIPE_DATA, "url": "http://example.com/pasta"},
+        )
+        self.add("POST", "/apps/cookbook/api/v1/import", {**RECIPE_DATA, "id": "2"})
+
+        results = [
+            r
+            async for r in self.client.import_recipes(
+                ["http://example.com/pasta", "http://example.com/soup"], ordered=True
+            )
+        ]
+
+        assert [(r.value, r.skipped) for r in results] == [("1", True), ("2", False)]
+        assert json.loads(self.calls[-1].content) == {"url": "http://example.com/soup"}
+
+    async def test_bulk_writes(self) -> None:
+        """Test creating, updating and deleting many recipes."""
+        self.add("POST", "/apps/cookbook/api/v1/recipes", "7")
+        self.add("PUT", "/apps/cookbook/api/v1/recipes/7", "7")
+        self.add("DELETE", "/apps/cookbook/api/v1/recipes/7", "7")
+        store = IdempotencyStore()
+        store.record("soup", "3")
+        recipes = [
+            Recipe.model_construct(id=name, name=name) for name in ["soup", "pasta"]
+        ]
+
+        created = [
+            r
+            async for r in self.client.create_recipes(
+                recipes,
+                idempotency_key=lambda r: r.name,
+                idempotency_store=store,
+            )
+        ]
+        updated = [
+            r
+            async for r in self.client.update_recipes(
+                [Recipe.model_construct(id="7", name="pasta")]
+            )
+        ]
+        deleted = [r async for r in self.client.delete_recipes(["7", "404"])]
+
+        assert [(r.id, r.value) for r in created] == [("soup", "3"), ("pasta", "7")]
+        assert [r.skipped for r in created] == [True, False]
+        assert store.get("pasta") == "7"
+        assert [c.method for c in self.calls] == ["POST", "PUT", "DELETE", "DELETE"]
+        assert updated[0].ok
+        assert [r.ok for r in deleted] == [True, False]
+
+    async def test_update_recipes_if_changed(self) -> None:
+        """Test skipping updates which do not change a recipe."""
+        self.add("GET", "/apps/cookbook/api/v1/recipes/1", RECIPE_DATA)
+        self.add("PUT", "/apps/cookbook/api/v1/recipes/1", "1")
+        recipe = Recipe.model_validate(RECIPE_DATA)
+        changed = recipe.model_copy(update={"ingredients": ["Ingredient 2"]})
+
+        unchanged = await self.client.update_recipe_if_changed("1", recipe)
+        results = [
+            r
+            async for r in self.client.update_recipes_if_changed(
+                [changed], base={"1": recipe}
+            )
+        ]
+
+        assert not unchanged.changed
+        assert not unchanged.written
+        assert results[0].value.fields == ["ingredients"]
+        assert results[0].value.written
+        assert [c.method for c in self.calls] == ["GET", "PUT"]
+
+    async def test_iter_recipes(self) -> None:
+        """Test parsing the recipe list incrementally."""
+        recipes_data = [{**RECIPE_STUB_DATA, "id": str(i)} for i in range(20)]
+        self.add("GET", "/apps/cookbook/api/v1/recipes", recipes_data)
+        self.add("GET", "/apps/cookbook/api/v1/search/pasta", recipes_data[:1])
+
+        result = [r async for r in self.client.iter_recipes(chunk_size=100)]
+        found = [r async for r in self.client.iter_search_recipes("pasta")]
+
+        assert [r.id for r in result] == [str(i) for i in range(20)]
+        assert all(isinstance(r, RecipeStub) for r in result)
+        assert [r.id for r in found] == ["0"]
+
+    async def test_nested_calls_while_streaming(self) -> None:
+        """Test that an open stream does not hold a slot of the concurrency limit."""
+        self.add(
+            "GET",
+            "/apps/cookbook/api/v1/recipes",
+            [{**RECIPE_STUB_DATA, "id": str(i)} for i in range(3)],
+        )
+        self.add("GET", "/apps/cookbook/api/v1/recipes/1/image", b"image" * 100)
+        for i in range(3):
+            self.add(
+                "GET",
+                f"/apps/cookbook/api/v1/recipes/{i}",
+                {**RECIPE_DATA, "id": str(i)},
+            )
+        self.client.governor = Governor(default=Limit(max_in_flight=1))
+
+        async def run() -> list[str]:
+            ids = [
+                (await self.client.get_recipe(stub.id)).id
+                async for stub in self.client.iter_recipes(chunk_size=10)
+            ]
+            async for _ in self.client.iter_recipe_main_image("1", chunk_size=100):
+                ids.append((await self.client.get_recipe("1")).id)
+            return ids
+
+        # a deadlock fails the test instead of hanging it
+        ids = await asyncio.wait_for(run(), timeout=5)
+
+        assert ids == ["0", "1", "2", *["1"] * 5]
+
+    async def test_download_recipe_main_image(self) -> None:
+        """Test streaming a recipe image into a file-like object."""
+        image_data = bytes(range(256)) * 4
+        self.add("GET", "/apps/cookbook/api/v1/recipes/1/image", image_data)
+
+        chunks = [
+            c async for c in self.client.iter_recipe_main_image("1", chunk_size=100)
+        ]
+        target = io.BytesIO()
+        written = await self.client.download_recipe_main_image("1", target)
+
+        assert b"".join(chunks) == image_data
+        assert max(len(c) for c in chunks) <= 100
+        assert written == len(image_data)
+        assert target.getvalue() == image_data
+
+    async def test_session_auth(self) -> None:
+        """Test that the password is only sent until a session exists and again when it expired."""
+        sessions = {"valid": True}
+        sent = []
+
+        def handle(request: httpx.Request) -> httpx.Response:
+            if "Authorization" in request.headers:
+                sessions["valid"] = True
+                response = httpx.Response(
+                    200, json=[], headers={"Set-Cookie": "nc_session_id=abc; Path=/"}
+                )
+            elif (
+                "nc_session_id=abc" in request.headers.get("Cookie", "")
+                and (sessions["valid"])
+            ):
+                response = httpx.Response(200, json=[])
+            else:
+                response = httpx.Response(401)
+            sent.append(("Authorization" in request.headers, response.status_code))
+            return response
+
+        async with AsyncCookbookClient(
+            self.base_url,
+            "testuser",
+            "testpass",
+            transport=httpx.MockTransport(handle),
+            session_auth=True,
+        ) as client:
+            await client.get_keywords()
+            await client.get_keywords()
+            sessions["valid"] = False
+            await client.get_keywords()
+            await client.get_keywords()
+
+        assert sent == [
+            (True, 200),
+            (False, 200),
+            (False, 401),
+            (True, 200),
+            (False, 200),
+        ]
+
+    async def test_session_auth_rejected(self) -> None:
+        """Test falling back to the password when the server never accepts its session cookie."""
+        sent = []
+
+        def handle(request: httpx.Request) -> httpx.Response:
+            sent.append(request)
+            if "Authorization" in request.headers:
+                return httpx.Response(
+                    200, json=[], headers={"Set-Cookie": "nc_session_id=abc; Path=/"}
+                )
+            return httpx.Response(401)
+
+        async with AsyncCookbookClient(
+            self.base_url,
+            "testuser",
+            "testpass",
+            transport=httpx.MockTransport(handle),
+            session_auth=True,
+        ) as client:
+            for _ in range(5):
+                await client.get_keywords()
+
+        # the session is tried once, then every call sends one request with the password
+        assert ["Authorization" in r.headers for r in sent] == [True, False] + [
+            True
+        ] * 4
+        assert sent[1].headers["OCS-APIRequest"] == "true"
+        assert not client.session_auth
+
+    async def test_transient_failures_are_retried(self) -> None:
+        """Test that connection errors and 503 responses are retried."""
+        attempts = []
+
+        def handle(request: httpx.Request) -> httpx.Response:
+            attempts.append(request)
+            if len(attempts) == 1:
+                msg = "connection reset"
+                raise httpx.ConnectError(msg, request=request)
+            if len(attempts) == 2:
+                return httpx.Response(503)
+            return httpx.Response(200, json=RECIPE_DATA)
+
+        async with AsyncCookbookClient(
+            self.base_url,
+            "testuser",
+            "testpass",
+            transport=httpx.MockTransport(handle),
+            retry=RetryPolicy(backoff_factor=0),
+        ) as client:
+            result = await client.get_recipe("1")
+
+        assert result.id == "1"
+        assert len(attempts) == 3
+
+    async def test_governor_limits_requests_in_flight(self) -> None:
+        """Test that a shared governor limits the number of concurrent requests."""
+        in_flight = []
+        max_in_flight = 0
+
+        async def handle(request: httpx.Request) -> httpx.Response:
+            nonlocal max_in_flight
+            in_flight.append(request)
+            max_in_flight = max(max_in_flight, len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.remove(request)
+            return httpx.Response(200, json=RECIPE_DATA)
+
+        async with AsyncCookbookClient(
+            self.base_url,
+            "testuser",
+            "testpass",
+            transport=httpx.MockTransport(handle),
+            governor=Governor({"read": Limit(max_in_flight=2)}),
+        ) as client:
+            results = await asyncio.gather(*(client.get_recipe("1") for _ in range(6)))
+
+        assert len(results) == 6
+        assert max_in_flight == 2
+
+
+if __name__ == "__main__":
+    unittest.main()
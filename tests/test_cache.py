@@ -0,0 +1,184 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+from urllib.parse import urljoin
+
+import requests
+import responses
+
+from nextcloud_cookbook_api.cache import (
+    CacheEntry,
+    DiskCache,
+    MemoryCache,
+    ResponseCache,
+)
+from nextcloud_cookbook_api.client import CookbookClient
+from nextcloud_cookbook_api.models import Config
+
+CATEGORIES_DATA = [{"name": "Desserts", "recipe_count": 10}]
+
+
+class TestCacheBackends(unittest.TestCase):
+    def test_memory_cache_evicts_least_recently_used(self) -> None:
+        cache = MemoryCache(max_bytes=10)
+        cache.set("a", CacheEntry(200, {}, b"aaaa"))
+        cache.set("b", CacheEntry(200, {}, b"bbbb"))
+        cache.get("a")
+        cache.set("c", CacheEntry(200, {}, b"cccc"))
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+        assert cache.evictions == 1
+
+    def test_memory_cache_skips_oversized_entries(self) -> None:
+        cache = MemoryCache(max_bytes=2)
+        cache.set("a", CacheEntry(200, {}, b"aaaa"))
+
+        assert cache.get("a") is None
+
+    def test_disk_cache_round_trip(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            DiskCache(tmp).set("a", CacheEntry(200, {"etag": '"1"'}, b"body"))
+
+            entry = DiskCache(tmp).get("a")
+
+            assert entry.status_code == 200
+            assert entry.etag == '"1"'
+            assert entry.content == b"body"
+
+    def test_disk_cache_get_survives_concurrent_eviction(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = DiskCache(tmp)
+            cache.set("a", CacheEntry(200, {}, b"body"))
+            read = Path.open
+
+            def open_and_evict(path: Path, *args, **kwargs):
+                # another thread evicts the file right after it was opened
+                f = read(path, *args, **kwargs)
+                path.unlink()
+                return f
+
+            with mock.patch.object(Path, "open", open_and_evict):
+                entry = cache.get("a")
+
+            assert entry.content == b"body"
+
+    def test_disk_cache_evicts_by_size(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = DiskCache(tmp, max_bytes=150)
+            cache.set("a", CacheEntry(200, {}, b"a" * 60))
+            cache.set("b", CacheEntry(200, {}, b"b" * 60))
+
+            assert cache.evictions == 1
+            assert cache.get("b") is not None
+
+            cache.clear()
+
+            assert cache.get("b") is None
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.base_url = "http://localhost:8080"
+        self.url = urljoin(self.base_url, "/apps/cookbook/api/v1/categories")
+
+    def test_key_includes_user_and_params(self) -> None:
+        key = ResponseCache.key(self.url, {"size": "full"}, "alice")
+
+        assert key != ResponseCache.key(self.url, {"size": "thumb"}, "alice")
+        assert key != ResponseCache.key(self.url, {"size": "full"}, "bob")
+
+    @responses.activate
+    def test_fresh_responses_are_served_from_cache(self) -> None:
+        cache = ResponseCache(ttl=60)
+        client = CookbookClient(self.base_url, "testuser", "testpass", cache=cache)
+        responses.add(responses.GET, self.url, json=CATEGORIES_DATA)
+
+        first = client.get_categories()
+        second = client.get_categories()
+
+        assert first == second
+        assert len(responses.calls) == 1
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 1
+        assert cache.stats.hit_ratio == 0.5
+
+    @responses.activate
+    def test_cookies_are_not_cached(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResponseCache(DiskCache(tmp), ttl=60)
+            client = CookbookClient(self.base_url, "testuser", "testpass", cache=cache)
+            responses.add(
+                responses.GET,
+                self.url,
+                json=CATEGORIES_DATA,
+                headers={
+                    "ETag": '"v1"',
+                    "Set-Cookie": "nc_token=secret; path=/; HttpOnly",
+                    "Connection": "keep-alive",
+                },
+            )
+
+            client.get_categories()
+
+            entry = cache.backend.get(cache.key(self.url, None, "testuser"))
+            assert entry.headers == {"etag": '"v1"', "content-type": "application/json"}
+            assert not any(b"secret" in p.read_bytes() for p in Path(tmp).iterdir())
+
+    @responses.activate
+    def test_stale_responses_are_revalidated(self) -> None:
+        cache = ResponseCache(ttl=0)
+        client = CookbookClient(self.base_url, "testuser", "testpass", cache=cache)
+        responses.add(
+            responses.GET,
+            self.url,
+            json=CATEGORIES_DATA,
+            headers={"ETag": '"v1"', "Last-Modified": "Mon, 02 Jan 2023 10:00:00 GMT"},
+        )
+        responses.add(responses.GET, self.url, status=304)
+
+        client.get_categories()
+        result = client.get_categories()
+
+        assert result[0].name == "Desserts"
+        request = responses.calls[1].request
+        assert request.headers["If-None-Match"] == '"v1"'
+        assert request.headers["If-Modified-Since"] == "Mon, 02 Jan 2023 10:00:00 GMT"
+        assert cache.stats.revalidations == 1
+        assert cache.stats.reuse_ratio == 0.5
+
+    @responses.activate
+    def test_writes_invalidate_cache(self) -> None:
+        cache = ResponseCache(ttl=60)
+        client = CookbookClient(self.base_url, "testuser", "testpass", cache=cache)
+        config_url = urljoin(self.base_url, "/apps/cookbook/api/v1/config")
+        responses.add(responses.GET, config_url, json={"folder": "/Recipes"})
+        responses.add(responses.POST, config_url)
+        responses.add(responses.GET, config_url, json={"folder": "/Other"})
+
+        client.get_config()
+        client.set_config(Config(folder="/Other"))
+        result = client.get_config()
+
+        assert result.folder == "/Other"
+        assert len(responses.calls) == 3
+
+    @responses.activate
+    def test_errors_are_not_cached(self) -> None:
+        cache = ResponseCache(ttl=60)
+        client = CookbookClient(self.base_url, "testuser", "testpass", cache=cache)
+        responses.add(responses.GET, self.url, status=500)
+        responses.add(responses.GET, self.url, json=CATEGORIES_DATA)
+
+        with self.assertRaises(requests.HTTPError):
+            client.get_categories()
+        result = client.get_categories()
+
+        assert len(result) == 1
+        assert cache.stats.stores == 1
+
+
+if __name__ == "__main__":
+    unittest.main()
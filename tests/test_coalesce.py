@@ -0,0 +1,170 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+import httpx
+import responses
+
+from nextcloud_cookbook_api.async_client import AsyncCookbookClient
+from nextcloud_cookbook_api.client import CookbookClient
+from nextcloud_cookbook_api.coalesce import SingleFlight
+
+RECIPE_DATA = {
+    "@type": "Recipe",
+    "id": "1",
+    "name": "Pasta",
+    "dateCreated": "2023-01-01T10:00:00",
+    "dateModified": "2023-01-02T10:00:00",
+    "nutrition": {"@type": "NutritionInformation"},
+}
+
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+    end = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > end:
+            msg = "Condition not met in time."
+            raise TimeoutError(msg)
+        time.sleep(0.001)
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_share_one_execution(self) -> None:
+        flight = SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def func() -> list:
+            calls.append(1)
+            release.wait()
+            return ["result"]
+
+        with ThreadPoolExecutor(5) as executor:
+            futures = [executor.submit(flight.do, "key", func) for _ in range(5)]
+            wait_for(lambda: flight.stats.coalesced == 4)
+            release.set()
+            results = [f.result() for f in futures]
+
+        assert len(calls) == 1
+        assert all(r is results[0] for r in results)
+        assert flight.stats.executed == 1
+        assert flight.stats.coalesced_ratio == 0.8
+        # the call is not shared once it completed
+        assert flight.do("key", lambda: "again") == "again"
+
+    def test_errors_are_shared(self) -> None:
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def func() -> None:
+            release.wait()
+            msg = "failed"
+            raise ValueError(msg)
+
+        with ThreadPoolExecutor(3) as executor:
+            futures = [executor.submit(flight.do, "key", func) for _ in range(3)]
+            wait_for(lambda: flight.stats.coalesced == 2)
+            release.set()
+            for future in futures:
+                with self.assertRaises(ValueError):
+                    future.result()
+
+        assert flight.do("key", lambda: 1) == 1
+
+    def test_async_calls_share_one_execution(self) -> None:
+        flight = SingleFlight()
+        calls = []
+
+        async def func() -> list:
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return ["result"]
+
+        async def main() -> list:
+            first = asyncio.ensure_future(flight.do_async("key", func))
+            await asyncio.sleep(0)
+            others = [flight.do_async("key", func) for _ in range(3)]
+            # the remaining callers still get the result if the first one is cancelled
+            first.cancel()
+            return await asyncio.gather(*others)
+
+        results = asyncio.run(main())
+
+        assert len(calls) == 1
+        assert all(r is results[0] for r in results)
+        assert flight.stats.coalesced == 3
+
+
+class TestClientCoalescing(unittest.TestCase):
+    def setUp(self) -> None:
+        self.base_url = "https://nextcloud.example.com"
+        self.flight = SingleFlight()
+
+    @responses.activate
+    def test_identical_gets_are_coalesced(self) -> None:
+        release = threading.Event()
+        requests_sent = []
+
+        def callback(request):
+            requests_sent.append(request.url)
+            release.wait()
+            return 200, {}, json.dumps(RECIPE_DATA)
+
+        responses.add_callback(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/recipes/1"),
+            callback=callback,
+        )
+        client = CookbookClient(
+            self.base_url, "user", "password", single_flight=self.flight
+        )
+
+        with ThreadPoolExecutor(5) as executor:
+            futures = [executor.submit(client.get_recipe, "1") for _ in range(5)]
+            wait_for(lambda: self.flight.stats.coalesced == 4)
+            release.set()
+            recipes = [f.result() for f in futures]
+
+        assert len(requests_sent) == 1
+        assert all(r is recipes[0] for r in recipes)
+        assert recipes[0].name == "Pasta"
+
+    def test_async_identical_gets_are_coalesced(self) -> None:
+        requests_sent = []
+
+        async def handle(request: httpx.Request) -> httpx.Response:
+            requests_sent.append(request)
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json=RECIPE_DATA)
+
+        async def main() -> list:
+            async with AsyncCookbookClient(
+                self.base_url,
+                "user",
+                "password",
+                transport=httpx.MockTransport(handle),
+                single_flight=self.flight,
+            ) as client:
+                recipes = await asyncio.gather(
+                    *(client.get_recipe("1") for _ in range(5))
+                )
+                # different parsers of the same path are not shared
+                lazy = await asyncio.gather(
+                    client.get_recipe("1"), client.get_recipe_lazy("1")
+                )
+                return [*recipes, *lazy]
+
+        results = asyncio.run(main())
+
+        assert len(requests_sent) == 3
+        assert all(r is results[0] for r in results[:5])
+        assert self.flight.stats.executed == 3
+        assert self.flight.stats.coalesced == 4
+
+
+if __name__ == "__main__":
+    unittest.main()
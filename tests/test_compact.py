@@ -0,0 +1,65 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from nextcloud_cookbook_api.compact import CompactRecipeStubs
+from nextcloud_cookbook_api.models import RecipeStub
+
+
+def make_stub(id: str, **data) -> RecipeStub:
+    return RecipeStub.model_validate(
+        {
+            "id": id,
+            "name": f"Recipe {id}",
+            "keywords": "pasta,quick",
+            "dateCreated": "2023-01-01T10:00:00+00:00",
+            "dateModified": "2023-01-02T10:00:00.123456+02:00",
+            "imageUrl": f"/apps/cookbook/recipes/{id}/image?size=thumb",
+            "imagePlaceholderUrl": f"/apps/cookbook/recipes/{id}/image?size=thumb16",
+            **data,
+        }
+    )
+
+
+class TestCompactRecipeStubs(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        stubs = [
+            make_stub("1"),
+            make_stub("2", keywords=None, dateCreated="1960-05-01T00:00:00"),
+            make_stub("3", keywords="", imageUrl="", imagePlaceholderUrl="/static/x"),
+            make_stub("12", dateModified="2023-01-02T10:00:00-05:30"),
+        ]
+
+        compact = CompactRecipeStubs(stubs)
+
+        assert len(compact) == 4
+        assert list(compact) == stubs
+        assert [s.model_dump() for s in compact] == [s.model_dump() for s in stubs]
+        assert compact[3].date_modified.utcoffset() == timedelta(hours=-5, minutes=-30)
+        assert compact[1].date_created.tzinfo is None
+        assert compact[0].date_modified == datetime(
+            2023, 1, 2, 8, 0, 0, 123456, tzinfo=timezone.utc
+        )
+
+    def test_non_numeric_ids(self) -> None:
+        stubs = [make_stub("1"), make_stub("007"), make_stub("abc"), make_stub("")]
+
+        compact = CompactRecipeStubs(stubs[:1])
+        compact.extend(stubs[1:])
+        compact.append(make_stub("9" * 30))
+
+        assert [s.id for s in compact] == ["1", "007", "abc", "", "9" * 30]
+        assert compact[1] == stubs[1]
+
+    def test_indexing(self) -> None:
+        stubs = [make_stub(str(i)) for i in range(5)]
+        compact = CompactRecipeStubs(stubs)
+
+        assert compact[-1] == stubs[-1]
+        assert compact[1:4:2] == stubs[1:4:2]
+        assert compact.index(stubs[2]) == 2
+        with self.assertRaises(IndexError):
+            compact[5]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+from nextcloud_cookbook_api.diff import FieldChange, RecipeDiff, diff_recipes
+from nextcloud_cookbook_api.models import Recipe
+
+RECIPE_DATA = {
+    "@type": "Recipe",
+    "id": "1",
+    "name": "Pasta",
+    "keywords": "pasta,quick",
+    "dateCreated": "2023-01-01T10:00:00",
+    "dateModified": "2023-01-02T10:00:00",
+    "recipeIngredient": ["Pasta", "Salt"],
+    "nutrition": {"@type": "NutritionInformation", "calories": "500 kcal"},
+}
+
+
+class TestDiffRecipes(unittest.TestCase):
+    def test_identical_recipes_have_no_changes(self) -> None:
+        recipe = Recipe.model_validate(RECIPE_DATA)
+
+        assert diff_recipes(recipe, recipe.model_copy(deep=True)) == []
+
+    def test_server_fields_are_ignored(self) -> None:
+        recipe = Recipe.model_validate(RECIPE_DATA)
+        rewritten = Recipe.model_validate(
+            {
+                **RECIPE_DATA,
+                "dateModified": "2024-05-01T10:00:00",
+                "imageUrl": "/apps/cookbook/recipes/1/image?size=full",
+            }
+        )
+
+        assert diff_recipes(recipe, rewritten) == []
+
+    def test_changed_fields(self) -> None:
+        recipe = Recipe.model_validate(RECIPE_DATA)
+        updated = recipe.model_copy(
+            update={
+                "keywords": ["pasta", "quick", "vegetarian"],
+                "ingredients": ["Salt", "Pasta"],
+                "nutrition": recipe.nutrition.model_copy(
+                    update={"calories": "450 kcal"}
+                ),
+            }
+        )
+
+        changes = diff_recipes(recipe, updated)
+
+        assert [c.field for c in changes] == ["keywords", "ingredients", "nutrition"]
+        assert changes[0] == FieldChange(
+            "keywords", "pasta,quick", "pasta,quick,vegetarian"
+        )
+        assert changes[1].new == ["Salt", "Pasta"]
+        assert changes[2].old["calories"] == "500 kcal"
+
+        diff = RecipeDiff("1", changes)
+        assert diff.changed
+        assert diff.fields == ["keywords", "ingredients", "nutrition"]
+        assert not RecipeDiff("1").changed
+
+
+if __name__ == "__main__":
+    unittest.main()
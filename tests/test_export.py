@@ -0,0 +1,136 @@
+import io
+import json
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from urllib.parse import urljoin
+
+import responses
+
+from nextcloud_cookbook_api.client import CookbookClient
+from nextcloud_cookbook_api.export import export_cookbook, read_manifest
+from tests.fixtures import recipe_data, stub_data
+
+
+class _Unseekable(io.RawIOBase):
+    """A write-only stream like a pipe."""
+
+    def __init__(self) -> None:
+        self.data = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self.data += b
+        return len(b)
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self) -> None:
+        self.base_url = "http://localhost:8080"
+        self.client = CookbookClient(self.base_url, "testuser", "testpass")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _add_server(self, recipes: list[dict], images: dict[str, bytes]) -> None:
+        # the image URL is set even if the recipe has no image, like the server does
+        recipes = [
+            {**r, "imageUrl": f"/apps/cookbook/recipes/{r['id']}/image?size=full"}
+            for r in recipes
+        ]
+        responses.add(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/recipes"),
+            json=[stub_data(r) for r in recipes],
+        )
+        responses.add(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/config"),
+            json={"folder": "/Recipes"},
+        )
+        for recipe in recipes:
+            url = urljoin(
+                self.base_url, f"/apps/cookbook/api/v1/recipes/{recipe['id']}"
+            )
+            responses.add(responses.GET, url, json=recipe)
+            if recipe["id"] in images:
+                responses.add(responses.GET, url + "/image", body=images[recipe["id"]])
+            else:
+                responses.add(responses.GET, url + "/image", status=404)
+
+    @responses.activate
+    def test_full_export_to_tar(self) -> None:
+        recipes = [recipe_data(str(i)) for i in range(1, 6)]
+        images = {"1": b"\xff\xd8" + bytes(range(256)) * 10, "3": b"\xff\xd8small"}
+        self._add_server(recipes, images)
+        path = Path(self.tmp.name) / "cookbook.tar"
+
+        result = export_cookbook(self.client, path, max_workers=3)
+
+        assert result.exported == ["1", "2", "3", "4", "5"]
+        assert not result.failed
+        with tarfile.open(path) as archive:
+            names = archive.getnames()
+            assert names[0] == "config.json"
+            assert names[-1] == "manifest.json"
+            assert names[1:3] == ["recipes/1/recipe.json", "recipes/1/full.jpg"]
+            assert archive.extractfile("recipes/3/full.jpg").read() == images["3"]
+            assert "recipes/2/full.jpg" not in names
+            recipe = json.load(archive.extractfile("recipes/5/recipe.json"))
+            assert recipe["name"] == "Recipe 5"
+        assert read_manifest(path).entries == result.manifest.entries
+        assert len(result.manifest.entries) == 5
+
+    @responses.activate
+    def test_incremental_export_to_zip_stream(self) -> None:
+        recipes = [recipe_data(str(i)) for i in range(1, 4)]
+        self._add_server(recipes, {"2": b"image"})
+        previous = Path(self.tmp.name) / "previous.tar.gz"
+        export_cookbook(self.client, previous, format="tar.gz")
+
+        responses.reset()
+        recipes = [
+            recipes[0],
+            recipe_data("2", modified="2023-02-01T10:00:00"),
+            recipe_data("4"),
+        ]
+        self._add_server(recipes, {"2": b"new image"})
+        target = _Unseekable()
+
+        result = export_cookbook(
+            self.client, target, format="zip", since=previous, image_size="thumb"
+        )
+
+        assert result.exported == ["2", "4"]
+        assert result.deleted == ["3"]
+        assert result.unchanged == 1
+        with zipfile.ZipFile(io.BytesIO(target.data)) as archive:
+            assert archive.read("recipes/2/thumb.jpg") == b"new image"
+            assert "recipes/1/recipe.json" not in archive.namelist()
+            manifest = json.loads(archive.read("manifest.json"))
+        assert manifest["incremental"]
+        assert manifest["deleted"] == ["3"]
+        assert sorted(manifest["recipes"]) == ["1", "2", "4"]
+
+    @responses.activate
+    def test_failed_recipes_are_exported_again(self) -> None:
+        recipes = [recipe_data("1"), recipe_data("2")]
+        self._add_server(recipes, {})
+        responses.replace(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/recipes/2"),
+            status=400,
+        )
+
+        result = export_cookbook(self.client, io.BytesIO())
+
+        assert result.exported == ["1"]
+        assert [f.id for f in result.failed] == ["2"]
+        assert list(result.manifest.entries) == ["1"]
+
+
+if __name__ == "__main__":
+    unittest.main()
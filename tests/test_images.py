@@ -0,0 +1,115 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from urllib.parse import urljoin
+
+import responses
+
+from nextcloud_cookbook_api.client import CookbookClient
+from nextcloud_cookbook_api.images import ImageExporter
+
+STUBS_DATA = [
+    {
+        "id": "1",
+        "name": "Recipe 1",
+        "dateCreated": "2023-01-01T10:00:00+00:00",
+        "dateModified": "2023-01-02T10:00:00+00:00",
+    },
+    {
+        "id": "2",
+        "name": "Recipe 2",
+        "dateCreated": "2023-01-01T10:00:00+00:00",
+        "dateModified": "2023-01-02T10:00:00+00:00",
+    },
+]
+
+
+class TestImageExporter(unittest.TestCase):
+    def setUp(self) -> None:
+        self.base_url = "http://localhost:8080"
+        self.client = CookbookClient(self.base_url, "testuser", "testpass")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp.name)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def _add_responses(self) -> None:
+        responses.add(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/recipes"),
+            json=STUBS_DATA,
+        )
+        responses.add(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/recipes/1/image"),
+            body=b"image-1",
+        )
+        responses.add(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/recipes/2/image"),
+            status=404,
+        )
+
+    @responses.activate
+    def test_export(self) -> None:
+        self._add_responses()
+        exporter = ImageExporter(self.client, self.directory, sizes=("full", "thumb"))
+
+        report = exporter.export()
+
+        assert sorted(report.downloaded) == [
+            self.directory / "1" / "full.jpg",
+            self.directory / "1" / "thumb.jpg",
+        ]
+        assert sorted(r.id for r in report.failed) == ["2/full", "2/thumb"]
+        assert report.bytes_downloaded == 14
+        assert report.bytes_per_second > 0
+        assert (self.directory / "1" / "thumb.jpg").read_bytes() == b"image-1"
+        assert not (self.directory / "2" / "full.jpg.part").exists()
+
+    @responses.activate
+    def test_export_skips_unchanged_images(self) -> None:
+        self._add_responses()
+        exporter = ImageExporter(self.client, self.directory, sizes=("full",))
+
+        exporter.export(["1"])
+        responses.calls.reset()
+        report = exporter.export(["1"])
+
+        assert report.skipped == [self.directory / "1" / "full.jpg"]
+        assert report.downloaded == []
+        # only the stubs are requested, no image is downloaded again
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_export_tolerates_coarse_modification_times(self) -> None:
+        self._add_responses()
+        exporter = ImageExporter(self.client, self.directory, sizes=("full",))
+        path = self.directory / "1" / "full.jpg"
+
+        exporter.export(["1"])
+        # like FAT, which rounds modification times to two seconds
+        mtime_ns = path.stat().st_mtime_ns + 1_999_999_999
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+        assert exporter.export(["1"]).skipped == [path]
+
+        mtime_ns -= 60_000_000_000
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+        assert exporter.export(["1"]).downloaded == [path]
+
+    @responses.activate
+    def test_export_unknown_recipe(self) -> None:
+        self._add_responses()
+        exporter = ImageExporter(self.client, self.directory, sizes=("full",))
+
+        report = exporter.export(["1", "999"])
+
+        assert len(report.downloaded) == 1
+        assert [r.id for r in report.failed] == ["999"]
+        assert isinstance(report.failed[0].error, LookupError)
+
+
+if __name__ == "__main__":
+    unittest.main()
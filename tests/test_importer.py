@@ -0,0 +1,73 @@
+import asyncio
+import itertools
+import unittest
+from collections.abc import Iterator
+
+from nextcloud_cookbook_api.bulk import (
+    IdempotencyStore,
+    Skipped,
+    run_bulk,
+    run_bulk_async,
+)
+from nextcloud_cookbook_api.importer import ImportTracker, normalize_url
+
+
+class TestImportTracker(unittest.TestCase):
+    def test_normalize_url(self) -> None:
+        assert (
+            normalize_url(" HTTPS://Example.com/Recipes/Soup/?id=1#top ")
+            == "https://example.com/Recipes/Soup?id=1"
+        )
+
+    def test_claim(self) -> None:
+        checkpoint = IdempotencyStore()
+        checkpoint.record("https://example.com/pasta", "2")
+        tracker = ImportTracker({"https://example.com/soup/": "1", "": "3"}, checkpoint)
+
+        assert tracker.claim("https://EXAMPLE.com/soup") == Skipped("1")
+        assert tracker.claim("https://example.com/pasta") == Skipped("2")
+        assert tracker.claim("https://example.com/new") is None
+        assert tracker.claim("https://example.com/new#again") == Skipped()
+
+        tracker.release("https://example.com/new")
+        assert tracker.claim("https://example.com/new") is None
+        tracker.done("https://example.com/new", "4")
+        assert checkpoint.get("https://example.com/new") == "4"
+
+    def test_bulk_items_are_consumed_lazily(self) -> None:
+        consumed = []
+
+        def items() -> Iterator[int]:
+            for i in itertools.count():
+                consumed.append(i)
+                yield i
+
+        results = run_bulk(str, items(), key=str, errors=(), max_workers=2)
+        first = list(itertools.islice(results, 3))
+        results.close()
+
+        assert [r.value for r in first] == ["0", "1", "2"]
+        assert len(consumed) <= 3 + 2 * 2
+
+
+class TestRunBulkAsync(unittest.IsolatedAsyncioTestCase):
+    async def test_closing_early_finishes_pending_calls(self) -> None:
+        tasks = []
+
+        async def call(i: int) -> int:
+            tasks.append(asyncio.current_task())
+            if i:
+                await asyncio.sleep(10)
+            return i
+
+        results = run_bulk_async(call, range(6), key=str, errors=(), max_concurrency=2)
+        first = await anext(results)
+        await results.aclose()
+
+        assert first.value == 0
+        assert tasks
+        assert all(t.done() for t in tasks)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,203 @@
+import logging
+import unittest
+from typing import Any
+from urllib.parse import urljoin
+
+import httpx
+import requests
+import responses
+
+from nextcloud_cookbook_api.async_client import AsyncCookbookClient
+from nextcloud_cookbook_api.client import CookbookClient
+from nextcloud_cookbook_api.instrumentation import (
+    Instrument,
+    LoggingInstrument,
+    MetricsInstrument,
+    RequestEvent,
+    TracingInstrument,
+)
+
+RECIPE_DATA = {
+    "@type": "Recipe",
+    "id": "1",
+    "name": "Recipe 1",
+    "dateCreated": "2023-01-01T10:00:00",
+    "dateModified": "2023-01-02T10:00:00",
+    "nutrition": {"@type": "NutritionInformation"},
+}
+
+
+class RecordingInstrument(Instrument):
+    def __init__(self) -> None:
+        self.requests: list[RequestEvent] = []
+        self.responses: list[RequestEvent] = []
+
+    def on_request(self, event: RequestEvent) -> None:
+        self.requests.append(event)
+
+    def on_response(self, event: RequestEvent) -> None:
+        self.responses.append(event)
+
+
+class FailingInstrument(Instrument):
+    def on_response(self, event: RequestEvent) -> None:
+        msg = "broken instrument"
+        raise RuntimeError(msg)
+
+
+class FakeSpan:
+    def __init__(self, name: str, attributes: dict[str, Any]) -> None:
+        self.name = name
+        self.attributes = attributes
+        self.exceptions: list[BaseException] = []
+        self.ended = False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exception: BaseException) -> None:
+        self.exceptions.append(exception)
+
+    def end(self) -> None:
+        self.ended = True
+
+
+class FakeTracer:
+    def __init__(self) -> None:
+        self.spans: list[FakeSpan] = []
+
+    def start_span(
+        self, name: str, attributes: dict[str, Any] | None = None
+    ) -> FakeSpan:
+        span = FakeSpan(name, dict(attributes or {}))
+        self.spans.append(span)
+        return span
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self) -> None:
+        self.base_url = "http://localhost:8080"
+        self.url = urljoin(self.base_url, "/apps/cookbook/api/v1/recipes/1")
+        self.recorder = RecordingInstrument()
+        self.metrics = MetricsInstrument()
+        self.tracer = FakeTracer()
+        self.client = CookbookClient(
+            self.base_url,
+            "testuser",
+            "testpass",
+            instruments=[
+                self.recorder,
+                self.metrics,
+                TracingInstrument(self.tracer),
+                FailingInstrument(),
+            ],
+        )
+
+    @responses.activate
+    def test_successful_call(self) -> None:
+        responses.add(responses.GET, self.url, json=RECIPE_DATA)
+
+        with self.assertLogs("nextcloud_cookbook_api.instrumentation", logging.ERROR):
+            self.client.get_recipe("1")
+
+        event = self.recorder.responses[0]
+        assert self.recorder.requests == [event]
+        assert event.endpoint == "get_recipe"
+        assert event.status_code == 200
+        assert event.bytes_received == len(responses.calls[0].response.content)
+        assert event.network_seconds > 0
+        assert event.parse_seconds > 0
+        assert event.error is None
+
+    @responses.activate
+    def test_failed_call(self) -> None:
+        responses.add(responses.DELETE, self.url, status=404)
+
+        with (
+            self.assertRaises(requests.HTTPError),
+            self.assertLogs("nextcloud_cookbook_api.instrumentation", logging.ERROR),
+        ):
+            self.client.delete_recipe("1")
+
+        event = self.recorder.responses[0]
+        assert event.status_code == 404
+        assert isinstance(event.error, requests.HTTPError)
+        span = self.tracer.spans[0]
+        assert span.ended
+        assert span.attributes["http.response.status_code"] == 404
+        assert span.exceptions == [event.error]
+
+    @responses.activate
+    def test_streamed_image(self) -> None:
+        responses.add(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/recipes/1/image"),
+            body=b"x" * 1000,
+        )
+
+        with self.assertLogs("nextcloud_cookbook_api.instrumentation", logging.ERROR):
+            self.client.get_recipe_main_image("1")
+
+        event = self.recorder.responses[0]
+        assert event.endpoint == "get_recipe_main_image"
+        assert event.bytes_received == 1000
+        assert event.network_seconds > 0
+
+    @responses.activate
+    def test_metrics_render(self) -> None:
+        responses.add(responses.GET, self.url, json=RECIPE_DATA)
+
+        with self.assertLogs("nextcloud_cookbook_api.instrumentation", logging.ERROR):
+            self.client.get_recipe("1")
+            self.client.get_recipe("1")
+
+        text = self.metrics.render()
+        assert (
+            'cookbook_client_requests_total{endpoint="get_recipe",method="GET",'
+            'status="200"} 2' in text
+        )
+        assert 'cookbook_client_parse_seconds_total{endpoint="get_recipe"}' in text
+
+    @responses.activate
+    def test_logging_instrument(self) -> None:
+        responses.add(responses.GET, self.url, json=RECIPE_DATA)
+        client = CookbookClient(
+            self.base_url,
+            "testuser",
+            "testpass",
+            instruments=[LoggingInstrument(level=logging.INFO)],
+        )
+
+        with self.assertLogs(
+            "nextcloud_cookbook_api.instrumentation", logging.INFO
+        ) as logs:
+            client.get_recipe("1")
+
+        assert "get_recipe GET /apps/cookbook/api/v1/recipes/1 -> 200" in logs.output[0]
+
+
+class TestAsyncInstrumentation(unittest.IsolatedAsyncioTestCase):
+    async def test_successful_call(self) -> None:
+        recorder = RecordingInstrument()
+
+        def handle(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json=RECIPE_DATA)
+
+        async with AsyncCookbookClient(
+            "http://localhost:8080",
+            "testuser",
+            "testpass",
+            transport=httpx.MockTransport(handle),
+            instruments=[recorder],
+        ) as client:
+            await client.get_recipe("1")
+
+        event = recorder.responses[0]
+        assert event.endpoint == "get_recipe"
+        assert event.status_code == 200
+        assert event.bytes_received > 0
+        assert event.parse_seconds > 0
+
+
+if __name__ == "__main__":
+    unittest.main()
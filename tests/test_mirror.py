@@ -0,0 +1,141 @@
+import tempfile
+import unittest
+from pathlib import Path
+from urllib.parse import urljoin
+
+import responses
+
+from nextcloud_cookbook_api.client import CookbookClient
+from nextcloud_cookbook_api.mirror import RecipeMirror
+from tests.fixtures import recipe_data, stub_data
+
+RECIPES = [
+    recipe_data(
+        "1",
+        "Pasta al pomodoro",
+        recipeCategory="Main Courses",
+        keywords="pasta,vegetarian,quick",
+    ),
+    recipe_data("2", "Lasagne", recipeCategory="Main Courses", keywords="pasta,baking"),
+    recipe_data("3", "Tomato soup", recipeCategory="Soups", keywords="vegetarian,soup"),
+    recipe_data("4", "Water", url="https://example.com/water"),
+]
+
+
+class TestRecipeMirror(unittest.TestCase):
+    def setUp(self) -> None:
+        self.base_url = "http://localhost:8080"
+        self.client = CookbookClient(self.base_url, "testuser", "testpass")
+
+    def _add_server(self, recipes: list[dict]) -> None:
+        responses.add(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/recipes"),
+            json=[stub_data(r) for r in recipes],
+        )
+        for recipe in recipes:
+            responses.add(
+                responses.GET,
+                urljoin(self.base_url, f"/apps/cookbook/api/v1/recipes/{recipe['id']}"),
+                json=recipe,
+            )
+
+    @responses.activate
+    def test_queries(self) -> None:
+        self._add_server(RECIPES)
+
+        with RecipeMirror(self.client) as mirror:
+            mirror.refresh()
+            responses.calls.reset()
+
+            assert [r.name for r in mirror.get_recipes()] == [
+                "Lasagne",
+                "Pasta al pomodoro",
+                "Tomato soup",
+                "Water",
+            ]
+            assert mirror.get_recipe("1").category == "Main Courses"
+            assert [r.id for r in mirror.get_recipes_by_category("Main Courses")] == [
+                "2",
+                "1",
+            ]
+            assert [r.id for r in mirror.get_recipes_by_category(None)] == ["4"]
+            assert [r.id for r in mirror.search_recipes_by_keywords(["pasta"])] == [
+                "2",
+                "1",
+            ]
+            assert [
+                r.id for r in mirror.search_recipes_by_keywords(["pasta", "vegetarian"])
+            ] == ["1"]
+            assert [r.id for r in mirror.search_recipes("TOMATO")] == ["3"]
+            assert [r.id for r in mirror.search_recipes("soup")] == ["3"]
+            assert mirror.search_recipes("%") == []
+            # every term has to match the name, the category or a keyword
+            assert [r.id for r in mirror.search_recipes("soup tomato")] == ["3"]
+            assert [r.id for r in mirror.search_recipes("tomato,soup")] == ["3"]
+            assert [r.id for r in mirror.search_recipes("pasta quick")] == ["1"]
+            assert [r.id for r in mirror.search_recipes("main, baking")] == ["2"]
+            assert mirror.search_recipes("pasta soup") == []
+            assert {c.name: c.recipe_count for c in mirror.get_categories()} == {
+                "": 1,
+                "Main Courses": 2,
+                "Soups": 1,
+            }
+            assert {k.name: k.recipe_count for k in mirror.get_keywords()}["pasta"] == 2
+            assert mirror.get_recipe_urls() == {"https://example.com/water": "4"}
+            with self.assertRaises(LookupError):
+                mirror.get_recipe("999")
+
+        # all queries are answered locally
+        assert len(responses.calls) == 0
+
+    @responses.activate
+    def test_incremental_refresh(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "mirror.sqlite"
+            self._add_server(RECIPES)
+            with RecipeMirror(self.client, path) as mirror:
+                first = mirror.refresh()
+
+            assert len(first.created) == 4
+
+            responses.reset()
+            changed = recipe_data(
+                "2",
+                "Lasagne",
+                modified="2023-02-01T10:00:00",
+                recipeCategory="Main Courses",
+                keywords="pasta",
+            )
+            self._add_server([RECIPES[0], changed, RECIPES[2]])
+            with RecipeMirror(self.client, path) as mirror:
+                second = mirror.refresh()
+
+                assert [r.id for r in second.updated] == ["2"]
+                assert second.deleted == ["4"]
+                assert second.unchanged == 2
+                # only the stubs and the changed recipe are requested
+                assert len(responses.calls) == 2
+                assert [
+                    r.id for r in mirror.search_recipes_by_keywords(["baking"])
+                ] == []
+                assert [r.id for r in mirror.get_recipes()] == ["2", "1", "3"]
+
+    @responses.activate
+    def test_failed_recipe_is_retried(self) -> None:
+        self._add_server(RECIPES[:1])
+        responses.replace(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/recipes/1"),
+            status=404,
+        )
+
+        with RecipeMirror(self.client) as mirror:
+            result = mirror.refresh()
+
+            assert [r.id for r in result.failed] == ["1"]
+            assert mirror.get_recipes() == []
+
+
+if __name__ == "__main__":
+    unittest.main()
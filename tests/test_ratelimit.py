@@ -0,0 +1,240 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+from urllib.parse import urljoin
+
+import responses
+
+from nextcloud_cookbook_api.client import CookbookClient
+from nextcloud_cookbook_api.ratelimit import (
+    ConcurrencyLimit,
+    Governor,
+    Limit,
+    TokenBucket,
+    classify,
+)
+
+
+class InFlightCounter:
+    def __init__(self) -> None:
+        self.current = 0
+        self.max = 0
+        self._lock = threading.Lock()
+
+    def enter(self) -> None:
+        with self._lock:
+            self.current += 1
+            self.max = max(self.max, self.current)
+
+    def leave(self) -> None:
+        with self._lock:
+            self.current -= 1
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestRateLimitPrimitives(unittest.TestCase):
+    def test_classify(self) -> None:
+        assert classify("GET", "/apps/cookbook/api/v1/recipes") == "read"
+        assert classify("PUT", "/apps/cookbook/api/v1/recipes/1") == "write"
+        assert classify("GET", "/apps/cookbook/api/v1/recipes/1/image?size=thumb") == (
+            "image"
+        )
+        assert classify("POST", "http://localhost/apps/cookbook/api/v1/import") == (
+            "import"
+        )
+
+    def test_token_bucket(self) -> None:
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10, burst=2, clock=clock)
+
+        delays = [bucket.reserve() for _ in range(4)]
+        clock.now = 1.0
+
+        assert delays == [0.0, 0.0, 0.1, 0.2]
+        # the debt of two tokens is paid off, the bucket refilled to its burst size
+        assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.1]
+
+    def test_concurrency_limit_threads(self) -> None:
+        limit = ConcurrencyLimit(3)
+        counter = InFlightCounter()
+
+        def work() -> None:
+            limit.acquire()
+            counter.enter()
+            time.sleep(0.01)
+            counter.leave()
+            limit.release()
+
+        threads = [threading.Thread(target=work) for _ in range(12)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert counter.max == 3
+        assert limit.in_flight == 0
+
+    def test_concurrency_limit_threads_and_asyncio(self) -> None:
+        limit = ConcurrencyLimit(2)
+        counter = InFlightCounter()
+
+        def work() -> None:
+            limit.acquire()
+            counter.enter()
+            time.sleep(0.01)
+            counter.leave()
+            limit.release()
+
+        async def work_async() -> None:
+            await limit.acquire_async()
+            counter.enter()
+            await asyncio.sleep(0.01)
+            counter.leave()
+            limit.release()
+
+        async def main() -> None:
+            await asyncio.gather(
+                *(asyncio.to_thread(work) for _ in range(5)),
+                *(work_async() for _ in range(5)),
+            )
+
+        asyncio.run(main())
+
+        assert counter.max == 2
+        assert limit.in_flight == 0
+
+    def test_cancelled_waiter_does_not_leak_slot(self) -> None:
+        limit = ConcurrencyLimit(1)
+
+        async def main() -> None:
+            await limit.acquire_async()
+            waiter = asyncio.create_task(limit.acquire_async())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+            limit.release()
+
+        asyncio.run(main())
+
+        assert limit.in_flight == 0
+
+    def test_governor_unknown_endpoint_class(self) -> None:
+        with self.assertRaises(ValueError):
+            Governor({"upload": Limit(rate=1)})  # type: ignore[dict-item]
+
+
+class TestClientGovernor(unittest.TestCase):
+    def setUp(self) -> None:
+        self.base_url = "http://localhost:8080"
+        self.counter = InFlightCounter()
+
+    def _callback(self, request: object) -> tuple[int, dict, str]:
+        self.counter.enter()
+        time.sleep(0.01)
+        self.counter.leave()
+        recipe_id = str(request.url).rsplit("/", 1)[-1]  # type: ignore[attr-defined]
+        body = {
+            "@type": "Recipe",
+            "id": recipe_id,
+            "name": f"Recipe {recipe_id}",
+            "dateCreated": "2023-01-01T10:00:00",
+            "dateModified": "2023-01-02T10:00:00",
+            "nutrition": {"@type": "NutritionInformation"},
+        }
+        return 200, {}, json.dumps(body)
+
+    @responses.activate
+    def test_max_in_flight(self) -> None:
+        for i in range(8):
+            responses.add_callback(
+                responses.GET,
+                urljoin(self.base_url, f"/apps/cookbook/api/v1/recipes/{i}"),
+                callback=self._callback,
+            )
+        governor = Governor({"read": Limit(max_in_flight=2)})
+        client = CookbookClient(
+            self.base_url, "testuser", "testpass", governor=governor
+        )
+
+        results = list(
+            client.get_recipes_full([str(i) for i in range(8)], max_workers=8)
+        )
+
+        assert all(r.ok for r in results)
+        assert self.counter.max == 2
+
+    @responses.activate
+    def test_streams_are_limited_while_opened(self) -> None:
+        stubs = [
+            {
+                "id": str(i),
+                "name": f"Recipe {i}",
+                "dateCreated": "2023-01-01T10:00:00",
+                "dateModified": "2023-01-02T10:00:00",
+            }
+            for i in range(10)
+        ]
+        responses.add(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/recipes"),
+            json=stubs,
+        )
+        acquired = []
+
+        class CountingLimit(Limit):
+            def acquire(self) -> None:
+                acquired.append(self)
+                super().acquire()
+
+        limit = CountingLimit(max_in_flight=1)
+        client = CookbookClient(
+            self.base_url, "testuser", "testpass", governor=Governor(default=limit)
+        )
+
+        in_flight = [
+            limit.concurrency.in_flight for _ in client.iter_recipes(chunk_size=10)
+        ]
+
+        # the stream is charged once and does not hold a slot while its body is read
+        assert len(acquired) == 1
+        assert in_flight == [0] * 10
+
+    @responses.activate
+    def test_rate_limit(self) -> None:
+        responses.add(
+            responses.DELETE,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/recipes/1"),
+            body="",
+        )
+        clock = FakeClock()
+        limit = Limit()
+        limit.bucket = TokenBucket(rate=20, clock=clock, sleep=clock.sleep)
+        client = CookbookClient(
+            self.base_url, "testuser", "testpass", governor=Governor(default=limit)
+        )
+
+        for _ in range(3):
+            client.delete_recipe("1")
+
+        # the first request is sent immediately, the others wait for a token
+        assert clock.sleeps == [0.05, 0.05]
+        assert len(responses.calls) == 3
+
+
+if __name__ == "__main__":
+    unittest.main()
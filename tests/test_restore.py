@@ -0,0 +1,141 @@
+import io
+import json
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from urllib.parse import urljoin
+
+import responses
+from pydantic import ValidationError
+
+from nextcloud_cookbook_api.bulk import IdempotencyStore
+from nextcloud_cookbook_api.client import CookbookClient
+from nextcloud_cookbook_api.restore import restore_cookbook
+from tests.fixtures import recipe_data, stub_data
+
+
+def archive_files(recipes: list[dict]) -> dict[str, bytes]:
+    files = {"config.json": b'{"folder": "/Recipes"}'}
+    for recipe in recipes:
+        files[f"recipes/{recipe['id']}/recipe.json"] = json.dumps(recipe).encode()
+        files[f"recipes/{recipe['id']}/full.jpg"] = b"\xff\xd8image"
+    files["manifest.json"] = b'{"recipes": {}}'
+    return files
+
+
+def write_tar(path: Path, files: dict[str, bytes]) -> None:
+    with tarfile.open(path, "w:gz") as archive:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+
+class TestRestore(unittest.TestCase):
+    def setUp(self) -> None:
+        self.base_url = "http://localhost:8080"
+        self.client = CookbookClient(self.base_url, "testuser", "testpass")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.created = []
+        self.updated = {}
+
+    def _add_server(self, existing: list[dict]) -> None:
+        api = urljoin(self.base_url, "/apps/cookbook/api/v1/recipes")
+        responses.add(responses.GET, api, json=[stub_data(r) for r in existing])
+        for recipe in existing:
+            responses.add(responses.GET, f"{api}/{recipe['id']}", json=recipe)
+
+        def create(request):
+            self.created.append(json.loads(request.body))
+            return 200, {}, str(100 + len(self.created))
+
+        def update(request):
+            recipe_id = request.url.rsplit("/", 1)[1]
+            self.updated[recipe_id] = json.loads(request.body)
+            return 200, {}, recipe_id
+
+        responses.add_callback(responses.POST, api, callback=create)
+        for recipe in existing:
+            responses.add_callback(
+                responses.PUT, f"{api}/{recipe['id']}", callback=update
+            )
+
+    @responses.activate
+    def test_restore_matches_existing_recipes(self) -> None:
+        self._add_server(
+            [
+                recipe_data("7", "Pasta"),
+                recipe_data("8", "Old soup", url="https://example.com/soup/"),
+            ]
+        )
+        path = Path(self.tmp.name) / "backup.tar.gz"
+        write_tar(
+            path,
+            archive_files(
+                [
+                    recipe_data("1", "Pasta"),
+                    recipe_data("2", "Soup", url="https://EXAMPLE.com/soup"),
+                    recipe_data("3", "Cake"),
+                ]
+            ),
+        )
+        checkpoint = IdempotencyStore()
+
+        report = restore_cookbook(
+            self.client, path, checkpoint=checkpoint, max_workers=2
+        )
+
+        assert sorted(report.updated) == ["1", "2"]
+        assert report.created == ["3"]
+        assert not report.failed
+        assert report.recipes_per_second > 0
+        assert self.updated["7"]["name"] == "Pasta"
+        assert self.updated["7"]["id"] == "7"
+        assert self.updated["8"]["name"] == "Soup"
+        # the ID of the archive must not be sent, the server would overwrite that recipe
+        assert self.created[0]["id"] == ""
+        assert checkpoint.get("1") == "7"
+        assert checkpoint.get("3") == "101"
+
+    @responses.activate
+    def test_restore_resumes_from_checkpoint(self) -> None:
+        self._add_server([])
+        files = archive_files([recipe_data(str(i)) for i in range(4)])
+        files["recipes/2/recipe.json"] = b'{"name": "broken"}'
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            for name, data in files.items():
+                archive.writestr(name, data)
+        checkpoint = IdempotencyStore(Path(self.tmp.name) / "restore.jsonl")
+        checkpoint.record("0", "50")
+
+        report = restore_cookbook(self.client, buffer, checkpoint, existing_urls={})
+
+        assert report.skipped == ["0"]
+        assert sorted(report.created) == ["1", "3"]
+        assert [f.id for f in report.failed] == ["2"]
+        assert isinstance(report.failed[0].error, ValidationError)
+        assert len(self.created) == 2
+        assert len(IdempotencyStore(checkpoint.path)) == 3
+
+    def test_restore_rejects_other_files(self) -> None:
+        path = Path(self.tmp.name) / "backup.tar"
+        path.write_bytes(b"not an archive")
+
+        with (
+            responses.RequestsMock() as mock,
+            self.assertRaises(ValueError),
+        ):
+            mock.add(
+                responses.GET,
+                urljoin(self.base_url, "/apps/cookbook/api/v1/recipes"),
+                json=[],
+            )
+            restore_cookbook(self.client, path, existing_urls={})
+
+
+if __name__ == "__main__":
+    unittest.main()
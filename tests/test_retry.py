@@ -0,0 +1,141 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest import mock
+from urllib.parse import urljoin
+
+import requests
+import responses
+
+from nextcloud_cookbook_api.client import CookbookClient
+from nextcloud_cookbook_api.retry import RetryPolicy
+
+RECIPE_DATA = {
+    "@type": "Recipe",
+    "id": "1",
+    "name": "Recipe 1",
+    "dateCreated": "2023-01-01T10:00:00",
+    "dateModified": "2023-01-02T10:00:00",
+    "nutrition": {"@type": "NutritionInformation"},
+}
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_can_retry(self) -> None:
+        policy = RetryPolicy(max_attempts=3)
+
+        assert policy.can_retry("GET", 1)
+        assert policy.can_retry("PUT", 2)
+        assert not policy.can_retry("DELETE", 3)
+        assert not policy.can_retry("POST", 1)
+        assert RetryPolicy(retry_post=True).can_retry("POST", 1)
+
+    def test_exponential_backoff(self) -> None:
+        policy = RetryPolicy(backoff_factor=1, jitter=0, max_backoff=5)
+
+        assert [policy.backoff(a) for a in range(1, 5)] == [1, 2, 4, 5]
+
+    def test_backoff_jitter(self) -> None:
+        policy = RetryPolicy(backoff_factor=1, jitter=0.5)
+
+        delays = {policy.backoff(1) for _ in range(20)}
+
+        assert all(1 <= d <= 1.5 for d in delays)
+        assert len(delays) > 1
+
+    def test_retry_after(self) -> None:
+        policy = RetryPolicy(max_backoff=60)
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+
+        assert policy.backoff(1, "7") == 7
+        assert policy.backoff(1, "120") == 60
+        assert 25 < policy.backoff(1, format_datetime(retry_at, usegmt=True)) <= 30
+        assert policy.backoff(1, "invalid") <= 0.75
+        assert RetryPolicy(respect_retry_after=False).backoff(1, "7") <= 0.75
+
+
+class TestClientRetries(unittest.TestCase):
+    def setUp(self) -> None:
+        self.base_url = "http://localhost:8080"
+        self.url = urljoin(self.base_url, "/apps/cookbook/api/v1/recipes/1")
+        self.client = CookbookClient(
+            self.base_url,
+            "testuser",
+            "testpass",
+            retry=RetryPolicy(backoff_factor=0),
+        )
+
+    @responses.activate
+    def test_transient_status_is_retried(self) -> None:
+        responses.add(responses.GET, self.url, status=503)
+        responses.add(responses.GET, self.url, status=502)
+        responses.add(responses.GET, self.url, json=RECIPE_DATA)
+
+        result = self.client.get_recipe("1")
+
+        assert result.id == "1"
+        assert len(responses.calls) == 3
+
+    @responses.activate
+    def test_attempts_are_limited(self) -> None:
+        responses.add(responses.DELETE, self.url, status=503)
+
+        with self.assertRaises(requests.HTTPError):
+            self.client.delete_recipe("1")
+
+        assert len(responses.calls) == 3
+
+    @responses.activate
+    def test_connection_errors_are_retried(self) -> None:
+        responses.add(
+            responses.GET,
+            self.url,
+            body=requests.ConnectionError("connection reset"),
+        )
+        responses.add(responses.GET, self.url, json=RECIPE_DATA)
+
+        result = self.client.get_recipe("1")
+
+        assert result.id == "1"
+
+    @responses.activate
+    def test_retry_after_is_respected(self) -> None:
+        responses.add(responses.GET, self.url, status=429, headers={"Retry-After": "2"})
+        responses.add(responses.GET, self.url, json=RECIPE_DATA)
+
+        with mock.patch("nextcloud_cookbook_api.client.time.sleep") as sleep:
+            self.client.get_recipe("1")
+
+        sleep.assert_called_once_with(2.0)
+
+    @responses.activate
+    def test_post_is_not_retried_by_default(self) -> None:
+        url = urljoin(self.base_url, "/apps/cookbook/api/v1/import")
+        responses.add(responses.POST, url, status=503)
+        responses.add(responses.POST, url, json=RECIPE_DATA)
+
+        with self.assertRaises(requests.HTTPError):
+            self.client.import_recipe("http://example.com/recipe")
+
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_post_is_retried_if_enabled(self) -> None:
+        client = CookbookClient(
+            self.base_url,
+            "testuser",
+            "testpass",
+            retry=RetryPolicy(backoff_factor=0, retry_post=True),
+        )
+        url = urljoin(self.base_url, "/apps/cookbook/api/v1/import")
+        responses.add(responses.POST, url, status=503)
+        responses.add(responses.POST, url, json=RECIPE_DATA)
+
+        result = client.import_recipe("http://example.com/recipe")
+
+        assert result.id == "1"
+        assert len(responses.calls) == 2
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+import unittest
+
+from nextcloud_cookbook_api.models import Recipe
+from nextcloud_cookbook_api.search import SearchIndex, tokenize
+from nextcloud_cookbook_api.sync import SyncResult
+
+
+def recipe(
+    recipe_id: str,
+    name: str,
+    description: str = "",
+    ingredients: list[str] | None = None,
+    instructions: list[str] | None = None,
+    keywords: str = "",
+    category: str = "",
+) -> Recipe:
+    return Recipe.model_validate(
+        {
+            "@type": "Recipe",
+            "id": recipe_id,
+            "name": name,
+            "description": description,
+            "recipeIngredient": ingredients or [],
+            "recipeInstructions": instructions or [],
+            "keywords": keywords,
+            "recipeCategory": category,
+            "dateCreated": "2023-01-01T10:00:00",
+            "dateModified": "2023-01-01T10:00:00",
+            "nutrition": {"@type": "NutritionInformation"},
+        }
+    )
+
+
+RECIPES = [
+    recipe(
+        "1",
+        "Pasta al pomodoro",
+        "Quick weeknight pasta",
+        ["200 g spaghetti", "1 can tomatoes", "Basil"],
+        ["Boil the pasta.", "Simmer the tomatoes."],
+        "pasta,vegetarian",
+        "Main Courses",
+    ),
+    recipe(
+        "2",
+        "Tomato soup",
+        "Creamy soup",
+        ["1 kg tomatoes", "Cream"],
+        ["Blend everything."],
+        "soup",
+        "Soups",
+    ),
+    recipe(
+        "3",
+        "Chili con carne",
+        "With jalapeños",
+        ["500 g beef", "2 jalapeños", "Tomatoes"],
+        ["Brown the beef.", "Add the tomatoes and simmer."],
+        category="Main Courses",
+    ),
+    recipe("4", "Tomatillo salsa", ingredients=["Tomatillos", "Onion"]),
+]
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.index = SearchIndex.from_recipes(RECIPES)
+
+    def ids(self, query: str, **kwargs) -> list[str]:
+        return [hit.id for hit in self.index.search(query, **kwargs)]
+
+    def test_tokenize(self) -> None:
+        assert tokenize("Crème brûlée, 2 EGGS!") == ["creme", "brulee", "2", "eggs"]
+
+    def test_ranking(self) -> None:
+        hits = self.index.search("tomato", prefix=False)
+        assert [hit.id for hit in hits] == ["2"]
+        assert hits[0].name == "Tomato soup"
+        # the ingredients weigh more than the instructions
+        assert self.ids("tomatoes", prefix=False) == ["3", "2", "1"]
+
+    def test_all_terms_must_match(self) -> None:
+        assert self.ids("tomatoes simmer") == ["3", "1"]
+        assert self.ids("tomatoes cream") == ["2"]
+        assert self.ids("tomatoes unknown") == []
+        assert self.ids("") == []
+
+    def test_prefix(self) -> None:
+        assert self.ids("toma") == ["4", "2", "3", "1"]
+        assert self.ids("toma", prefix=False) == []
+        assert self.ids("main cour") == ["3", "1"]
+        assert self.index.suggest("Tom") == [
+            "tomatoes",
+            "tomatillo",
+            "tomatillos",
+            "tomato",
+        ]
+
+    def test_accents_are_ignored(self) -> None:
+        assert self.ids("jalapeno") == ["3"]
+        assert self.ids("JALAPEÑOS") == ["3"]
+
+    def test_limit(self) -> None:
+        assert len(self.ids("tomatoes", limit=2)) == 2
+        assert self.ids("tomatoes", limit=0) == []
+
+    def test_updates(self) -> None:
+        # the scores of searched tokens are cached and must follow the changes
+        assert self.ids("soup") == ["2"]
+        self.index.add(recipe("2", "Gazpacho", "Cold soup", ["Tomatoes"]))
+        self.index.add(recipe("5", "Onion soup", ingredients=["Onions"]))
+        assert len(self.index) == 5
+        assert self.ids("soup") == ["5", "2"]
+        assert self.ids("cream") == []
+        assert self.index.search("gazpacho")[0].name == "Gazpacho"
+
+        self.index.remove("5")
+        self.index.remove("unknown")
+        assert "5" not in self.index
+        assert self.ids("soup") == ["2"]
+        assert self.ids("onion") == ["4"]
+
+    def test_apply_sync_result(self) -> None:
+        result = SyncResult(
+            created=[recipe("5", "Pancakes")],
+            updated=[recipe("1", "Pasta arrabbiata")],
+            deleted=["4"],
+        )
+        self.index.apply(result)
+
+        assert self.ids("pancakes") == ["5"]
+        assert self.ids("arrabbiata") == ["1"]
+        assert self.ids("pomodoro") == []
+        assert self.ids("tomatillo") == []
+        assert self.index.suggest("tomati") == []
+
+    def test_cached_scores_match_a_fresh_index(self) -> None:
+        queries = ["tomatoes", "soup", "the", "toma"]
+        for query in queries:
+            self.index.search(query)
+        added = recipe("5", "Tomatoes on toast", "Simple tomatoes")
+        self.index.add(added)
+        fresh = SearchIndex.from_recipes([*RECIPES, added])
+
+        for query in queries:
+            assert self.index.search(query) == fresh.search(query)
+
+    def test_cached_prefix_follows_updates(self) -> None:
+        # the merged ranking of a prefix is cached and must include new tokens
+        assert self.ids("toma") == ["4", "2", "3", "1"]
+        assert "5" not in self.ids("t", limit=10)
+        self.index.add(recipe("5", "Tomahawk steak"))
+        assert self.ids("toma") == ["5", "4", "2", "3", "1"]
+        assert "5" in self.ids("t", limit=10)
+
+        self.index.remove("4")
+        assert self.ids("toma") == ["5", "2", "3", "1"]
+        fresh = SearchIndex.from_recipes(
+            [*(r for r in RECIPES if r.id != "4"), recipe("5", "Tomahawk steak")]
+        )
+        assert self.index.search("toma") == fresh.search("toma")
+
+    def test_scores_are_patched_in_place(self) -> None:
+        index = SearchIndex.from_recipes(RECIPES, tolerance=1.0)
+        assert [h.id for h in index.search("tomatoes")] == ["3", "2", "1"]
+        index.add(recipe("5", "Tomatoes on toast"))
+        index.remove("3")
+
+        assert [h.id for h in index.search("tomatoes")] == ["5", "2", "1"]
+        assert [h.id for h in index.search("tomatoes tomatillos")] == []
+
+    def test_common_terms(self) -> None:
+        recipes = [
+            recipe(
+                str(i),
+                f"Recipe {i}",
+                "A recipe " * (i % 11),
+                instructions=["stir " * (i % 7 + 1), "wait " * (i % 5 + 1)],
+            )
+            for i in range(400)
+        ]
+        index = SearchIndex.from_recipes(recipes)
+        stir = {h.id: h.score for h in index.search("stir", limit=400)}
+        wait = {h.id: h.score for h in index.search("wait", limit=400)}
+        expected = sorted(((stir[i] + wait[i], i) for i in stir), reverse=True)
+
+        hits = index.search("stir wait", limit=5)
+        assert [(round(h.score, 9), h.id) for h in hits] == [
+            (round(s, 9), i) for s, i in expected[:5]
+        ]
+
+
+if __name__ == "__main__":
+    unittest.main()
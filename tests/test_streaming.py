@@ -0,0 +1,57 @@
+import json
+import unittest
+
+from nextcloud_cookbook_api.streaming import JsonArrayParser
+
+
+def parse(document: bytes, chunk_size: int) -> list:
+    parser = JsonArrayParser()
+    items = []
+    for i in range(0, len(document), chunk_size):
+        items.extend(parser.feed(document[i : i + chunk_size]))
+    items.extend(parser.close())
+    return items
+
+
+class TestJsonArrayParser(unittest.TestCase):
+    def test_any_chunk_boundaries(self) -> None:
+        data = [
+            {"id": "1", "name": 'Crème "brûlée"', "keywords": "dessert,🍮"},
+            12345,
+            -1.5e3,
+            "[not, an] array",
+            None,
+            [True, False, {}],
+        ]
+        document = json.dumps(data, ensure_ascii=False, indent=2).encode()
+
+        for chunk_size in range(1, 20):
+            assert parse(document, chunk_size) == data
+
+    def test_elements_are_returned_as_soon_as_complete(self) -> None:
+        parser = JsonArrayParser()
+
+        assert parser.feed(b' [ {"id": "1"} , {"id"') == [{"id": "1"}]
+        assert parser.feed(b': "2"}, 1') == [{"id": "2"}]
+        assert parser.feed(b"2 ]") == [12]
+        assert parser.close() == []
+
+    def test_empty_array(self) -> None:
+        assert parse(b" [ ] ", 1) == []
+
+    def test_invalid_documents(self) -> None:
+        for document in [
+            b"",
+            b'{"id": "1"}',
+            b"[1, 2",
+            b"[1, 2,]",
+            b"[1 2]",
+            b'[{"id": }]',
+            b"[1] 2",
+        ]:
+            with self.subTest(document=document), self.assertRaises(ValueError):
+                parse(document, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urljoin
+
+import responses
+
+from nextcloud_cookbook_api.client import CookbookClient
+from nextcloud_cookbook_api.models import RecipeStub
+from nextcloud_cookbook_api.sync import Manifest, RecipeSync
+from tests.fixtures import recipe_data, stub_data
+
+
+class TestManifest(unittest.TestCase):
+    def test_diff(self) -> None:
+        manifest = Manifest(
+            {
+                "1": datetime(2023, 1, 2, 10),
+                "2": datetime(2023, 1, 2, 10),
+                "3": datetime(2023, 1, 2, 10),
+            },
+        )
+        stubs = [
+            RecipeStub.model_validate(stub_data(recipe_data(i, modified=modified)))
+            for i, modified in [
+                ("1", "2023-01-02T10:00:00"),
+                ("2", "2023-01-05T10:00:00"),
+                ("4", "2023-01-05T10:00:00"),
+            ]
+        ]
+
+        diff = manifest.diff(stubs)
+
+        assert [s.id for s in diff.new] == ["4"]
+        assert [s.id for s in diff.changed] == ["2"]
+        assert [s.id for s in diff.unchanged] == ["1"]
+        assert diff.deleted == ["3"]
+
+    def test_save_and_load(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "manifest.json"
+            Manifest({"1": datetime(2023, 1, 2, 10)}).save(path)
+
+            assert Manifest.load(path).entries == {"1": datetime(2023, 1, 2, 10)}
+            assert Manifest.load(Path(tmp) / "missing.json").entries == {}
+
+
+class TestRecipeSync(unittest.TestCase):
+    def setUp(self) -> None:
+        self.base_url = "http://localhost:8080"
+        self.client = CookbookClient(self.base_url, "testuser", "testpass")
+
+    def _add_stubs(self, stubs: list[dict]) -> None:
+        responses.add(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/recipes"),
+            json=stubs,
+        )
+
+    def _add_recipe(self, recipe_id: str, modified: str, status: int = 200) -> None:
+        responses.add(
+            responses.GET,
+            urljoin(self.base_url, f"/apps/cookbook/api/v1/recipes/{recipe_id}"),
+            json=recipe_data(recipe_id, modified=modified),
+            status=status,
+        )
+
+    @responses.activate
+    def test_run_fetches_only_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest_path = Path(tmp) / "manifest.json"
+
+            self._add_stubs(
+                [
+                    stub_data(recipe_data("1", modified="2023-01-02T10:00:00")),
+                    stub_data(recipe_data("2", modified="2023-01-02T10:00:00")),
+                ],
+            )
+            self._add_recipe("1", "2023-01-02T10:00:00")
+            self._add_recipe("2", "2023-01-02T10:00:00")
+
+            first = RecipeSync(self.client, manifest_path).run()
+
+            assert sorted(r.id for r in first.created) == ["1", "2"]
+            assert len(responses.calls) == 3
+
+            responses.reset()
+            self._add_stubs(
+                [
+                    stub_data(recipe_data("2", modified="2023-01-05T10:00:00")),
+                    stub_data(recipe_data("3", modified="2023-01-05T10:00:00")),
+                ],
+            )
+            self._add_recipe("2", "2023-01-05T10:00:00")
+            self._add_recipe("3", "2023-01-05T10:00:00")
+
+            second = RecipeSync(self.client, manifest_path).run()
+
+            assert [r.id for r in second.created] == ["3"]
+            assert [r.id for r in second.updated] == ["2"]
+            assert second.deleted == ["1"]
+            assert len(responses.calls) == 3
+            assert set(Manifest.load(manifest_path).entries) == {"2", "3"}
+
+    @responses.activate
+    def test_run_retries_failed_recipes(self) -> None:
+        self._add_stubs([stub_data(recipe_data("1", modified="2023-01-02T10:00:00"))])
+        self._add_recipe("1", "2023-01-02T10:00:00", status=500)
+        sync = RecipeSync(self.client)
+
+        result = sync.run()
+
+        assert [r.id for r in result.failed] == ["1"]
+        assert sync.manifest.entries == {}
+
+        responses.replace(
+            responses.GET,
+            urljoin(self.base_url, "/apps/cookbook/api/v1/recipes/1"),
+            json=recipe_data("1", modified="2023-01-02T10:00:00"),
+        )
+
+        result = sync.run()
+
+        assert [r.id for r in result.created] == ["1"]
+        assert result.unchanged == 0
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+import asyncio
+import time
+import unittest
+from urllib.parse import urljoin
+
+import httpx
+import requests
+import responses
+
+from nextcloud_cookbook_api.async_client import AsyncCookbookClient
+from nextcloud_cookbook_api.client import CookbookClient
+from nextcloud_cookbook_api.retry import RetryPolicy
+from nextcloud_cookbook_api.timeouts import (
+    Deadline,
+    DeadlineExceeded,
+    Timeout,
+    current_deadline,
+    deadline,
+    override_timeout,
+)
+
+RECIPE_DATA = {
+    "@type": "Recipe",
+    "id": "1",
+    "name": "Recipe 1",
+    "dateCreated": "2023-01-01T10:00:00",
+    "dateModified": "2023-01-02T10:00:00",
+    "nutrition": {"@type": "NutritionInformation"},
+}
+
+
+class TestTimeouts(unittest.TestCase):
+    def test_timeout_of(self) -> None:
+        assert Timeout.of(5) == Timeout(5, 5)
+        assert Timeout.of(None) == Timeout(None, None)
+        assert Timeout.of(Timeout(1, 2)) == Timeout(1, 2)
+
+    def test_timeout_bounded(self) -> None:
+        assert Timeout(10, 30).bounded(20) == Timeout(10, 20)
+        assert Timeout(None, None).bounded(3) == Timeout(3, 3)
+
+    def test_nested_deadline_only_shortens(self) -> None:
+        with deadline(10) as outer:
+            with deadline(60) as inner:
+                assert inner is outer
+            with deadline(1) as inner:
+                assert inner is not outer
+                assert current_deadline() is inner
+            assert current_deadline() is outer
+        assert current_deadline() is None
+
+    def test_deadline_clock(self) -> None:
+        now = 0.0
+        budget = Deadline(2, clock=lambda: now)
+
+        assert budget.remaining() == 2
+        now = 1.5
+        assert budget.remaining() == 0.5
+        now = 3
+        assert budget.expired
+
+    def test_deadline_expired(self) -> None:
+        expired = Deadline(0)
+
+        assert expired.expired
+        with self.assertRaises(DeadlineExceeded):
+            expired.check()
+
+
+class TestClientTimeouts(unittest.TestCase):
+    def setUp(self) -> None:
+        self.base_url = "http://localhost:8080"
+        self.url = urljoin(self.base_url, "/apps/cookbook/api/v1/recipes/1")
+        self.client = CookbookClient(
+            self.base_url,
+            "testuser",
+            "testpass",
+            timeout=Timeout(connect=3, read=20),
+            retry=RetryPolicy(backoff_factor=0),
+        )
+
+    @responses.activate
+    def test_timeout_is_passed(self) -> None:
+        responses.add(responses.GET, self.url, json=RECIPE_DATA)
+
+        self.client.get_recipe("1")
+        with override_timeout(Timeout(connect=1, read=2)):
+            self.client.get_recipe("1")
+        with deadline(Deadline(5, clock=lambda: 0.0)):
+            self.client.get_recipe("1")
+
+        timeouts = [c.request.req_kwargs["timeout"] for c in responses.calls]
+        assert timeouts[0] == (3, 20)
+        assert timeouts[1] == (1, 2)
+        assert timeouts[2] == (3, 5)
+
+    @responses.activate
+    def test_expired_deadline_sends_no_request(self) -> None:
+        responses.add(responses.GET, self.url, json=RECIPE_DATA)
+
+        with self.assertRaises(DeadlineExceeded), deadline(0):
+            self.client.get_recipe("1")
+
+        assert len(responses.calls) == 0
+
+    @responses.activate
+    def test_retry_backoff_is_bounded_by_deadline(self) -> None:
+        responses.add(responses.GET, self.url, status=503, headers={"Retry-After": "5"})
+        responses.add(responses.GET, self.url, json=RECIPE_DATA)
+
+        with self.assertRaises(requests.HTTPError), deadline(1):
+            self.client.get_recipe("1")
+
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_get_recipes_full_deadline(self) -> None:
+        def slow(request: requests.PreparedRequest) -> tuple[int, dict, str]:
+            time.sleep(0.1)
+            return 200, {}, '{"@type": "Recipe", "id": "1", "name": "Recipe 1"}'
+
+        for i in range(4):
+            responses.add_callback(
+                responses.GET,
+                urljoin(self.base_url, f"/apps/cookbook/api/v1/recipes/{i}"),
+                callback=slow,
+            )
+
+        results = list(
+            self.client.get_recipes_full(
+                [str(i) for i in range(4)], max_workers=1, deadline=0.05
+            )
+        )
+
+        # the recipes after the deadline are never requested, which bounds the run time without measuring it
+        assert [type(r.error) for r in results[1:]] == [DeadlineExceeded] * 3
+        assert len(responses.calls) == 1
+
+
+class TestAsyncClientTimeouts(unittest.IsolatedAsyncioTestCase):
+    async def test_timeout_is_passed(self) -> None:
+        requests_seen = []
+
+        def handle(request: httpx.Request) -> httpx.Response:
+            requests_seen.append(request)
+            return httpx.Response(200, json=RECIPE_DATA)
+
+        async with AsyncCookbookClient(
+            "http://localhost:8080",
+            "testuser",
+            "testpass",
+            transport=httpx.MockTransport(handle),
+            timeout=Timeout(connect=3, read=20),
+        ) as client:
+            await client.get_recipe("1")
+
+        timeout = requests_seen[0].extensions["timeout"]
+        assert timeout["connect"] == 3
+        assert timeout["read"] == 20
+
+    async def test_get_recipes_full_deadline_cancels_running_requests(self) -> None:
+        async def handle(request: httpx.Request) -> httpx.Response:
+            # the server never answers, so only the deadline can end the requests
+            await asyncio.Event().wait()
+            return httpx.Response(200, json=RECIPE_DATA)
+
+        async def collect(client: AsyncCookbookClient) -> list:
+            return [r async for r in client.get_recipes_full(["1", "2"], deadline=0.05)]
+
+        async with AsyncCookbookClient(
+            "http://localhost:8080",
+            "testuser",
+            "testpass",
+            transport=httpx.MockTransport(handle),
+        ) as client:
+            # a generous bound, which only fails if the running requests are not cancelled
+            results = await asyncio.wait_for(collect(client), timeout=10)
+
+        assert len(results) == 2
+        assert all(isinstance(r.error, DeadlineExceeded) for r in results)
+
+
+if __name__ == "__main__":
+    unittest.main()